@@ -3,8 +3,9 @@ from flask_cors import CORS
 from flask_login import LoginManager
 from flask_sqlalchemy import SQLAlchemy
 from dotenv import load_dotenv
+from contextlib import contextmanager
 from sqlalchemy import inspect, text
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import DatabaseError, IntegrityError
 import os
 
 load_dotenv()
@@ -17,6 +18,51 @@ def get_db():
     return db.session
 
 
+@contextmanager
+def unit_of_work():
+    """
+    Group every model write in the block into one transaction.
+
+    Inside the block ``commit_session`` only flushes (so generated ids are
+    available); the block commits once on exit, or rolls everything back if it
+    raises. Blocks nest; only the outermost one commits.
+    """
+    info = db.session.info
+    outermost = not info.get('uow_depth')
+    info['uow_depth'] = info.get('uow_depth', 0) + 1
+    try:
+        yield db.session
+        if outermost:
+            db.session.commit()
+    except BaseException:
+        if outermost:
+            db.session.rollback()
+            info.pop('uow_after_commit', None)
+        raise
+    finally:
+        info['uow_depth'] -= 1
+
+    if outermost:
+        for callback in info.pop('uow_after_commit', []):
+            callback()
+
+
+def commit_session():
+    """Commit now, or just flush when running inside ``unit_of_work``."""
+    if db.session.info.get('uow_depth'):
+        db.session.flush()
+    else:
+        db.session.commit()
+
+
+def after_commit(callback):
+    """Run ``callback`` once the current unit of work commits (immediately outside one)."""
+    if db.session.info.get('uow_depth'):
+        db.session.info.setdefault('uow_after_commit', []).append(callback)
+    else:
+        callback()
+
+
 def _ensure_runtime_schema():
     """Apply small, idempotent schema updates for existing deployments."""
     inspector = inspect(db.engine)
@@ -29,6 +75,75 @@ def _ensure_runtime_schema():
         with db.engine.begin() as conn:
             conn.execute(text("ALTER TABLE cable_receiving ADD COLUMN storage_location VARCHAR(255)"))
 
+    # Backfilled by migrate_inventory_skus.py.
+    columns = {column['name'] for column in inspector.get_columns('inventory_movements')}
+    if 'sku_id' not in columns:
+        with db.engine.begin() as conn:
+            conn.execute(text("ALTER TABLE inventory_movements ADD COLUMN sku_id INTEGER REFERENCES skus(id)"))
+
+    # Backfilled by backfill_movement_locations.py.
+    if 'location' not in columns:
+        with db.engine.begin() as conn:
+            conn.execute(text("ALTER TABLE inventory_movements ADD COLUMN location VARCHAR(255)"))
+
+    # Backfilled by backfill_sku_lengths.py.
+    columns = {column['name'] for column in inspector.get_columns('skus')}
+    if 'length_meters' not in columns:
+        with db.engine.begin() as conn:
+            conn.execute(text("ALTER TABLE skus ADD COLUMN length_meters NUMERIC(12, 3)"))
+
+    # Rebuilt from open reservations by backfill_stock_reservations.py.
+    columns = {column['name'] for column in inspector.get_columns('inventory_balances')}
+    if 'reserved' not in columns:
+        with db.engine.begin() as conn:
+            conn.execute(text("ALTER TABLE inventory_balances ADD COLUMN reserved INTEGER NOT NULL DEFAULT 0"))
+
+    for table_name in ('optics_requests', 'optics_returns'):
+        columns = {column['name'] for column in inspector.get_columns(table_name)}
+        if 'kit_order_id' not in columns:
+            with db.engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN kit_order_id VARCHAR(32)"))
+
+    _ensure_indexes()
+    _backfill_inventory_postings()
+    _seed_optics_catalog()
+
+
+def _backfill_inventory_postings():
+    """Claim fulfillments posted before ``inventory_postings`` existed so they cannot be posted again."""
+    from app.models import InventoryMovement, InventoryPosting
+
+    if InventoryPosting.query.first() is not None:
+        return
+    if InventoryMovement.query.filter_by(source_type='ticket_fulfillment').first() is None:
+        return
+    InventoryPosting.backfill('ticket_fulfillment')
+
+
+def _seed_optics_catalog():
+    """Load the built-in optics parts and kits into an empty catalog."""
+    from app.models import OpticsPart
+
+    OpticsPart.seed_defaults()
+
+
+def _ensure_indexes():
+    """
+    Create indexes declared on models that are missing from existing tables.
+
+    ``create_all`` only emits indexes together with a new table, so composite
+    indexes added later would otherwise never reach an existing deployment.
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                with db.engine.begin() as conn:
+                    index.create(bind=conn, checkfirst=True)
+            except DatabaseError as exc:
+                # Another worker may have created the same index concurrently.
+                if 'already exists' not in str(exc).lower():
+                    raise
+
 
 def _safe_create_all():
     """
@@ -59,6 +174,9 @@ def create_app():
     app.config['SQLALCHEMY_DATABASE_URI'] = app.config['DATABASE_URL']
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['AUTH_TOKEN_TTL_SECONDS'] = int(os.getenv('AUTH_TOKEN_TTL_SECONDS', '86400'))
+    # Per-process cache of verified tokens; 0 disables it
+    app.config['AUTH_CACHE_TTL_SECONDS'] = int(os.getenv('AUTH_CACHE_TTL_SECONDS', '60'))
+    app.config['AUTH_CACHE_MAX_ENTRIES'] = int(os.getenv('AUTH_CACHE_MAX_ENTRIES', '1024'))
 
     # Twilio Configuration
     app.config['TWILIO_ACCOUNT_SID'] = os.getenv('TWILIO_ACCOUNT_SID')
@@ -69,12 +187,24 @@ def create_app():
     app.config['RESEND_API_KEY'] = os.getenv('RESEND_API_KEY')
     app.config['SENDGRID_API_KEY'] = os.getenv('SENDGRID_API_KEY')
     app.config['SENDGRID_FROM_EMAIL'] = os.getenv('SENDGRID_FROM_EMAIL', 'noreply@cabletickets.com')
+    app.config['RESEND_API_URL'] = os.getenv('RESEND_API_URL', 'https://api.resend.com/emails')
+    app.config['NOTIFICATION_HTTP_POOL_SIZE'] = int(os.getenv('NOTIFICATION_HTTP_POOL_SIZE', '10'))
 
     # AWS Configuration (for SNS SMS)
     app.config['AWS_ACCESS_KEY_ID'] = os.getenv('AWS_ACCESS_KEY_ID')
     app.config['AWS_SECRET_ACCESS_KEY'] = os.getenv('AWS_SECRET_ACCESS_KEY')
     app.config['AWS_REGION'] = os.getenv('AWS_REGION', 'us-east-1')
 
+    # Notification outbox delivery: 'live' providers or 'fake' for offline runs
+    app.config['NOTIFICATION_PROVIDER'] = os.getenv('NOTIFICATION_PROVIDER', 'live')
+
+    # Dashboard stats: 'aggregate' (one GROUP BY) or 'counters' (ticket_status_counts table)
+    app.config['DASHBOARD_STATS_SOURCE'] = os.getenv('DASHBOARD_STATS_SOURCE', 'aggregate')
+    app.config['DASHBOARD_STATS_CACHE_TTL'] = int(os.getenv('DASHBOARD_STATS_CACHE_TTL', '10'))
+    app.config['SHARED_CACHE_DIR'] = os.getenv('SHARED_CACHE_DIR')
+    # Upper bound only; forecasts are also retired by every ledger write
+    app.config['FORECAST_CACHE_TTL'] = int(os.getenv('FORECAST_CACHE_TTL', '3600'))
+
     # App URL for notification links
     app.config['APP_URL'] = os.getenv('APP_URL', 'http://localhost:3000')
 
@@ -82,10 +212,26 @@ def create_app():
     login_manager.init_app(app)
     db.init_app(app)
 
+    from app import metrics
+    metrics.init_app(app)
+
     # Register blueprints
     from app.routes import api
     app.register_blueprint(api, url_prefix='/api')
 
+    from app.auth_cache import auth_cache
+    auth_cache.max_entries = app.config['AUTH_CACHE_MAX_ENTRIES']
+    auth_cache.clear()
+
+    from app.sku_cache import sku_cache
+    sku_cache.clear()
+
+    from app.balance_cache import balance_cache
+    balance_cache.clear()
+
+    from app.optics_catalog import catalog_cache
+    catalog_cache.clear()
+
     with app.app_context():
         _safe_create_all()
         _ensure_runtime_schema()
@@ -0,0 +1,128 @@
+"""Per-process cache of verified bearer tokens for ``_require_actor``.
+
+A hit skips both the itsdangerous signature check and the ``User`` lookup.
+Entries are plain snapshots (never ORM rows), bounded by count (LRU) and age,
+and never outlive the token itself. Any committed change to a user's role or
+credentials bumps a shared marker that makes every worker drop its cache.
+"""
+
+from collections import OrderedDict
+import hashlib
+import threading
+import time
+
+from flask import has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.cache import bump_marker, marker_version
+
+AUTH_MARKER = 'auth_users'
+_WATCHED_USER_FIELDS = ('username', 'email', 'phone', 'role', 'password_hash')
+
+
+class AuthenticatedUser:
+    """Read-only view of a ``User`` with the attributes routes use on the actor."""
+
+    __slots__ = ('id', 'username', 'email', 'phone', 'role')
+
+    def __init__(self, id, username, email, phone, role):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.phone = phone
+        self.role = role
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.username, user.email, user.phone, user.role)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'username': self.username,
+            'email': self.email,
+            'phone': self.phone,
+            'role': self.role,
+        }
+
+
+class AuthCache:
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._marker = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token):
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def _check_marker(self):
+        current = marker_version(AUTH_MARKER)
+        if current != self._marker:
+            self._entries.clear()
+            self._marker = current
+
+    def get(self, token):
+        key = self._key(token)
+        with self._lock:
+            self._check_marker()
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, token, user, expires_at):
+        if self.max_entries <= 0:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._check_marker()
+            self._entries[key] = (expires_at, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+
+auth_cache = AuthCache()
+
+
+@event.listens_for(Session, 'before_flush')
+def _track_user_changes(session, flush_context, instances):
+    from app.models import User
+
+    for obj in list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, User):
+            continue
+        state = inspect(obj)
+        if obj in session.deleted or any(state.attrs[name].history.has_changes() for name in _WATCHED_USER_FIELDS):
+            session.info['auth_users_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('auth_users_changed', False):
+        auth_cache.clear()
+        if has_app_context():
+            bump_marker(AUTH_MARKER)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_after_rollback(session):
+    session.info.pop('auth_users_changed', None)
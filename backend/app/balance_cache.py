@@ -0,0 +1,79 @@
+"""Per-process copy of ``inventory_balances`` for availability checks.
+
+The whole table (one row per SKU) is loaded in a single query and served from
+memory until a shared marker says it changed. Any committed transaction that
+touched balances (ledger writes, reservation holds and releases, rebuilds)
+bumps the marker, so a hit costs one ``stat`` call and a dict lookup per item.
+"""
+
+import threading
+
+from flask import has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.cache import bump_marker, marker_version
+
+BALANCES_MARKER = 'inventory_balances'
+
+
+class BalanceCache:
+    def __init__(self):
+        self._balances = None
+        self._marker = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, load):
+        """
+        Return ``{(cable_type, cable_length): (on_hand, reserved)}``, calling ``load()`` on a miss.
+
+        The marker is read before loading, so a commit racing the load leaves
+        the entry tagged with the older version and it is reloaded next time.
+        """
+        current = marker_version(BALANCES_MARKER)
+        with self._lock:
+            if self._balances is not None and self._marker == current:
+                self.hits += 1
+                return self._balances
+            self.misses += 1
+        balances = load()
+        with self._lock:
+            self._balances = balances
+            self._marker = current
+        return balances
+
+    def clear(self):
+        with self._lock:
+            self._balances = None
+            self._marker = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._balances) if self._balances is not None else 0,
+            }
+
+
+balance_cache = BalanceCache()
+
+
+def mark_changed(session):
+    """Note that ``session`` wrote ``inventory_balances``; the marker is bumped once it commits."""
+    session.info['inventory_balances_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('inventory_balances_changed', False):
+        balance_cache.clear()
+        if has_app_context():
+            bump_marker(BALANCES_MARKER)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_after_rollback(session):
+    session.info.pop('inventory_balances_changed', None)
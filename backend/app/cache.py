@@ -0,0 +1,91 @@
+"""Small TTL cache shared by every gunicorn worker on the host.
+
+Entries are JSON files in ``SHARED_CACHE_DIR`` (namespaced by database URL), so a
+value computed by one worker is served by the others until it expires or is
+explicitly invalidated. Writes are atomic renames; a missing or corrupt file is
+just a miss.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from flask import current_app
+
+DASHBOARD_STATS_KEY = 'dashboard_stats'
+INVENTORY_LEDGER_MARKER = 'inventory_ledger'
+
+
+def _cache_dir():
+    base = current_app.config.get('SHARED_CACHE_DIR') or os.path.join(
+        tempfile.gettempdir(), 'cable-ticketing-cache'
+    )
+    namespace = hashlib.sha1(current_app.config['SQLALCHEMY_DATABASE_URI'].encode('utf-8')).hexdigest()[:12]
+    path = os.path.join(base, namespace)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _path(key):
+    return os.path.join(_cache_dir(), f'{key}.json')
+
+
+def cache_get(key):
+    try:
+        with open(_path(key), encoding='utf-8') as handle:
+            entry = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if entry.get('expires_at', 0) < time.time():
+        # Expired entries are removed on read so the directory does not keep them forever.
+        cache_delete(key)
+        return None
+    return entry.get('value')
+
+
+def cache_set(key, value, ttl_seconds):
+    directory = _cache_dir()
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{key}.')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as handle:
+            json.dump({'expires_at': time.time() + ttl_seconds, 'value': value}, handle)
+        os.replace(tmp_path, _path(key))
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def cache_delete(key):
+    try:
+        os.remove(_path(key))
+    except OSError:
+        pass
+
+
+def invalidate_dashboard_stats():
+    cache_delete(DASHBOARD_STATS_KEY)
+
+
+def invalidate_inventory_views():
+    """Retire cached views derived from the ledger; their keys embed ``marker_version(INVENTORY_LEDGER_MARKER)``."""
+    bump_marker(INVENTORY_LEDGER_MARKER)
+
+
+def bump_marker(name):
+    """Record that ``name`` changed; readers compare ``marker_version`` before trusting local state."""
+    path = _path(f'{name}.marker')
+    with open(path, 'a', encoding='utf-8'):
+        pass
+    now_ns = time.time_ns()
+    os.utime(path, ns=(now_ns, now_ns))
+
+
+def marker_version(name):
+    try:
+        return os.stat(_path(f'{name}.marker')).st_mtime_ns
+    except OSError:
+        return 0
@@ -0,0 +1,106 @@
+"""Burn-rate forecasting: days of cover and reorder suggestions per SKU.
+
+Daily consumption comes from the ``inventory_rollups`` day buckets (one row per
+SKU and day instead of every ledger row) and is laid out as a SKU x day NumPy
+matrix, so demand, variability, cover and reorder quantities for every SKU are
+computed in a handful of array operations.
+"""
+
+from datetime import datetime, timedelta, timezone
+import math
+
+import numpy as np
+
+from app import db
+from app.models import InventoryMovement, InventoryRollup, Sku
+
+DEFAULT_WINDOW_DAYS = 28
+RECENT_DAYS = 7
+DEFAULT_LEAD_TIME_DAYS = 7
+DEFAULT_REVIEW_DAYS = 7
+DEFAULT_SERVICE_Z = 1.65  # ~95% cycle service level
+
+
+def _daily_consumption(window_days, today):
+    """Return ``(keys, matrix)``: SKU keys and a ``len(keys) x window_days`` array of units consumed per day."""
+    start = today - timedelta(days=window_days)
+    rows = (
+        db.session.query(InventoryRollup.sku_id, InventoryRollup.bucket_start, InventoryRollup.quantity)
+        .filter(
+            InventoryRollup.period == 'day',
+            InventoryRollup.movement_type == 'consumption',
+            InventoryRollup.bucket_start >= start,
+            InventoryRollup.bucket_start < today,
+        )
+        .all()
+    )
+    sku_ids = sorted({row.sku_id for row in rows})
+    keys_by_id = Sku.keys_for(sku_ids)
+    keys = [keys_by_id[sku_id] for sku_id in sku_ids]
+    matrix = np.zeros((len(sku_ids), window_days))
+    if rows:
+        position = {sku_id: index for index, sku_id in enumerate(sku_ids)}
+        sku_index = np.fromiter((position[row.sku_id] for row in rows), dtype=np.intp, count=len(rows))
+        day_index = np.fromiter(((row.bucket_start - start).days for row in rows), dtype=np.intp, count=len(rows))
+        # Consumption is booked as negative deltas.
+        units = -np.fromiter((row.quantity for row in rows), dtype=float, count=len(rows))
+        np.add.at(matrix, (sku_index, day_index), units)
+    return keys, matrix
+
+
+def forecast(window_days=DEFAULT_WINDOW_DAYS, lead_time_days=DEFAULT_LEAD_TIME_DAYS,
+             review_days=DEFAULT_REVIEW_DAYS, service_z=DEFAULT_SERVICE_Z, today=None):
+    """
+    Forecast every SKU with stock or recent consumption.
+
+    Rows are sorted by days of cover, soonest stock-out first; SKUs without
+    demand have ``days_of_cover`` and ``stockout_date`` of ``None``.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    consumed_keys, consumed = _daily_consumption(window_days, today)
+    on_hand_by_key = {
+        (row['cable_type'], row['cable_length']): row['on_hand'] for row in InventoryMovement.summary_on_hand()
+    }
+
+    keys = sorted(set(consumed_keys) | set(on_hand_by_key))
+    if not keys:
+        return []
+    matrix = np.zeros((len(keys), window_days))
+    if consumed_keys:
+        row_for_key = {key: index for index, key in enumerate(keys)}
+        matrix[[row_for_key[key] for key in consumed_keys]] = consumed
+    on_hand = np.array([on_hand_by_key.get(key, 0) for key in keys], dtype=float)
+
+    demand = matrix.mean(axis=1)
+    recent_demand = matrix[:, -min(RECENT_DAYS, window_days):].mean(axis=1)
+    demand_std = matrix.std(axis=1)
+    has_demand = demand > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cover = np.where(has_demand, np.maximum(on_hand, 0) / demand, np.inf)
+    safety_stock = service_z * demand_std * math.sqrt(lead_time_days)
+    reorder_point = demand * lead_time_days + safety_stock
+    order_up_to = reorder_point + demand * review_days
+    needs_reorder = has_demand & (on_hand <= reorder_point)
+    suggested = np.where(needs_reorder, np.ceil(np.maximum(order_up_to - on_hand, 0)), 0)
+
+    results = []
+    for index in np.lexsort((np.arange(len(keys)), cover)):
+        days_of_cover = float(cover[index]) if has_demand[index] else None
+        results.append(
+            {
+                'cable_type': keys[index][0],
+                'cable_length': keys[index][1],
+                'on_hand': int(on_hand[index]),
+                'avg_daily_demand': round(float(demand[index]), 3),
+                'recent_daily_demand': round(float(recent_demand[index]), 3),
+                'demand_std': round(float(demand_std[index]), 3),
+                'days_of_cover': round(days_of_cover, 1) if days_of_cover is not None else None,
+                'stockout_date': (
+                    (today + timedelta(days=int(days_of_cover))).isoformat() if days_of_cover is not None else None
+                ),
+                'reorder_point': round(float(reorder_point[index]), 1),
+                'needs_reorder': bool(needs_reorder[index]),
+                'suggested_order_quantity': int(suggested[index]),
+            }
+        )
+    return results
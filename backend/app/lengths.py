@@ -0,0 +1,54 @@
+"""Parse free-text cable lengths ("100m", "3 ft", "6in", "1.5 metres") into meters.
+
+``cable_length`` stays the string the user typed; the parsed value is stored
+next to it so footage can be summed and range-filtered in SQL. Strings without
+a recognised unit parse to ``None`` rather than guessing one.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+import re
+
+METERS_PER_UNIT = {
+    'mm': Decimal('0.001'),
+    'millimeter': Decimal('0.001'),
+    'millimetre': Decimal('0.001'),
+    'cm': Decimal('0.01'),
+    'centimeter': Decimal('0.01'),
+    'centimetre': Decimal('0.01'),
+    'm': Decimal('1'),
+    'meter': Decimal('1'),
+    'metre': Decimal('1'),
+    'km': Decimal('1000'),
+    'kilometer': Decimal('1000'),
+    'kilometre': Decimal('1000'),
+    'in': Decimal('0.0254'),
+    'inch': Decimal('0.0254'),
+    'inches': Decimal('0.0254'),
+    '"': Decimal('0.0254'),
+    'ft': Decimal('0.3048'),
+    'foot': Decimal('0.3048'),
+    'feet': Decimal('0.3048'),
+    "'": Decimal('0.3048'),
+    'yd': Decimal('0.9144'),
+    'yard': Decimal('0.9144'),
+}
+_LENGTH_RE = re.compile(r'^\s*(\d+(?:\.\d+)?|\.\d+)\s*([a-z]+|"|\')\.?\s*$', re.IGNORECASE)
+_PRECISION = Decimal('0.001')
+
+
+def parse_length_meters(value):
+    """Return ``value`` in meters as a ``Decimal`` rounded to millimetres, or ``None`` if unparseable."""
+    if value is None:
+        return None
+    match = _LENGTH_RE.match(str(value))
+    if not match:
+        return None
+    number, unit = match.groups()
+    unit = unit.lower()
+    factor = METERS_PER_UNIT.get(unit) or METERS_PER_UNIT.get(unit[:-1] if unit.endswith('s') else None)
+    if factor is None:
+        return None
+    try:
+        return (Decimal(number) * factor).quantize(_PRECISION, rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        return None
@@ -0,0 +1,114 @@
+"""Per-request latency, SQL and response-size metrics in Prometheus format.
+
+``init_app`` times every request and counts the SQL statements it issues
+(including the ones hidden behind ``lazy='joined'`` relationships). Samples are
+labelled by URL rule, so ``/api/tickets/<int:ticket_id>`` is one series rather
+than one per id.
+
+When ``PROMETHEUS_MULTIPROC_DIR`` is set before the app is imported (the
+entrypoint does this for gunicorn), each worker writes its samples to that
+directory and ``render_latest`` aggregates all of them, so a scrape that lands
+on any worker reports totals for the whole server.
+"""
+
+import os
+import time
+
+from flask import g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, 250)
+RESPONSE_BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds',
+    'Request latency from the first hook to the response being built.',
+    ['endpoint', 'method', 'status'],
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries',
+    'SQL statements executed per request.',
+    ['endpoint', 'method'],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    'http_request_db_seconds',
+    'Time per request spent executing SQL statements.',
+    ['endpoint', 'method'],
+)
+RESPONSE_BYTES = Histogram(
+    'http_response_bytes',
+    'Response body size; streamed responses are not measured.',
+    ['endpoint', 'method'],
+    buckets=RESPONSE_BYTES_BUCKETS,
+)
+
+
+def _endpoint_label():
+    rule = request.url_rule
+    return rule.rule if rule is not None else 'unmatched'
+
+
+def _before_request():
+    g.metrics_started = time.perf_counter()
+    g.metrics_queries = 0
+    g.metrics_db_seconds = 0.0
+
+
+def _after_request(response):
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return response
+
+    endpoint = _endpoint_label()
+    method = request.method
+    REQUEST_SECONDS.labels(endpoint, method, str(response.status_code)).observe(time.perf_counter() - started)
+    REQUEST_QUERIES.labels(endpoint, method).observe(g.pop('metrics_queries', 0))
+    REQUEST_DB_SECONDS.labels(endpoint, method).observe(g.pop('metrics_db_seconds', 0.0))
+    if not response.is_streamed:
+        RESPONSE_BYTES.labels(endpoint, method).observe(response.calculate_content_length() or 0)
+    return response
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['metrics_query_started'].pop()
+    if has_request_context() and 'metrics_queries' in g:
+        g.metrics_queries += 1
+        g.metrics_db_seconds += time.perf_counter() - started
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('metrics_query_started'):
+        connection.info['metrics_query_started'].pop()
+
+
+def init_app(app):
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+
+def render_latest():
+    """Return ``(body, content_type)`` for the current metrics, merged across workers when configured."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
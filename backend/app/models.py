@@ -1,16 +1,67 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 import secrets
 
 from flask_login import UserMixin
-from sqlalchemy import func
-
-from app import db, login_manager
+from sqlalchemy import Date, case, cast, func, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import selectinload
+
+from app import after_commit, commit_session, db, login_manager
+from app.balance_cache import balance_cache, mark_changed as mark_balances_changed
+from app.cache import invalidate_dashboard_stats, invalidate_inventory_views
+from app.lengths import parse_length_meters
+from app.optics_catalog import (
+    DEFAULT_KIT_BOMS,
+    DEFAULT_PARTS,
+    CatalogSnapshot,
+    catalog_cache,
+    mark_changed as mark_catalog_changed,
+)
+from app.sku_cache import remember as remember_skus, sku_cache, staged as staged_skus
 
 
 def _utcnow():
     return datetime.now(timezone.utc)
 
 
+def _as_utc(value):
+    """SQLite hands back naive datetimes for timezone-aware columns; they are stored in UTC."""
+    return value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _iter_created_range(query, column, created_from=None, created_to=None, batch_size=1000):
+    """Stream ``query`` rows inside ``[created_from, created_to)`` in id order, ``batch_size`` at a time."""
+    if created_from is not None:
+        query = query.filter(column >= created_from)
+    if created_to is not None:
+        query = query.filter(column < created_to)
+    entity = query.column_descriptions[0]['entity']
+    return query.order_by(entity.id.asc()).yield_per(batch_size)
+
+
+def _dialect_insert():
+    """``insert`` construct with ``on_conflict_*`` support for the bound database."""
+    dialect = db.session.get_bind().dialect.name
+    return postgresql.insert if dialect == 'postgresql' else sqlite.insert
+
+
+def _upsert_increments(model, key_columns, rows, increment_columns):
+    """
+    Insert ``rows`` into ``model`` or add their ``increment_columns`` onto existing rows.
+
+    The increment is applied by the database (``col = col + excluded.col``) so
+    concurrent writers cannot lose updates. Runs in the caller's transaction.
+    Rows are sent as one executemany, so large lists reuse a single compiled statement.
+    """
+    if not rows:
+        return
+    stmt = _dialect_insert()(model.__table__)
+    set_ = {column: getattr(model.__table__.c, column) + stmt.excluded[column] for column in increment_columns}
+    if 'updated_at' in model.__table__.c:
+        set_['updated_at'] = stmt.excluded.updated_at
+    db.session.execute(stmt.on_conflict_do_update(index_elements=key_columns, set_=set_), rows)
+
+
 @login_manager.user_loader
 def load_user(user_id):
     try:
@@ -52,7 +103,7 @@ class User(UserMixin, db.Model):
             role=role,
         )
         db.session.add(user)
-        db.session.commit()
+        commit_session()
         return user
 
     @classmethod
@@ -94,6 +145,17 @@ class Ticket(db.Model):
     creator_rel = db.relationship('User', foreign_keys=[created_by_id], lazy='joined')
     assignee_rel = db.relationship('User', foreign_keys=[assigned_to_id], lazy='joined')
 
+    # Keyset pagination walks (created_at, id) descending, optionally behind an
+    # equality filter, so each filter gets an index with that suffix.
+    __table_args__ = (
+        db.Index('ix_tickets_created_at_id', 'created_at', 'id'),
+        db.Index('ix_tickets_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_tickets_assigned_to_created_at_id', 'assigned_to_id', 'created_at', 'id'),
+        db.Index('ix_tickets_created_by_created_at_id', 'created_by_id', 'created_at', 'id'),
+        db.Index('ix_tickets_priority_created_at_id', 'priority', 'created_at', 'id'),
+        db.Index('ix_tickets_location_created_at_id', 'location', 'created_at', 'id'),
+    )
+
     @property
     def creator(self):
         return self.creator_rel
@@ -122,6 +184,22 @@ class Ticket(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
         }
 
+    def item_quantities(self):
+        """Requested quantity per ``(cable_type, cable_length)``, skipping malformed items."""
+        quantities = {}
+        for item in self.items or []:
+            cable_type = (item.get('cable_type') or '').strip()
+            cable_length = (item.get('cable_length') or '').strip()
+            try:
+                quantity = int(item.get('quantity', 0))
+            except (TypeError, ValueError):
+                continue
+            if not cable_type or not cable_length or quantity <= 0:
+                continue
+            key = (cable_type, cable_length)
+            quantities[key] = quantities.get(key, 0) + quantity
+        return quantities
+
     @classmethod
     def create(cls, created_by_id, assigned_to_id, items, location=None, notes=None, priority='medium'):
         now = _utcnow()
@@ -142,7 +220,9 @@ class Ticket(db.Model):
             updated_at=now,
         )
         db.session.add(ticket)
-        db.session.commit()
+        TicketStatusCount.adjust({'pending_approval': 1})
+        commit_session()
+        after_commit(invalidate_dashboard_stats)
         return ticket
 
     @classmethod
@@ -156,6 +236,53 @@ class Ticket(db.Model):
             query = query.filter(cls.status != 'deleted')
         return query.order_by(cls.created_at.desc()).all()
 
+    @classmethod
+    def page(
+        cls,
+        include_deleted=False,
+        status=None,
+        assigned_to_id=None,
+        created_by_id=None,
+        priority=None,
+        location=None,
+        created_from=None,
+        created_to=None,
+        cursor=None,
+        limit=50,
+    ):
+        """
+        Return one page of tickets, newest first, and the cursor for the next page.
+
+        ``cursor`` is the ``(created_at, id)`` of the last row on the previous
+        page; the next cursor is ``None`` once the final page is reached.
+        """
+        query = cls.query
+        if status:
+            query = query.filter(cls.status == status)
+        elif not include_deleted:
+            query = query.filter(cls.status != 'deleted')
+        if assigned_to_id is not None:
+            query = query.filter(cls.assigned_to_id == assigned_to_id)
+        if created_by_id is not None:
+            query = query.filter(cls.created_by_id == created_by_id)
+        if priority:
+            query = query.filter(cls.priority == priority)
+        if location:
+            query = query.filter(cls.location == location)
+        if created_from is not None:
+            query = query.filter(cls.created_at >= created_from)
+        if created_to is not None:
+            query = query.filter(cls.created_at < created_to)
+        if cursor is not None:
+            query = query.filter(tuple_(cls.created_at, cls.id) < tuple(cursor))
+
+        rows = query.order_by(cls.created_at.desc(), cls.id.desc()).limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = (rows[-1].created_at, rows[-1].id)
+        return rows, next_cursor
+
     @classmethod
     def update_fields(cls, ticket_id, updates):
         ticket = cls.get(ticket_id)
@@ -163,9 +290,16 @@ class Ticket(db.Model):
             return None
         updates = dict(updates or {})
         updates['updated_at'] = _utcnow()
+        old_status = ticket.status
         for key, value in updates.items():
             setattr(ticket, key, value)
-        db.session.commit()
+        status_changed = ticket.status != old_status
+        if status_changed:
+            TicketStatusCount.adjust({old_status: -1, ticket.status: 1})
+            StockReservation.sync(ticket, old_status)
+        commit_session()
+        if status_changed:
+            after_commit(invalidate_dashboard_stats)
         return ticket
 
     @classmethod
@@ -176,13 +310,17 @@ class Ticket(db.Model):
                 matched_count = 0
             return Result()
 
+        TicketStatusCount.adjust({ticket.status: -1, 'deleted': 1})
+        old_status = ticket.status
         ticket.status = 'deleted'
+        StockReservation.sync(ticket, old_status)
         ticket.deleted_at = _utcnow()
         ticket.updated_at = _utcnow()
         ticket.deleted_previous_status = previous_status
         if deleted_by_id is not None:
             ticket.deleted_by_id = deleted_by_id
-        db.session.commit()
+        commit_session()
+        after_commit(invalidate_dashboard_stats)
 
         class Result:
             matched_count = 1
@@ -200,7 +338,10 @@ class Ticket(db.Model):
         ticket.deleted_at = None
         ticket.deleted_by_id = None
         ticket.deleted_previous_status = None
-        db.session.commit()
+        TicketStatusCount.adjust({'deleted': -1, ticket.status: 1})
+        StockReservation.sync(ticket, 'deleted')
+        commit_session()
+        after_commit(invalidate_dashboard_stats)
         return ticket
 
     @classmethod
@@ -210,23 +351,67 @@ class Ticket(db.Model):
             class Result:
                 deleted_count = 0
             return Result()
+        TicketStatusCount.adjust({ticket.status: -1})
         db.session.delete(ticket)
-        db.session.commit()
+        commit_session()
+        after_commit(invalidate_dashboard_stats)
 
         class Result:
             deleted_count = 1
         return Result()
 
     @classmethod
-    def count_all(cls, include_deleted=False):
-        query = cls.query
-        if not include_deleted:
-            query = query.filter(cls.status != 'deleted')
-        return query.count()
+    def iter_export(cls, created_from=None, created_to=None, batch_size=1000):
+        # Joined eager loads cannot stream; load users once per batch instead.
+        query = cls.query.options(selectinload(cls.creator_rel), selectinload(cls.assignee_rel))
+        return _iter_created_range(query, cls.created_at, created_from, created_to, batch_size)
 
     @classmethod
-    def count_by_status(cls, status):
-        return cls.query.filter_by(status=status).count()
+    def status_counts(cls):
+        """Ticket count per status (including ``deleted``) from one GROUP BY scan."""
+        rows = db.session.query(cls.status, func.count(cls.id)).group_by(cls.status).all()
+        return {status: int(count) for status, count in rows}
+
+
+class TicketStatusCount(db.Model):
+    """Ticket count per status, adjusted by every Ticket write that changes status."""
+
+    __tablename__ = 'ticket_status_counts'
+
+    status = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow)
+
+    @classmethod
+    def adjust(cls, deltas):
+        """Apply ``{status: delta}`` in the current transaction; the caller commits."""
+        now = _utcnow()
+        _upsert_increments(
+            cls,
+            ['status'],
+            [
+                {'status': status, 'count': delta, 'updated_at': now}
+                for status, delta in sorted(deltas.items())
+                if delta
+            ],
+            ['count'],
+        )
+
+    @classmethod
+    def counts(cls):
+        return {row.status: row.count for row in cls.query.all() if row.count}
+
+    @classmethod
+    def rebuild(cls):
+        """Reset the counters from a full ``Ticket.status_counts()`` scan."""
+        now = _utcnow()
+        cls.query.delete(synchronize_session=False)
+        db.session.add_all(
+            cls(status=status, count=count, updated_at=now)
+            for status, count in sorted(Ticket.status_counts().items())
+        )
+        commit_session()
+        after_commit(invalidate_dashboard_stats)
 
 
 class Notification(db.Model):
@@ -271,13 +456,142 @@ class Notification(db.Model):
             created_at=_utcnow(),
         )
         db.session.add(item)
-        db.session.commit()
+        commit_session()
         return item
 
     @classmethod
     def delete_by_ticket_id(cls, ticket_id):
+        notification_ids = db.session.query(cls.id).filter_by(ticket_id=ticket_id)
+        NotificationOutbox.query.filter(NotificationOutbox.notification_id.in_(notification_ids)).update(
+            {'notification_id': None},
+            synchronize_session=False,
+        )
         cls.query.filter_by(ticket_id=ticket_id).delete(synchronize_session=False)
-        db.session.commit()
+        commit_session()
+
+
+class NotificationOutbox(db.Model):
+    """
+    Outgoing SMS/email messages waiting for the notification worker.
+
+    Rows are added in the same transaction as the change that triggered them
+    and delivered later by ``notification_worker.py``.
+    """
+
+    __tablename__ = 'notification_outbox'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    channel = db.Column(db.String(20), nullable=False)
+    recipient = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=True)
+    body = db.Column(db.Text, nullable=False)
+    notification_id = db.Column(
+        db.Integer,
+        db.ForeignKey('notifications.id', ondelete='SET NULL'),
+        nullable=True,
+        index=True,
+    )
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow)
+    locked_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    sent_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow)
+
+    notification_rel = db.relationship('Notification', foreign_keys=[notification_id])
+
+    __table_args__ = (
+        db.Index('ix_notification_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+    def to_message(self):
+        return {
+            'id': self.id,
+            'channel': self.channel,
+            'recipient': self.recipient,
+            'subject': self.subject,
+            'body': self.body,
+            'attempts': self.attempts,
+        }
+
+    @classmethod
+    def enqueue(cls, channel, recipient, body, subject=None, notification=None):
+        """Stage a message in the current transaction; the caller commits."""
+        now = _utcnow()
+        row = cls(
+            channel=channel,
+            recipient=recipient,
+            subject=subject,
+            body=body,
+            notification_rel=notification,
+            status='pending',
+            attempts=0,
+            next_attempt_at=now,
+            created_at=now,
+        )
+        db.session.add(row)
+        return row
+
+    @classmethod
+    def claim_due(cls, limit, lease_seconds):
+        """
+        Lock up to ``limit`` due messages for delivery and return them.
+
+        Rows stuck in ``sending`` longer than ``lease_seconds`` (a worker died
+        mid-batch) are claimed again.
+        """
+        now = _utcnow()
+        stale_before = now - timedelta(seconds=lease_seconds)
+        query = (
+            cls.query.filter(
+                db.or_(
+                    db.and_(cls.status == 'pending', cls.next_attempt_at <= now),
+                    db.and_(cls.status == 'sending', cls.locked_at <= stale_before),
+                )
+            )
+            .order_by(cls.next_attempt_at.asc(), cls.id.asc())
+            .limit(limit)
+        )
+        if db.session.get_bind().dialect.name == 'postgresql':
+            query = query.with_for_update(skip_locked=True)
+        rows = query.all()
+        for row in rows:
+            row.status = 'sending'
+            row.locked_at = now
+            row.attempts += 1
+        commit_session()
+        return rows
+
+    @classmethod
+    def mark_sent(cls, row_id):
+        """Record a delivered message and its linked notification. The caller commits."""
+        row = db.session.get(cls, row_id)
+        now = _utcnow()
+        row.status = 'sent'
+        row.sent_at = now
+        row.locked_at = None
+        row.last_error = None
+        if row.notification_rel:
+            row.notification_rel.status = 'sent'
+            row.notification_rel.sent_at = now
+            row.notification_rel.error_message = None
+
+    @classmethod
+    def mark_failed(cls, row_id, error_message, retry_at=None):
+        """Record a failed attempt; ``retry_at=None`` makes the failure final. The caller commits."""
+        row = db.session.get(cls, row_id)
+        row.status = 'pending' if retry_at else 'failed'
+        row.next_attempt_at = retry_at or row.next_attempt_at
+        row.locked_at = None
+        row.last_error = error_message
+        if row.notification_rel:
+            row.notification_rel.status = row.status
+            row.notification_rel.error_message = error_message
+
+    @classmethod
+    def count_by_status(cls, status):
+        return cls.query.filter_by(status=status).count()
 
 
 class CableReceipt(db.Model):
@@ -327,7 +641,7 @@ class CableReceipt(db.Model):
             created_at=now,
         )
         db.session.add(item)
-        db.session.commit()
+        commit_session()
         return item
 
     @classmethod
@@ -338,15 +652,143 @@ class CableReceipt(db.Model):
     def get(cls, receipt_id):
         return db.session.get(cls, receipt_id)
 
+    @classmethod
+    def iter_export(cls, created_from=None, created_to=None, batch_size=1000):
+        query = cls.query.options(selectinload(cls.receiver_rel))
+        return _iter_created_range(query, cls.received_at, created_from, created_to, batch_size)
+
     @classmethod
     def delete_by_id(cls, receipt_id):
         item = cls.get(receipt_id)
         if item:
             db.session.delete(item)
-            db.session.commit()
+            commit_session()
+
 
+class OpticsQueueMixin:
+    """Kit orders, queue listing and bulk status changes shared by ``OpticsRequest`` and ``OpticsReturn``."""
 
-class OpticsRequest(db.Model):
+    @classmethod
+    def create_kit(cls, requested_by_id, line_items, requester_name):
+        """Insert every component of a kit order in one flush under a new ``kit_order_id``."""
+        now = _utcnow()
+        kit_order_id = secrets.token_hex(16)
+        rows = [
+            cls(
+                part_number=item['part_number'],
+                quantity=int(item['quantity']),
+                requester_name=requester_name,
+                requested_by_id=requested_by_id,
+                status='pending',
+                kit_order_id=kit_order_id,
+                created_at=now,
+                updated_at=now,
+            )
+            for item in line_items
+        ]
+        db.session.add_all(rows)
+        commit_session()
+        return rows
+
+    @classmethod
+    def for_kit_order(cls, kit_order_id):
+        return cls.query.filter_by(kit_order_id=kit_order_id).order_by(cls.id.asc()).all()
+
+    @classmethod
+    def _filtered(
+        cls,
+        actor,
+        status=None,
+        part_number=None,
+        requested_by_id=None,
+        include_archived=False,
+        created_from=None,
+        created_to=None,
+    ):
+        query = cls.query
+        if actor.role != 'admin':
+            query = query.filter_by(requested_by_id=actor.id)
+        elif requested_by_id is not None:
+            query = query.filter_by(requested_by_id=requested_by_id)
+        if status:
+            query = query.filter_by(status=status)
+        elif not include_archived:
+            query = query.filter(cls.status != 'archived')
+        if part_number:
+            query = query.filter_by(part_number=part_number)
+        if created_from is not None:
+            query = query.filter(cls.created_at >= created_from)
+        if created_to is not None:
+            query = query.filter(cls.created_at < created_to)
+        return query
+
+    @classmethod
+    def all_for_actor(cls, actor, **filters):
+        """Every row of the actor's queue, newest first; ``filters`` are those of ``page``."""
+        return cls._filtered(actor, **filters).order_by(cls.created_at.desc(), cls.id.desc()).all()
+
+    @classmethod
+    def page(cls, actor, cursor=None, limit=50, **filters):
+        """
+        Return one page of the actor's queue, newest first, and the cursor for the next page.
+
+        Same contract as ``Ticket.page``. ``filters`` are ``status``,
+        ``part_number``, ``requested_by_id``, ``include_archived``,
+        ``created_from`` and ``created_to``. Non-admins only ever see their own
+        rows; archived rows are left out unless asked for by status or
+        ``include_archived``.
+        """
+        query = cls._filtered(actor, **filters)
+        if cursor is not None:
+            query = query.filter(tuple_(cls.created_at, cls.id) < tuple(cursor))
+
+        rows = query.order_by(cls.created_at.desc(), cls.id.desc()).limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = (rows[-1].created_at, rows[-1].id)
+        return rows, next_cursor
+
+    @classmethod
+    def set_status_many(cls, ids, status, admin_actor_id, admin_note=None):
+        """
+        Apply one admin action to the rows in ``ids`` with a single UPDATE.
+
+        Rows already in ``status`` are left untouched. Returns
+        ``(updated_rows, unchanged_ids)``; updated rows are ordered by id and
+        ids that do not exist appear in neither.
+        """
+        now = _utcnow()
+        stmt = (
+            db.update(cls)
+            .where(cls.id.in_(ids), cls.status != status)
+            .values(
+                status=status,
+                admin_action_by_id=admin_actor_id,
+                admin_action_at=now,
+                updated_at=now,
+                admin_note=admin_note,
+                archived_at=now if status == 'archived' else None,
+            )
+            .returning(cls.id)
+        )
+        updated_ids = set(db.session.execute(stmt, execution_options={'synchronize_session': False}).scalars())
+        commit_session()
+        updated = []
+        if updated_ids:
+            updated = (
+                cls.query.filter(cls.id.in_(updated_ids))
+                .order_by(cls.id.asc())
+                .execution_options(populate_existing=True)
+                .all()
+            )
+        unchanged_ids = {
+            row_id for (row_id,) in db.session.query(cls.id).filter(cls.id.in_(ids), cls.status == status)
+        } - updated_ids
+        return updated, unchanged_ids
+
+
+class OpticsRequest(OpticsQueueMixin, db.Model):
     __tablename__ = 'optics_requests'
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -359,12 +801,20 @@ class OpticsRequest(db.Model):
     archived_at = db.Column(db.DateTime(timezone=True), nullable=True)
     admin_action_by_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)
     admin_action_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    # Shared by the component rows of one kit order; NULL for single-part orders.
+    kit_order_id = db.Column(db.String(32), nullable=True, index=True)
     created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow, index=True)
     updated_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow)
 
     requester_rel = db.relationship('User', foreign_keys=[requested_by_id], lazy='joined')
     admin_actor_rel = db.relationship('User', foreign_keys=[admin_action_by_id], lazy='joined')
 
+    # Queue pages walk (created_at, id) descending, as on tickets.
+    __table_args__ = (
+        db.Index('ix_optics_requests_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_optics_requests_requester_created_at_id', 'requested_by_id', 'created_at', 'id'),
+    )
+
     @property
     def requester(self):
         return self.requester_rel
@@ -383,6 +833,7 @@ class OpticsRequest(db.Model):
             'requester_name': self.requester_name,
             'requested_by': requester.to_dict() if requester else None,
             'status': self.status,
+            'kit_order_id': self.kit_order_id,
             'admin_note': self.admin_note,
             'archived_at': self.archived_at.isoformat() if self.archived_at else None,
             'admin_action_by': admin_actor.to_dict() if admin_actor else None,
@@ -404,20 +855,13 @@ class OpticsRequest(db.Model):
             updated_at=now,
         )
         db.session.add(row)
-        db.session.commit()
+        commit_session()
         return row
 
     @classmethod
     def get(cls, request_id):
         return db.session.get(cls, request_id)
 
-    @classmethod
-    def all_for_actor(cls, actor):
-        query = cls.query
-        if actor.role != 'admin':
-            query = query.filter_by(requested_by_id=actor.id)
-        return query.order_by(cls.created_at.desc()).all()
-
     @classmethod
     def set_status(cls, request_id, status, admin_actor_id, admin_note=None):
         row = cls.get(request_id)
@@ -431,11 +875,11 @@ class OpticsRequest(db.Model):
         row.updated_at = now
         row.admin_note = admin_note
         row.archived_at = now if status == 'archived' else None
-        db.session.commit()
+        commit_session()
         return row
 
 
-class OpticsReturn(db.Model):
+class OpticsReturn(OpticsQueueMixin, db.Model):
     __tablename__ = 'optics_returns'
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -448,12 +892,20 @@ class OpticsReturn(db.Model):
     archived_at = db.Column(db.DateTime(timezone=True), nullable=True)
     admin_action_by_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)
     admin_action_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    # Shared by the component rows of one kit order; NULL for single-part orders.
+    kit_order_id = db.Column(db.String(32), nullable=True, index=True)
     created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow, index=True)
     updated_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow)
 
     requester_rel = db.relationship('User', foreign_keys=[requested_by_id], lazy='joined')
     admin_actor_rel = db.relationship('User', foreign_keys=[admin_action_by_id], lazy='joined')
 
+    # Queue pages walk (created_at, id) descending, as on tickets.
+    __table_args__ = (
+        db.Index('ix_optics_returns_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_optics_returns_requester_created_at_id', 'requested_by_id', 'created_at', 'id'),
+    )
+
     @property
     def requester(self):
         return self.requester_rel
@@ -472,6 +924,7 @@ class OpticsReturn(db.Model):
             'requester_name': self.requester_name,
             'requested_by': requester.to_dict() if requester else None,
             'status': self.status,
+            'kit_order_id': self.kit_order_id,
             'admin_note': self.admin_note,
             'archived_at': self.archived_at.isoformat() if self.archived_at else None,
             'admin_action_by': admin_actor.to_dict() if admin_actor else None,
@@ -493,20 +946,13 @@ class OpticsReturn(db.Model):
             updated_at=now,
         )
         db.session.add(row)
-        db.session.commit()
+        commit_session()
         return row
 
     @classmethod
     def get(cls, request_id):
         return db.session.get(cls, request_id)
 
-    @classmethod
-    def all_for_actor(cls, actor):
-        query = cls.query
-        if actor.role != 'admin':
-            query = query.filter_by(requested_by_id=actor.id)
-        return query.order_by(cls.created_at.desc()).all()
-
     @classmethod
     def set_status(cls, request_id, status, admin_actor_id, admin_note=None):
         row = cls.get(request_id)
@@ -520,23 +966,337 @@ class OpticsReturn(db.Model):
         row.updated_at = now
         row.admin_note = admin_note
         row.archived_at = now if status == 'archived' else None
-        db.session.commit()
+        commit_session()
         return row
 
 
+class OpticsCatalogState(db.Model):
+    """Single row holding the catalog version; bumped by every catalog edit."""
+
+    __tablename__ = 'optics_catalog_state'
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow)
+
+    @classmethod
+    def current_version(cls):
+        return db.session.query(cls.version).filter_by(id=1).scalar() or 0
+
+    @classmethod
+    def bump(cls):
+        """Advance the version in the current transaction; workers reload once it commits."""
+        stmt = _dialect_insert()(cls.__table__).values(id=1, version=1, updated_at=_utcnow())
+        db.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=['id'],
+                set_={'version': cls.__table__.c.version + 1, 'updated_at': stmt.excluded.updated_at},
+            )
+        )
+        mark_catalog_changed(db.session)
+
+
+class OpticsPart(db.Model):
+    """Orderable optics part; a part with components is a kit, and kits may contain kits."""
+
+    __tablename__ = 'optics_parts'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    part_number = db.Column(db.String(255), nullable=False, unique=True)
+    active = db.Column(db.Boolean, nullable=False, default=True)
+    sort_order = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow)
+
+    def to_dict(self, snapshot=None):
+        snapshot = snapshot or self.catalog()
+        return {
+            'part_number': self.part_number,
+            'active': self.active,
+            'components': [
+                {'part_number': component, 'quantity': quantity}
+                for component, quantity in snapshot.components(self.part_number)
+            ],
+        }
+
+    @classmethod
+    def catalog(cls):
+        """The current ``CatalogSnapshot``, served from the per-process cache."""
+        return catalog_cache.get(cls._load_catalog)
+
+    @classmethod
+    def _load_catalog(cls):
+        version = OpticsCatalogState.current_version()
+        parts = cls.query.order_by(cls.sort_order.asc(), cls.id.asc()).all()
+        part_numbers = {part.id: part.part_number for part in parts}
+        components = {}
+        for row in OpticsKitComponent.query.order_by(OpticsKitComponent.kit_id, OpticsKitComponent.position):
+            components.setdefault(part_numbers[row.kit_id], []).append(
+                (part_numbers[row.component_id], row.quantity)
+            )
+        return CatalogSnapshot(version, [part.part_number for part in parts if part.active], components)
+
+    @classmethod
+    def get(cls, part_number):
+        return cls.query.filter_by(part_number=part_number).first()
+
+    @classmethod
+    def create(cls, part_number, components=None, sort_order=None):
+        now = _utcnow()
+        if sort_order is None:
+            sort_order = (db.session.query(func.max(cls.sort_order)).scalar() or 0) + 1
+        part = cls(part_number=part_number, active=True, sort_order=sort_order, created_at=now, updated_at=now)
+        db.session.add(part)
+        db.session.flush()
+        if components:
+            cls._replace_components(part, components)
+        OpticsCatalogState.bump()
+        commit_session()
+        return part
+
+    @classmethod
+    def update(cls, part, active=None, components=None):
+        if active is not None:
+            part.active = bool(active)
+        if components is not None:
+            cls._replace_components(part, components)
+        part.updated_at = _utcnow()
+        OpticsCatalogState.bump()
+        commit_session()
+        return part
+
+    @classmethod
+    def _replace_components(cls, part, components):
+        """
+        Set ``part``'s BOM to ``[{'part_number', 'quantity'}, ...]``.
+
+        Raises ``KeyError`` for an unknown component and ``CatalogCycleError``
+        if the kit would contain itself; the caller's transaction is left to roll back.
+        """
+        ids = {
+            row.part_number: row.id
+            for row in cls.query.filter(cls.part_number.in_([item['part_number'] for item in components]))
+        }
+        OpticsKitComponent.query.filter_by(kit_id=part.id).delete(synchronize_session=False)
+        for position, item in enumerate(components):
+            if item['part_number'] not in ids:
+                raise KeyError(item['part_number'])
+            db.session.add(
+                OpticsKitComponent(
+                    kit_id=part.id,
+                    component_id=ids[item['part_number']],
+                    quantity=int(item['quantity']),
+                    position=position,
+                )
+            )
+        db.session.flush()
+        cls._load_catalog().flatten(part.part_number)
+
+    @classmethod
+    def seed_defaults(cls):
+        """Insert the built-in parts and kits into an empty catalog."""
+        if cls.query.first() is not None:
+            return
+        now = _utcnow()
+        insert_stmt = _dialect_insert()
+        db.session.execute(
+            insert_stmt(cls.__table__)
+            .values(
+                [
+                    {'part_number': part_number, 'active': True, 'sort_order': index, 'created_at': now, 'updated_at': now}
+                    for index, part_number in enumerate(DEFAULT_PARTS)
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=['part_number'])
+        )
+        ids = {row.part_number: row.id for row in cls.query}
+        component_rows = [
+            {
+                'kit_id': ids[kit],
+                'component_id': ids[item['part_number']],
+                'quantity': item['quantity'],
+                'position': position,
+            }
+            for kit, items in DEFAULT_KIT_BOMS.items()
+            for position, item in enumerate(items)
+        ]
+        if component_rows:
+            db.session.execute(
+                insert_stmt(OpticsKitComponent.__table__)
+                .values(component_rows)
+                .on_conflict_do_nothing(index_elements=['kit_id', 'component_id'])
+            )
+        OpticsCatalogState.bump()
+        commit_session()
+
+
+class OpticsKitComponent(db.Model):
+    """One line of a kit's bill of materials."""
+
+    __tablename__ = 'optics_kit_components'
+
+    kit_id = db.Column(db.Integer, db.ForeignKey('optics_parts.id'), primary_key=True)
+    component_id = db.Column(db.Integer, db.ForeignKey('optics_parts.id'), primary_key=True)
+    quantity = db.Column(db.Integer, nullable=False)
+    position = db.Column(db.Integer, nullable=False, default=0)
+
+
+class Sku(db.Model):
+    """One row per distinct ``(cable_type, cable_length)``; the ledger refers to it by id."""
+
+    __tablename__ = 'skus'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    cable_type = db.Column(db.String(120), nullable=False)
+    cable_length = db.Column(db.String(120), nullable=False)
+    # Parsed from cable_length when the SKU is first seen; NULL when it has no recognised unit.
+    length_meters = db.Column(db.Numeric(12, 3), nullable=True)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('cable_type', 'cable_length', name='uq_skus_type_length'),
+        db.Index('ix_skus_type_length_meters', 'cable_type', 'length_meters'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'cable_type': self.cable_type,
+            'cable_length': self.cable_length,
+            'length_meters': float(self.length_meters) if self.length_meters is not None else None,
+        }
+
+    @classmethod
+    def ids_for(cls, keys):
+        """
+        Map each ``(cable_type, cable_length)`` in ``keys`` to its ``skus.id``.
+
+        Unknown pairs are inserted in the current transaction; the caller commits.
+        """
+        pending = staged_skus(db.session)
+        result = {}
+        missing = []
+        for key in set(keys):
+            sku_id = sku_cache.id_for(key) or pending.get(key)
+            if sku_id is None:
+                missing.append(key)
+            else:
+                result[key] = sku_id
+        if not missing:
+            return result
+
+        now = _utcnow()
+        stmt = _dialect_insert()(cls.__table__).values(
+            [
+                {
+                    'cable_type': cable_type,
+                    'cable_length': cable_length,
+                    'length_meters': parse_length_meters(cable_length),
+                    'created_at': now,
+                }
+                for cable_type, cable_length in sorted(missing)
+            ]
+        )
+        inserted = db.session.execute(
+            stmt.on_conflict_do_nothing(index_elements=['cable_type', 'cable_length'])
+        ).rowcount
+        rows = db.session.query(cls.id, cls.cable_type, cls.cable_length).filter(
+            tuple_(cls.cable_type, cls.cable_length).in_(missing)
+        )
+        found = {(row.cable_type, row.cable_length): row.id for row in rows}
+        remember_skus(db.session, found, inserted=bool(inserted))
+        result.update(found)
+        return result
+
+    @classmethod
+    def keys_for(cls, sku_ids):
+        """Map each id in ``sku_ids`` back to its ``(cable_type, cable_length)``."""
+        pending = {sku_id: key for key, sku_id in staged_skus(db.session).items()}
+        result = {}
+        missing = []
+        for sku_id in set(sku_ids):
+            key = sku_cache.key_for(sku_id) or pending.get(sku_id)
+            if key is None:
+                missing.append(sku_id)
+            else:
+                result[sku_id] = key
+        if missing:
+            rows = db.session.query(cls.id, cls.cable_type, cls.cable_length).filter(cls.id.in_(missing))
+            found = {(row.cable_type, row.cable_length): row.id for row in rows}
+            remember_skus(db.session, found)
+            result.update({sku_id: key for key, sku_id in found.items()})
+        return result
+
+    @classmethod
+    def ids_matching(cls, cable_type=None, cable_length=None, min_meters=None, max_meters=None):
+        query = db.session.query(cls.id)
+        if cable_type:
+            query = query.filter(cls.cable_type == cable_type)
+        if cable_length:
+            query = query.filter(cls.cable_length == cable_length)
+        if min_meters is not None:
+            query = query.filter(cls.length_meters >= min_meters)
+        if max_meters is not None:
+            query = query.filter(cls.length_meters <= max_meters)
+        return [row.id for row in query]
+
+    @classmethod
+    def backfill_lengths(cls):
+        """
+        Parse ``length_meters`` for SKUs that do not have one yet.
+
+        Returns ``(updated, unparsed)`` where ``unparsed`` lists the
+        ``cable_length`` strings that still have no recognised unit.
+        """
+        updated = 0
+        unparsed = []
+        for sku in cls.query.filter(cls.length_meters.is_(None)).order_by(cls.id.asc()):
+            meters = parse_length_meters(sku.cable_length)
+            if meters is None:
+                unparsed.append(sku.cable_length)
+                continue
+            sku.length_meters = meters
+            updated += 1
+        commit_session()
+        return updated, unparsed
+
+
+class InsufficientStockError(ValueError):
+    """A write would take a location below zero; ``shortfalls`` lists each short SKU."""
+
+    def __init__(self, location, shortfalls):
+        super().__init__(f'Insufficient stock at {location}')
+        self.shortfalls = shortfalls
+
+
 class InventoryMovement(db.Model):
     __tablename__ = 'inventory_movements'
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    movement_type = db.Column(db.String(50), nullable=False, index=True)
-    source_type = db.Column(db.String(100), nullable=True, index=True)
+    movement_type = db.Column(db.String(50), nullable=False)
+    source_type = db.Column(db.String(100), nullable=True)
     source_id = db.Column(db.Integer, nullable=True, index=True)
     actor_user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
-    cable_type = db.Column(db.String(120), nullable=False, index=True)
-    cable_length = db.Column(db.String(120), nullable=False, index=True)
+    # Grouping and filtering go through sku_id; the strings are kept for readers of the raw ledger.
+    sku_id = db.Column(db.Integer, db.ForeignKey('skus.id'), nullable=True)
+    cable_type = db.Column(db.String(120), nullable=False)
+    cable_length = db.Column(db.String(120), nullable=False)
     quantity_delta = db.Column(db.Integer, nullable=False)
+    # Storage location the stock entered or left; NULL for rows posted before locations were tracked.
+    location = db.Column(db.String(255), nullable=True)
     notes = db.Column(db.Text, nullable=True)
-    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow, index=True)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow)
+
+    # Source lookups filter on both columns. Listings filter on one column and
+    # walk (created_at, id) descending, so each filter gets an index with that suffix.
+    __table_args__ = (
+        db.Index('ix_inventory_movements_source', 'source_type', 'source_id'),
+        db.Index('ix_inventory_movements_type_created_at', 'movement_type', 'created_at'),
+        db.Index('ix_inventory_movements_created_at_id', 'created_at', 'id'),
+        db.Index('ix_inventory_movements_sku_created_at_id', 'sku_id', 'created_at', 'id'),
+        db.Index('ix_inventory_movements_actor_created_at_id', 'actor_user_id', 'created_at', 'id'),
+        db.Index('ix_inventory_movements_location_created_at_id', 'location', 'created_at', 'id'),
+    )
 
     def to_dict(self):
         return {
@@ -545,9 +1305,11 @@ class InventoryMovement(db.Model):
             'source_type': self.source_type,
             'source_id': self.source_id,
             'actor_user_id': self.actor_user_id,
+            'sku_id': self.sku_id,
             'cable_type': self.cable_type,
             'cable_length': self.cable_length,
             'quantity_delta': self.quantity_delta,
+            'location': self.location,
             'notes': self.notes,
             'created_at': self.created_at.isoformat() if self.created_at else None,
         }
@@ -558,6 +1320,7 @@ class InventoryMovement(db.Model):
             return []
 
         now = _utcnow()
+        sku_ids = Sku.ids_for((raw['cable_type'], raw['cable_length']) for raw in movement_docs)
         rows = []
         for raw in movement_docs:
             rows.append(
@@ -566,23 +1329,86 @@ class InventoryMovement(db.Model):
                     source_type=raw.get('source_type'),
                     source_id=raw.get('source_id'),
                     actor_user_id=raw.get('actor_user_id'),
+                    sku_id=sku_ids[(raw['cable_type'], raw['cable_length'])],
                     cable_type=raw['cable_type'],
                     cable_length=raw['cable_length'],
                     quantity_delta=int(raw['quantity_delta']),
+                    location=(raw.get('location') or '').strip() or None,
                     notes=raw.get('notes'),
                     created_at=now,
                 )
             )
         db.session.add_all(rows)
-        db.session.commit()
+        InventoryBalance.apply_movements(rows)
+        InventoryLocationBalance.apply_movements(rows)
+        InventoryRollup.apply_movements(rows)
+        commit_session()
+        after_commit(invalidate_inventory_views)
         return rows
 
     @classmethod
-    def exists_for_source(cls, source_type, source_id):
-        return cls.query.filter_by(source_type=source_type, source_id=source_id).first() is not None
+    def create_once(cls, source_type, source_id, movement_docs):
+        """
+        Write ``movement_docs`` unless ``(source_type, source_id)`` has already been posted.
+
+        The claim is an insert into ``inventory_postings`` guarded by its
+        primary key, so concurrent requests for the same source cannot both
+        post. Returns the new rows, or ``None`` when the source was already posted.
+        """
+        if not InventoryPosting.claim(source_type, source_id):
+            return None
+        return cls.create_many(movement_docs)
+
+    @classmethod
+    def transfer(cls, from_location, to_location, items, actor_user_id=None, notes=None):
+        """
+        Move ``items`` between locations as one batch of ``transfer`` rows.
+
+        Each item becomes an outgoing row at ``from_location`` and an incoming
+        row at ``to_location``; global on-hand is unchanged.
+
+        The source balances are checked after the decrement is written, in the
+        same transaction: the balance upsert holds the row lock, so a
+        concurrent transfer sees this one's result and cannot also pass.
+        Raises ``InsufficientStockError`` (rolling back the enclosing
+        ``unit_of_work``) if any source balance would go negative.
+        """
+        note = notes or f'Transfer {from_location} -> {to_location}'
+        movement_docs = []
+        for item in items:
+            for location, sign in ((from_location, -1), (to_location, 1)):
+                movement_docs.append(
+                    {
+                        'movement_type': 'transfer',
+                        'source_type': 'inventory_transfer',
+                        'actor_user_id': actor_user_id,
+                        'cable_type': item['cable_type'],
+                        'cable_length': item['cable_length'],
+                        'quantity_delta': sign * int(item['quantity']),
+                        'location': location,
+                        'notes': note,
+                    }
+                )
+        movements = cls.create_many(movement_docs)
+
+        requested = {}
+        for item in items:
+            key = (item['cable_type'], item['cable_length'])
+            requested[key] = requested.get(key, 0) + int(item['quantity'])
+        remaining = InventoryLocationBalance.on_hand_at(from_location, requested)
+        shortfalls = [
+            {'cable_type': key[0], 'cable_length': key[1], 'requested': quantity, 'on_hand': remaining[key] + quantity}
+            for key, quantity in sorted(requested.items())
+            if remaining[key] < 0
+        ]
+        if shortfalls:
+            raise InsufficientStockError(from_location, shortfalls)
+        return movements
 
     @classmethod
-    def list(cls, movement_type=None, source_type=None, source_id=None, limit=200):
+    def _filtered(
+        cls, movement_type=None, source_type=None, source_id=None, sku_ids=None, actor_user_id=None, location=None
+    ):
         query = cls.query
         if movement_type:
             query = query.filter_by(movement_type=movement_type)
@@ -590,25 +1416,1004 @@ class InventoryMovement(db.Model):
             query = query.filter_by(source_type=source_type)
         if source_id is not None:
             query = query.filter_by(source_id=source_id)
+        if sku_ids is not None:
+            query = query.filter(cls.sku_id.in_(sku_ids))
+        if actor_user_id is not None:
+            query = query.filter_by(actor_user_id=actor_user_id)
+        if location:
+            query = query.filter_by(location=location)
+        return query
+
+    @classmethod
+    def list(
+        cls,
+        movement_type=None,
+        source_type=None,
+        source_id=None,
+        sku_ids=None,
+        actor_user_id=None,
+        location=None,
+        limit=200,
+    ):
+        query = cls._filtered(
+            movement_type=movement_type,
+            source_type=source_type,
+            source_id=source_id,
+            sku_ids=sku_ids,
+            actor_user_id=actor_user_id,
+            location=location,
+        )
         return query.order_by(cls.created_at.desc()).limit(limit).all()
 
     @classmethod
-    def summary_on_hand(cls):
-        rows = (
+    def page(
+        cls,
+        movement_type=None,
+        source_type=None,
+        source_id=None,
+        sku_ids=None,
+        actor_user_id=None,
+        location=None,
+        created_from=None,
+        created_to=None,
+        cursor=None,
+        limit=200,
+    ):
+        """
+        Return one page of ledger rows, newest first, and the cursor for the next page.
+
+        Same contract as ``Ticket.page``: ``cursor`` is the ``(created_at, id)``
+        of the previous page's last row, so every page is an index range scan.
+        """
+        query = cls._filtered(
+            movement_type=movement_type,
+            source_type=source_type,
+            source_id=source_id,
+            sku_ids=sku_ids,
+            actor_user_id=actor_user_id,
+            location=location,
+        )
+        if created_from is not None:
+            query = query.filter(cls.created_at >= created_from)
+        if created_to is not None:
+            query = query.filter(cls.created_at < created_to)
+        if cursor is not None:
+            query = query.filter(tuple_(cls.created_at, cls.id) < tuple(cursor))
+
+        rows = query.order_by(cls.created_at.desc(), cls.id.desc()).limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = (rows[-1].created_at, rows[-1].id)
+        return rows, next_cursor
+
+    @classmethod
+    def iter_export(cls, created_from=None, created_to=None, movement_type=None, source_type=None, batch_size=1000):
+        query = cls.query
+        if movement_type:
+            query = query.filter_by(movement_type=movement_type)
+        if source_type:
+            query = query.filter_by(source_type=source_type)
+        return _iter_created_range(query, cls.created_at, created_from, created_to, batch_size)
+
+    @classmethod
+    def summary_on_hand(cls, as_of=None):
+        if as_of is None:
+            return InventoryBalance.summary()
+
+        snapshot = InventorySnapshot.latest(at_or_before=as_of)
+        totals = snapshot.totals() if snapshot else {}
+        for key, delta in cls.totals_between(snapshot.taken_at if snapshot else None, as_of).items():
+            totals[key] = totals.get(key, 0) + delta
+        return [
+            {'cable_type': cable_type, 'cable_length': cable_length, 'on_hand': on_hand}
+            for (cable_type, cable_length), on_hand in sorted(totals.items())
+        ]
+
+    @classmethod
+    def totals_between(cls, after, through):
+        """Net quantity per SKU for movements with ``after < created_at <= through`` (``after=None``: from the start)."""
+        query = db.session.query(cls.sku_id, func.sum(cls.quantity_delta).label('delta')).filter(
+            cls.created_at <= through
+        )
+        if after is not None:
+            query = query.filter(cls.created_at > after)
+        return cls._totals_by_key(query.group_by(cls.sku_id).all())
+
+    @classmethod
+    def footage(cls, movement_type='consumption', created_from=None, created_to=None,
+                cable_type=None, min_meters=None, max_meters=None):
+        """
+        Meters of cable moved per cable type, in one aggregate over the ledger joined to ``skus``.
+
+        ``unparsed_quantity`` counts pieces whose length has no recognised unit
+        and therefore no footage.
+        """
+        pieces = func.abs(cls.quantity_delta)
+        query = (
             db.session.query(
-                cls.cable_type,
-                cls.cable_length,
-                func.sum(cls.quantity_delta).label('on_hand'),
+                Sku.cable_type,
+                func.sum(pieces * Sku.length_meters).label('meters'),
+                func.sum(pieces).label('quantity'),
+                func.sum(case((Sku.length_meters.is_(None), pieces), else_=0)).label('unparsed_quantity'),
             )
-            .group_by(cls.cable_type, cls.cable_length)
-            .order_by(cls.cable_type.asc(), cls.cable_length.asc())
-            .all()
+            .join(Sku, Sku.id == cls.sku_id)
+            .filter(cls.movement_type == movement_type)
         )
+        if created_from is not None:
+            query = query.filter(cls.created_at >= created_from)
+        if created_to is not None:
+            query = query.filter(cls.created_at < created_to)
+        if cable_type:
+            query = query.filter(Sku.cable_type == cable_type)
+        if min_meters is not None:
+            query = query.filter(Sku.length_meters >= min_meters)
+        if max_meters is not None:
+            query = query.filter(Sku.length_meters <= max_meters)
+        rows = query.group_by(Sku.cable_type).order_by(Sku.cable_type.asc()).all()
         return [
             {
                 'cable_type': row.cable_type,
-                'cable_length': row.cable_length,
-                'on_hand': int(row.on_hand or 0),
+                'meters': round(float(row.meters or 0), 3),
+                'quantity': int(row.quantity or 0),
+                'unparsed_quantity': int(row.unparsed_quantity or 0),
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def _totals_by_key(rows):
+        """Turn ``(sku_id, total)`` rows into ``{(cable_type, cable_length): total}``."""
+        if any(row[0] is None for row in rows):
+            raise RuntimeError('inventory_movements has rows without sku_id; run migrate_inventory_skus.py')
+        keys = Sku.keys_for(row[0] for row in rows)
+        return {keys[row[0]]: int(row[1] or 0) for row in rows}
+
+    @classmethod
+    def ledger_totals(cls, chunk_size=50000):
+        """
+        Sum the whole ledger per SKU, reading ``chunk_size`` ids at a time.
+
+        Used to rebuild and verify ``inventory_balances``; request paths should
+        read balances instead.
+        """
+        totals = {}
+        max_id = db.session.query(func.max(cls.id)).scalar() or 0
+        lower = 0
+        while lower < max_id:
+            upper = lower + chunk_size
+            rows = (
+                db.session.query(cls.sku_id, func.sum(cls.quantity_delta).label('on_hand'))
+                .filter(cls.id > lower, cls.id <= upper)
+                .group_by(cls.sku_id)
+                .all()
+            )
+            for sku_id, on_hand in rows:
+                totals[sku_id] = totals.get(sku_id, 0) + int(on_hand or 0)
+            lower = upper
+        return cls._totals_by_key(list(totals.items()))
+
+    @classmethod
+    def location_totals(cls, chunk_size=50000):
+        """
+        Sum the whole ledger per ``(location, sku_id)``, reading ``chunk_size`` ids at a time.
+
+        Rows without a location are summed under ``InventoryLocationBalance.UNASSIGNED``.
+        """
+        totals = {}
+        max_id = db.session.query(func.max(cls.id)).scalar() or 0
+        lower = 0
+        while lower < max_id:
+            upper = lower + chunk_size
+            rows = (
+                db.session.query(cls.location, cls.sku_id, func.sum(cls.quantity_delta).label('on_hand'))
+                .filter(cls.id > lower, cls.id <= upper)
+                .group_by(cls.location, cls.sku_id)
+                .all()
+            )
+            for location, sku_id, on_hand in rows:
+                if sku_id is None:
+                    raise RuntimeError('inventory_movements has rows without sku_id; run migrate_inventory_skus.py')
+                key = (location or InventoryLocationBalance.UNASSIGNED, sku_id)
+                totals[key] = totals.get(key, 0) + int(on_hand or 0)
+            lower = upper
+        return totals
+
+
+class InventoryPosting(db.Model):
+    """One row per ledger source that must be posted at most once (e.g. a ticket fulfillment)."""
+
+    __tablename__ = 'inventory_postings'
+
+    source_type = db.Column(db.String(100), primary_key=True)
+    source_id = db.Column(db.Integer, primary_key=True)
+    posted_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow)
+
+    @classmethod
+    def claim(cls, source_type, source_id):
+        """Record the posting in the current transaction; ``False`` if it already exists."""
+        stmt = _dialect_insert()(cls.__table__).values(
+            source_type=source_type, source_id=source_id, posted_at=_utcnow()
+        )
+        return db.session.execute(stmt.on_conflict_do_nothing(index_elements=['source_type', 'source_id'])).rowcount > 0
+
+    @classmethod
+    def claim_many(cls, source_type, source_ids):
+        """Bulk ``claim`` in one INSERT; returns the ids this transaction claimed (the rest were already posted)."""
+        if not source_ids:
+            return set()
+        now = _utcnow()
+        stmt = _dialect_insert()(cls.__table__).values(
+            [{'source_type': source_type, 'source_id': source_id, 'posted_at': now} for source_id in source_ids]
+        )
+        stmt = stmt.on_conflict_do_nothing(index_elements=['source_type', 'source_id'])
+        return set(db.session.execute(stmt.returning(cls.__table__.c.source_id)).scalars())
+
+    @classmethod
+    def release_many(cls, source_type, source_ids):
+        """Drop postings in one DELETE so the sources can post again; returns the ids that had been posted."""
+        if not source_ids:
+            return set()
+        stmt = (
+            db.delete(cls.__table__)
+            .where(cls.__table__.c.source_type == source_type, cls.__table__.c.source_id.in_(source_ids))
+            .returning(cls.__table__.c.source_id)
+        )
+        return set(db.session.execute(stmt).scalars())
+
+    @classmethod
+    def backfill(cls, source_type):
+        """Claim every ``source_type`` source that already has ledger rows (for pre-existing ledgers)."""
+        movement = InventoryMovement.__table__
+        existing = (
+            db.select(movement.c.source_type, movement.c.source_id, func.current_timestamp())
+            .where(movement.c.source_type == source_type, movement.c.source_id.is_not(None))
+            .distinct()
+        )
+        stmt = _dialect_insert()(cls.__table__).from_select(['source_type', 'source_id', 'posted_at'], existing)
+        db.session.execute(stmt.on_conflict_do_nothing(index_elements=['source_type', 'source_id']))
+        commit_session()
+
+
+class InventoryRollup(db.Model):
+    """
+    Net quantity and movement count per day or week, SKU and movement type.
+
+    Maintained in the same transaction as the ledger; ``rebuild`` recomputes
+    it from scratch. Weeks start on Monday (UTC).
+    """
+
+    __tablename__ = 'inventory_rollups'
+
+    PERIODS = ('day', 'week')
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    period = db.Column(db.String(10), nullable=False)
+    bucket_start = db.Column(db.Date, nullable=False)
+    sku_id = db.Column(db.Integer, db.ForeignKey('skus.id'), nullable=False)
+    movement_type = db.Column(db.String(50), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    movements = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('period', 'bucket_start', 'sku_id', 'movement_type', name='uq_inventory_rollups_bucket'),
+        db.Index('ix_inventory_rollups_sku_period_bucket', 'sku_id', 'period', 'bucket_start'),
+    )
+
+    @staticmethod
+    def bucket_start_for(value, period):
+        day = value if isinstance(value, date) and not isinstance(value, datetime) else _as_utc(value).date()
+        return day - timedelta(days=day.weekday()) if period == 'week' else day
+
+    @classmethod
+    def _upsert(cls, totals):
+        """Add ``{(period, bucket_start, sku_id, movement_type): (quantity, movements)}`` onto stored buckets."""
+        now = _utcnow()
+        _upsert_increments(
+            cls,
+            ['period', 'bucket_start', 'sku_id', 'movement_type'],
+            [
+                {
+                    'period': period,
+                    'bucket_start': bucket_start,
+                    'sku_id': sku_id,
+                    'movement_type': movement_type,
+                    'quantity': quantity,
+                    'movements': movements,
+                    'updated_at': now,
+                }
+                for (period, bucket_start, sku_id, movement_type), (quantity, movements) in sorted(totals.items())
+            ],
+            ['quantity', 'movements'],
+        )
+
+    @staticmethod
+    def _fold(totals, bucket_day, sku_id, movement_type, quantity, movements):
+        for period in InventoryRollup.PERIODS:
+            key = (period, InventoryRollup.bucket_start_for(bucket_day, period), sku_id, movement_type)
+            stored_quantity, stored_movements = totals.get(key, (0, 0))
+            totals[key] = (stored_quantity + quantity, stored_movements + movements)
+
+    @classmethod
+    def apply_movements(cls, movements):
+        """Fold new ledger rows into their day and week buckets without committing."""
+        totals = {}
+        for movement in movements:
+            cls._fold(
+                totals,
+                cls.bucket_start_for(movement.created_at, 'day'),
+                movement.sku_id,
+                movement.movement_type,
+                int(movement.quantity_delta),
+                1,
+            )
+        cls._upsert(totals)
+
+    @classmethod
+    def rebuild(cls, chunk_size=50000):
+        """Recompute every bucket from the ledger, summing ``chunk_size`` ledger ids per query."""
+        movement = InventoryMovement
+        if db.session.get_bind().dialect.name == 'postgresql':
+            day = cast(func.timezone('UTC', movement.created_at), Date)
+        else:
+            day = func.date(movement.created_at)
+
+        cls.query.delete(synchronize_session=False)
+        max_id = db.session.query(func.max(movement.id)).scalar() or 0
+        lower = 0
+        while lower < max_id:
+            upper = lower + chunk_size
+            rows = (
+                db.session.query(
+                    day.label('day'),
+                    movement.sku_id,
+                    movement.movement_type,
+                    func.sum(movement.quantity_delta),
+                    func.count(movement.id),
+                )
+                .filter(movement.id > lower, movement.id <= upper)
+                .group_by(day, movement.sku_id, movement.movement_type)
+                .all()
+            )
+            totals = {}
+            for bucket_day, sku_id, movement_type, quantity, count in rows:
+                if sku_id is None:
+                    raise RuntimeError('inventory_movements has rows without sku_id; run migrate_inventory_skus.py')
+                if isinstance(bucket_day, str):
+                    bucket_day = date.fromisoformat(bucket_day)
+                cls._fold(totals, bucket_day, sku_id, movement_type, int(quantity or 0), int(count))
+            cls._upsert(totals)
+            lower = upper
+        commit_session()
+        after_commit(invalidate_inventory_views)
+
+    @classmethod
+    def trends(cls, period='day', movement_type=None, sku_ids=None, start=None, end=None):
+        """Buckets with ``start <= bucket_start < end`` (dates), oldest first, with their SKU strings."""
+        query = (
+            db.session.query(cls, Sku.cable_type, Sku.cable_length)
+            .join(Sku, Sku.id == cls.sku_id)
+            .filter(cls.period == period)
+        )
+        if movement_type:
+            query = query.filter(cls.movement_type == movement_type)
+        if sku_ids is not None:
+            query = query.filter(cls.sku_id.in_(sku_ids))
+        if start is not None:
+            query = query.filter(cls.bucket_start >= start)
+        if end is not None:
+            query = query.filter(cls.bucket_start < end)
+        rows = query.order_by(cls.bucket_start.asc(), Sku.cable_type.asc(), Sku.cable_length.asc(), cls.movement_type.asc())
+        return [
+            {
+                'period': rollup.period,
+                'bucket_start': rollup.bucket_start.isoformat(),
+                'sku_id': rollup.sku_id,
+                'cable_type': cable_type,
+                'cable_length': cable_length,
+                'movement_type': rollup.movement_type,
+                'quantity': rollup.quantity,
+                'movements': rollup.movements,
+            }
+            for rollup, cable_type, cable_length in rows
+        ]
+
+
+class InventoryBalance(db.Model):
+    """Running on-hand per SKU, maintained in the same transaction as the ledger."""
+
+    __tablename__ = 'inventory_balances'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    cable_type = db.Column(db.String(120), nullable=False)
+    cable_length = db.Column(db.String(120), nullable=False)
+    on_hand = db.Column(db.Integer, nullable=False, default=0)
+    reserved = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('cable_type', 'cable_length', name='uq_inventory_balances_sku'),
+    )
+
+    @property
+    def available(self):
+        return self.on_hand - self.reserved
+
+    def to_dict(self):
+        return {
+            'cable_type': self.cable_type,
+            'cable_length': self.cable_length,
+            'on_hand': self.on_hand,
+            'reserved': self.reserved,
+            'available': self.available,
+        }
+
+    @classmethod
+    def apply_movements(cls, movements):
+        """Fold ledger rows into balances without committing."""
+        deltas = {}
+        for movement in movements:
+            key = (movement.cable_type, movement.cable_length)
+            deltas[key] = deltas.get(key, 0) + int(movement.quantity_delta)
+        now = _utcnow()
+        _upsert_increments(
+            cls,
+            ['cable_type', 'cable_length'],
+            [
+                {'cable_type': cable_type, 'cable_length': cable_length, 'on_hand': delta, 'updated_at': now}
+                for (cable_type, cable_length), delta in sorted(deltas.items())
+            ],
+            ['on_hand'],
+        )
+        if deltas:
+            mark_balances_changed(db.session)
+
+    @classmethod
+    def adjust_reserved(cls, deltas):
+        """Add ``{(cable_type, cable_length): delta}`` onto reserved quantities without committing."""
+        now = _utcnow()
+        rows = [
+            {'cable_type': cable_type, 'cable_length': cable_length, 'on_hand': 0, 'reserved': delta, 'updated_at': now}
+            for (cable_type, cable_length), delta in sorted(deltas.items())
+            if delta
+        ]
+        _upsert_increments(cls, ['cable_type', 'cable_length'], rows, ['reserved'])
+        if rows:
+            mark_balances_changed(db.session)
+
+    @classmethod
+    def availability(cls, quantities):
+        """
+        Check ``{(cable_type, cable_length): requested}`` against cached balances.
+
+        Returns one entry per key in key order; ``shortfall`` is how many units
+        ``available`` (``on_hand - reserved``) falls short of the request.
+        """
+        balances = balance_cache.get(cls._load_all)
+        results = []
+        for key, requested in sorted(quantities.items()):
+            on_hand, reserved = balances.get(key, (0, 0))
+            available = on_hand - reserved
+            results.append(
+                {
+                    'cable_type': key[0],
+                    'cable_length': key[1],
+                    'requested': requested,
+                    'on_hand': on_hand,
+                    'reserved': reserved,
+                    'available': available,
+                    'shortfall': max(requested - max(available, 0), 0),
+                }
+            )
+        return results
+
+    @classmethod
+    def _load_all(cls):
+        rows = db.session.query(cls.cable_type, cls.cable_length, cls.on_hand, cls.reserved)
+        return {(row.cable_type, row.cable_length): (row.on_hand, row.reserved) for row in rows}
+
+    @classmethod
+    def summary(cls):
+        rows = cls.query.order_by(cls.cable_type.asc(), cls.cable_length.asc()).all()
+        return [row.to_dict() for row in rows]
+
+    @classmethod
+    def drift(cls, ledger_totals):
+        """
+        Compare stored balances with ``ledger_totals`` from the ledger.
+
+        Returns one entry per SKU whose stored balance differs, including SKUs
+        missing on either side.
+        """
+        stored = {(row.cable_type, row.cable_length): row.on_hand for row in cls.query.all()}
+        report = []
+        for key in sorted(set(stored) | set(ledger_totals)):
+            expected = ledger_totals.get(key, 0)
+            actual = stored.get(key)
+            if actual != expected:
+                report.append(
+                    {
+                        'cable_type': key[0],
+                        'cable_length': key[1],
+                        'expected': expected,
+                        'stored': actual,
+                    }
+                )
+        return report
+
+    @classmethod
+    def replace_all(cls, ledger_totals):
+        """Overwrite balances with ``ledger_totals`` and open reservations in one transaction."""
+        now = _utcnow()
+        reserved = StockReservation.open_totals()
+        cls.query.delete(synchronize_session=False)
+        db.session.add_all(
+            cls(
+                cable_type=key[0],
+                cable_length=key[1],
+                on_hand=ledger_totals.get(key, 0),
+                reserved=reserved.get(key, 0),
+                updated_at=now,
+            )
+            for key in sorted(set(ledger_totals) | set(reserved))
+        )
+        mark_balances_changed(db.session)
+        commit_session()
+
+
+class InventoryLocationBalance(db.Model):
+    """Running on-hand per storage location and SKU, maintained in the same transaction as the ledger."""
+
+    __tablename__ = 'inventory_location_balances'
+
+    # Key for ledger rows without a location, so the primary key stays NOT NULL.
+    UNASSIGNED = ''
+
+    location = db.Column(db.String(255), primary_key=True)
+    sku_id = db.Column(db.Integer, db.ForeignKey('skus.id'), primary_key=True)
+    on_hand = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow)
+
+    @classmethod
+    def apply_movements(cls, movements):
+        """Fold ledger rows into location balances without committing."""
+        deltas = {}
+        for movement in movements:
+            key = (movement.location or cls.UNASSIGNED, movement.sku_id)
+            deltas[key] = deltas.get(key, 0) + int(movement.quantity_delta)
+        now = _utcnow()
+        _upsert_increments(
+            cls,
+            ['location', 'sku_id'],
+            [
+                {'location': location, 'sku_id': sku_id, 'on_hand': delta, 'updated_at': now}
+                for (location, sku_id), delta in sorted(deltas.items())
+            ],
+            ['on_hand'],
+        )
+
+    @classmethod
+    def on_hand_at(cls, location, keys):
+        """On-hand at ``location`` for each ``(cable_type, cable_length)`` in ``keys``; unknown SKUs are 0."""
+        keys = list(keys)
+        rows = (
+            db.session.query(Sku.cable_type, Sku.cable_length, cls.on_hand)
+            .join(cls, cls.sku_id == Sku.id)
+            .filter(cls.location == location, tuple_(Sku.cable_type, Sku.cable_length).in_(keys))
+        )
+        found = {(row.cable_type, row.cable_length): row.on_hand for row in rows}
+        return {key: found.get(key, 0) for key in keys}
+
+    @classmethod
+    def summary(cls, location=None):
+        query = cls.query
+        if location is not None:
+            query = query.filter_by(location=location)
+        rows = query.all()
+        keys = Sku.keys_for([row.sku_id for row in rows])
+        summary = [
+            {
+                'location': row.location or None,
+                'cable_type': keys[row.sku_id][0],
+                'cable_length': keys[row.sku_id][1],
+                'on_hand': row.on_hand,
             }
             for row in rows
         ]
+        return sorted(summary, key=lambda row: (row['location'] or '', row['cable_type'], row['cable_length']))
+
+    @classmethod
+    def replace_all(cls, location_totals):
+        """Overwrite location balances with ``{(location, sku_id): on_hand}`` in one transaction."""
+        now = _utcnow()
+        cls.query.delete(synchronize_session=False)
+        db.session.add_all(
+            cls(location=location, sku_id=sku_id, on_hand=on_hand, updated_at=now)
+            for (location, sku_id), on_hand in sorted(location_totals.items())
+        )
+        commit_session()
+
+
+class StockReservation(db.Model):
+    """
+    Stock held for an approved ticket until it is fulfilled, rejected, closed or deleted.
+
+    Holds and releases adjust ``inventory_balances.reserved`` in the same
+    transaction as the ticket's status change, so ``available`` never has to
+    be recomputed from open tickets.
+    """
+
+    __tablename__ = 'stock_reservations'
+
+    HOLD_STATUSES = frozenset({'approved', 'in_progress'})
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    ticket_id = db.Column(db.Integer, db.ForeignKey('tickets.id'), nullable=False)
+    sku_id = db.Column(db.Integer, db.ForeignKey('skus.id'), nullable=False)
+    cable_type = db.Column(db.String(120), nullable=False)
+    cable_length = db.Column(db.String(120), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow)
+    released_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    release_reason = db.Column(db.String(50), nullable=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('ticket_id', 'sku_id', name='uq_stock_reservations_ticket_sku'),
+        db.Index('ix_stock_reservations_sku_released_at', 'sku_id', 'released_at'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'ticket_id': self.ticket_id,
+            'cable_type': self.cable_type,
+            'cable_length': self.cable_length,
+            'quantity': self.quantity,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'released_at': self.released_at.isoformat() if self.released_at else None,
+            'release_reason': self.release_reason,
+        }
+
+    @classmethod
+    def sync(cls, ticket, old_status):
+        """Hold or release ``ticket``'s stock after its status moved from ``old_status``, without committing."""
+        holding = ticket.status in cls.HOLD_STATUSES
+        if holding == (old_status in cls.HOLD_STATUSES):
+            return
+        if holding:
+            cls.hold(ticket)
+        else:
+            cls.release(ticket.id, ticket.status)
+
+    @classmethod
+    def hold(cls, ticket):
+        """
+        Reserve the ticket's items; a ticket restored after a release re-holds its earlier rows.
+
+        No-op if the ticket already holds stock.
+        """
+        existing = cls.query.filter_by(ticket_id=ticket.id).all()
+        if any(row.released_at is None for row in existing):
+            return []
+        now = _utcnow()
+        if existing:
+            rows = existing
+            for row in rows:
+                row.released_at = None
+                row.release_reason = None
+        else:
+            quantities = ticket.item_quantities()
+            sku_ids = Sku.ids_for(quantities)
+            rows = [
+                cls(
+                    ticket_id=ticket.id,
+                    sku_id=sku_ids[key],
+                    cable_type=key[0],
+                    cable_length=key[1],
+                    quantity=quantity,
+                    created_at=now,
+                )
+                for key, quantity in sorted(quantities.items())
+            ]
+            db.session.add_all(rows)
+        InventoryBalance.adjust_reserved(cls._deltas(rows, 1))
+        return rows
+
+    @classmethod
+    def release(cls, ticket_id, reason):
+        """Release every open hold for ``ticket_id``, without committing."""
+        rows = cls.query.filter_by(ticket_id=ticket_id, released_at=None).all()
+        now = _utcnow()
+        for row in rows:
+            row.released_at = now
+            row.release_reason = reason
+        InventoryBalance.adjust_reserved(cls._deltas(rows, -1))
+        return rows
+
+    @classmethod
+    def backfill(cls, batch_size=500):
+        """Hold stock for every ticket in a holding status, committing per batch; returns ``(checked, held)``."""
+        ticket_ids = [
+            row.id
+            for row in db.session.query(Ticket.id)
+            .filter(Ticket.status.in_(cls.HOLD_STATUSES))
+            .order_by(Ticket.id.asc())
+        ]
+        held = 0
+        for start in range(0, len(ticket_ids), batch_size):
+            for ticket in Ticket.query.filter(Ticket.id.in_(ticket_ids[start:start + batch_size])):
+                if cls.hold(ticket):
+                    held += 1
+            commit_session()
+        return len(ticket_ids), held
+
+    @staticmethod
+    def _deltas(rows, sign):
+        deltas = {}
+        for row in rows:
+            key = (row.cable_type, row.cable_length)
+            deltas[key] = deltas.get(key, 0) + sign * row.quantity
+        return deltas
+
+    @classmethod
+    def open_totals(cls):
+        """Reserved quantity per ``(cable_type, cable_length)`` over holds not yet released."""
+        rows = (
+            db.session.query(cls.cable_type, cls.cable_length, func.sum(cls.quantity))
+            .filter(cls.released_at.is_(None))
+            .group_by(cls.cable_type, cls.cable_length)
+        )
+        return {(cable_type, cable_length): int(total) for cable_type, cable_length, total in rows}
+
+    @classmethod
+    def for_ticket(cls, ticket_id):
+        return cls.query.filter_by(ticket_id=ticket_id).order_by(cls.id.asc()).all()
+
+    @classmethod
+    def delete_by_ticket_id(cls, ticket_id):
+        cls.release(ticket_id, 'deleted')
+        cls.query.filter_by(ticket_id=ticket_id).delete(synchronize_session=False)
+        commit_session()
+
+
+class InventorySnapshot(db.Model):
+    """
+    Checkpoint of per-SKU on-hand covering every movement with ``created_at <= taken_at``.
+
+    Point-in-time reads start from the latest checkpoint and add only the
+    movements after it, so their cost is bounded by the checkpoint interval.
+    """
+
+    __tablename__ = 'inventory_snapshots'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    taken_at = db.Column(db.DateTime(timezone=True), nullable=False, unique=True, index=True)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow)
+
+    lines = db.relationship(
+        'InventorySnapshotLine',
+        lazy='select',
+        cascade='all, delete-orphan',
+        passive_deletes=True,
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'taken_at': self.taken_at.isoformat() if self.taken_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+
+    def totals(self):
+        return {(line.cable_type, line.cable_length): line.on_hand for line in self.lines}
+
+    @classmethod
+    def create(cls, taken_at, totals):
+        snapshot = cls(
+            taken_at=taken_at,
+            created_at=_utcnow(),
+            lines=[
+                InventorySnapshotLine(cable_type=cable_type, cable_length=cable_length, on_hand=on_hand)
+                for (cable_type, cable_length), on_hand in sorted(totals.items())
+            ],
+        )
+        db.session.add(snapshot)
+        commit_session()
+        return snapshot
+
+    @classmethod
+    def latest(cls, at_or_before=None):
+        query = cls.query
+        if at_or_before is not None:
+            query = query.filter(cls.taken_at <= at_or_before)
+        return query.order_by(cls.taken_at.desc()).first()
+
+
+class InventorySnapshotLine(db.Model):
+    __tablename__ = 'inventory_snapshot_lines'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    snapshot_id = db.Column(
+        db.Integer,
+        db.ForeignKey('inventory_snapshots.id', ondelete='CASCADE'),
+        nullable=False,
+    )
+    cable_type = db.Column(db.String(120), nullable=False)
+    cable_length = db.Column(db.String(120), nullable=False)
+    on_hand = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('snapshot_id', 'cable_type', 'cable_length', name='uq_inventory_snapshot_lines_sku'),
+    )
+
+
+class OpticsMovement(db.Model):
+    """Ledger of optics stock deltas per part number; the optics counterpart of ``inventory_movements``."""
+
+    __tablename__ = 'optics_movements'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    movement_type = db.Column(db.String(50), nullable=False)
+    source_type = db.Column(db.String(100), nullable=True)
+    source_id = db.Column(db.Integer, nullable=True)
+    actor_user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    part_number = db.Column(db.String(255), nullable=False)
+    quantity_delta = db.Column(db.Integer, nullable=False)
+    notes = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow)
+
+    __table_args__ = (
+        db.Index('ix_optics_movements_source', 'source_type', 'source_id'),
+        db.Index('ix_optics_movements_created_at_id', 'created_at', 'id'),
+        db.Index('ix_optics_movements_part_created_at_id', 'part_number', 'created_at', 'id'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'movement_type': self.movement_type,
+            'source_type': self.source_type,
+            'source_id': self.source_id,
+            'actor_user_id': self.actor_user_id,
+            'part_number': self.part_number,
+            'quantity_delta': self.quantity_delta,
+            'notes': self.notes,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+
+    @classmethod
+    def create_many(cls, movement_docs):
+        if not movement_docs:
+            return []
+
+        now = _utcnow()
+        rows = [
+            cls(
+                movement_type=raw['movement_type'],
+                source_type=raw.get('source_type'),
+                source_id=raw.get('source_id'),
+                actor_user_id=raw.get('actor_user_id'),
+                part_number=raw['part_number'],
+                quantity_delta=int(raw['quantity_delta']),
+                notes=raw.get('notes'),
+                created_at=now,
+            )
+            for raw in movement_docs
+        ]
+        db.session.add_all(rows)
+        OpticsBalance.apply_movements(rows)
+        commit_session()
+        return rows
+
+    @classmethod
+    def create_once(cls, source_type, source_id, movement_docs):
+        """Write ``movement_docs`` unless the source was already posted; same guard as ``InventoryMovement``."""
+        if not InventoryPosting.claim(source_type, source_id):
+            return None
+        return cls.create_many(movement_docs)
+
+    @classmethod
+    def sync_postings(cls, source_type, movement_type, sign, rows, actor_user_id=None):
+        """
+        Post stock for optics requests or returns after an admin status change.
+
+        An approved row issues (``sign=-1``) or returns (``sign=1``) its
+        quantity once, guarded by its ``inventory_postings`` claim. Claims and
+        releases for all ``rows`` go out as one INSERT and one DELETE. A denied
+        row that still holds the claim gets a ``<movement_type>_reversal`` row
+        and gives the claim up, so approving it again posts again. Pending and
+        archived rows keep whatever they have posted.
+        """
+        claimed = InventoryPosting.claim_many(source_type, [row.id for row in rows if row.status == 'approved'])
+        released = InventoryPosting.release_many(source_type, [row.id for row in rows if row.status == 'denied'])
+        docs = []
+        for row in rows:
+            if row.id in claimed:
+                docs.append(cls._status_doc(row, source_type, movement_type, sign, actor_user_id))
+            elif row.id in released:
+                docs.append(cls._status_doc(row, source_type, f'{movement_type}_reversal', -sign, actor_user_id))
+        return cls.create_many(docs)
+
+    @staticmethod
+    def _status_doc(row, source_type, movement_type, sign, actor_user_id):
+        return {
+            'movement_type': movement_type,
+            'source_type': source_type,
+            'source_id': row.id,
+            'actor_user_id': actor_user_id,
+            'part_number': row.part_number,
+            'quantity_delta': sign * int(row.quantity),
+            'notes': f'{source_type.replace("_", " ").capitalize()} #{row.id} {row.status}',
+        }
+
+    @classmethod
+    def list(cls, part_number=None, limit=200):
+        query = cls.query
+        if part_number:
+            query = query.filter_by(part_number=part_number)
+        return query.order_by(cls.created_at.desc(), cls.id.desc()).limit(limit).all()
+
+    @classmethod
+    def ledger_totals(cls):
+        """Net quantity per part number over the whole ledger, for rebuilding ``optics_balances``."""
+        rows = db.session.query(cls.part_number, func.sum(cls.quantity_delta)).group_by(cls.part_number)
+        return {part_number: int(total or 0) for part_number, total in rows}
+
+
+class OpticsBalance(db.Model):
+    """Running on-hand per optics part number, maintained in the same transaction as the optics ledger."""
+
+    __tablename__ = 'optics_balances'
+
+    part_number = db.Column(db.String(255), primary_key=True)
+    on_hand = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow)
+
+    def to_dict(self):
+        return {'part_number': self.part_number, 'on_hand': self.on_hand}
+
+    @classmethod
+    def apply_movements(cls, movements):
+        """Fold optics ledger rows into balances without committing."""
+        deltas = {}
+        for movement in movements:
+            deltas[movement.part_number] = deltas.get(movement.part_number, 0) + int(movement.quantity_delta)
+        now = _utcnow()
+        _upsert_increments(
+            cls,
+            ['part_number'],
+            [
+                {'part_number': part_number, 'on_hand': delta, 'updated_at': now}
+                for part_number, delta in sorted(deltas.items())
+            ],
+            ['on_hand'],
+        )
+
+    @classmethod
+    def summary(cls, part_number=None):
+        query = cls.query
+        if part_number:
+            query = query.filter_by(part_number=part_number)
+        return [row.to_dict() for row in query.order_by(cls.part_number.asc())]
+
+    @classmethod
+    def drift(cls, ledger_totals):
+        """Parts whose stored balance differs from ``ledger_totals``, including parts missing on either side."""
+        stored = {row.part_number: row.on_hand for row in cls.query.all()}
+        return [
+            {'part_number': part_number, 'expected': ledger_totals.get(part_number, 0), 'stored': stored.get(part_number)}
+            for part_number in sorted(set(stored) | set(ledger_totals))
+            if stored.get(part_number) != ledger_totals.get(part_number, 0)
+        ]
+
+    @classmethod
+    def replace_all(cls, ledger_totals):
+        """Overwrite balances with ``ledger_totals`` in one transaction."""
+        now = _utcnow()
+        cls.query.delete(synchronize_session=False)
+        db.session.add_all(
+            cls(part_number=part_number, on_hand=on_hand, updated_at=now)
+            for part_number, on_hand in sorted(ledger_totals.items())
+        )
+        commit_session()
@@ -1,13 +1,102 @@
 from twilio.rest import Client
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from flask import current_app
-from app.models import Notification, User
+from app import commit_session, db
+from app.models import Notification, NotificationOutbox, User
+from requests.adapters import HTTPAdapter
+import os
+import threading
+import time
 import requests
 import boto3
 from botocore.exceptions import ClientError
 
+
+class ProviderClients:
+    """
+    Process-wide SMS/email provider clients and per-provider latency counters.
+
+    Clients are built on first use and reused, so each send skips SDK setup and
+    rides an existing keep-alive connection. Gunicorn forks workers after
+    import, so everything is dropped and rebuilt when the pid changes rather
+    than sharing sockets across processes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._clients = {}
+        self._stats = {}
+
+    def _ensure_process(self):
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._clients = {}
+            self._stats = {}
+
+    def get(self, key, factory):
+        """Return the client cached under ``key``, building it with ``factory`` once."""
+        with self._lock:
+            self._ensure_process()
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = factory()
+            return client
+
+    def http_session(self):
+        pool_size = int(current_app.config.get('NOTIFICATION_HTTP_POOL_SIZE', 10))
+
+        def build():
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            return session
+
+        return self.get(('http', pool_size), build)
+
+    @contextmanager
+    def timed(self, provider):
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._ensure_process()
+                stats = self._stats.setdefault(
+                    provider,
+                    {'calls': 0, 'errors': 0, 'total_seconds': 0.0, 'max_seconds': 0.0},
+                )
+                stats['calls'] += 1
+                stats['errors'] += 0 if ok else 1
+                stats['total_seconds'] += elapsed
+                stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+
+    def stats(self):
+        with self._lock:
+            self._ensure_process()
+            return {provider: dict(values) for provider, values in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._clients = {}
+            self._stats = {}
+
+
+provider_clients = ProviderClients()
+
+
+def provider_stats():
+    """Per-provider call, error and latency counters for this process."""
+    return provider_clients.stats()
+
+
 def send_sms(to_phone, message):
     """Send SMS via AWS SNS or Twilio"""
     try:
@@ -18,23 +107,27 @@ def send_sms(to_phone, message):
 
         if aws_key and aws_secret:
             try:
-                sns = boto3.client(
-                    'sns',
-                    aws_access_key_id=aws_key,
-                    aws_secret_access_key=aws_secret,
-                    region_name=aws_region
+                sns = provider_clients.get(
+                    ('sns', aws_key, aws_secret, aws_region),
+                    lambda: boto3.client(
+                        'sns',
+                        aws_access_key_id=aws_key,
+                        aws_secret_access_key=aws_secret,
+                        region_name=aws_region
+                    ),
                 )
 
-                response = sns.publish(
-                    PhoneNumber=to_phone,
-                    Message=message,
-                    MessageAttributes={
-                        'AWS.SNS.SMS.SMSType': {
-                            'DataType': 'String',
-                            'StringValue': 'Transactional'
+                with provider_clients.timed('sns'):
+                    response = sns.publish(
+                        PhoneNumber=to_phone,
+                        Message=message,
+                        MessageAttributes={
+                            'AWS.SNS.SMS.SMSType': {
+                                'DataType': 'String',
+                                'StringValue': 'Transactional'
+                            }
                         }
-                    }
-                )
+                    )
                 print(f"✅ SMS sent via AWS SNS: {response['MessageId']}")
                 return True
             except ClientError as e:
@@ -50,12 +143,13 @@ def send_sms(to_phone, message):
             print("⚠️ No SMS service configured (AWS SNS or Twilio), skipping SMS")
             return False
 
-        client = Client(account_sid, auth_token)
-        msg = client.messages.create(
-            body=message,
-            from_=from_phone,
-            to=to_phone
-        )
+        client = provider_clients.get(('twilio', account_sid, auth_token), lambda: Client(account_sid, auth_token))
+        with provider_clients.timed('twilio'):
+            msg = client.messages.create(
+                body=message,
+                from_=from_phone,
+                to=to_phone
+            )
         print(f"✅ SMS sent via Twilio: {msg.sid}")
         return True
     except Exception as e:
@@ -69,22 +163,25 @@ def send_email(to_email, subject, html_content):
         resend_key = current_app.config.get('RESEND_API_KEY')
         if resend_key:
             from_email = current_app.config.get('SENDGRID_FROM_EMAIL', 'onboarding@resend.dev')
+            resend_url = current_app.config.get('RESEND_API_URL', 'https://api.resend.com/emails')
+            session = provider_clients.http_session()
             for attempt in range(1, 3):
                 try:
-                    response = requests.post(
-                        'https://api.resend.com/emails',
-                        headers={
-                            'Authorization': f'Bearer {resend_key}',
-                            'Content-Type': 'application/json'
-                        },
-                        json={
-                            'from': from_email,
-                            'to': [to_email],
-                            'subject': subject,
-                            'html': html_content
-                        },
-                        timeout=10,
-                    )
+                    with provider_clients.timed('resend'):
+                        response = session.post(
+                            resend_url,
+                            headers={
+                                'Authorization': f'Bearer {resend_key}',
+                                'Content-Type': 'application/json'
+                            },
+                            json={
+                                'from': from_email,
+                                'to': [to_email],
+                                'subject': subject,
+                                'html': html_content
+                            },
+                            timeout=10,
+                        )
                     if response.status_code in [200, 201]:
                         print(f"✅ Email sent via Resend: {response.status_code}")
                         return True
@@ -108,14 +205,54 @@ def send_email(to_email, subject, html_content):
             html_content=html_content
         )
 
-        sg = SendGridAPIClient(api_key)
-        response = sg.send(message)
+        sg = provider_clients.get(('sendgrid', api_key), lambda: SendGridAPIClient(api_key))
+        with provider_clients.timed('sendgrid'):
+            response = sg.send(message)
         print(f"✅ Email sent via SendGrid: {response.status_code}")
         return True
     except Exception as e:
         print(f"❌ Email error: {str(e)}")
         return False
 
+def queue_sms(to_phone, message, ticket_id=None, recipient_user_id=None):
+    """Stage an SMS for the notification worker in the current transaction."""
+    if not to_phone:
+        return None
+    return NotificationOutbox.enqueue(
+        'sms',
+        to_phone,
+        message,
+        notification=_pending_notification(ticket_id, recipient_user_id, 'sms'),
+    )
+
+
+def queue_email(to_email, subject, html_content, ticket_id=None, recipient_user_id=None):
+    """Stage an email for the notification worker in the current transaction."""
+    if not to_email:
+        return None
+    return NotificationOutbox.enqueue(
+        'email',
+        to_email,
+        html_content,
+        subject=subject,
+        notification=_pending_notification(ticket_id, recipient_user_id, 'email'),
+    )
+
+
+def _pending_notification(ticket_id, recipient_user_id, notification_type):
+    if ticket_id is None or recipient_user_id is None:
+        return None
+    notification = Notification(
+        ticket_id=ticket_id,
+        recipient_user_id=recipient_user_id,
+        notification_type=notification_type,
+        status='pending',
+        created_at=datetime.now(timezone.utc),
+    )
+    db.session.add(notification)
+    return notification
+
+
 def notify_ticket_created(ticket):
     """Send notification when ticket is created"""
     app_url = current_app.config['APP_URL'].rstrip('/')
@@ -174,27 +311,16 @@ Reject: {reject_url}
 </html>
 """
 
-    # Send SMS
-    sms_sent = send_sms(assignee.phone, sms_message)
-    if sms_sent:
-        Notification.create(
-            ticket_id=ticket.id,
-            recipient_user_id=assignee.id,
-            notification_type='sms',
-            status='sent',
-            sent_at=datetime.now(timezone.utc)
-        )
-
-    # Send Email
-    email_sent = send_email(assignee.email, f"Cable Request #{ticket.id}", email_html)
-    if email_sent:
-        Notification.create(
-            ticket_id=ticket.id,
-            recipient_user_id=assignee.id,
-            notification_type='email',
-            status='sent',
-            sent_at=datetime.now(timezone.utc)
-        )
+    # Queue SMS and email; notification_worker.py delivers them
+    queue_sms(assignee.phone, sms_message, ticket_id=ticket.id, recipient_user_id=assignee.id)
+    queue_email(
+        assignee.email,
+        f"Cable Request #{ticket.id}",
+        email_html,
+        ticket_id=ticket.id,
+        recipient_user_id=assignee.id,
+    )
+    commit_session()
 
 def notify_status_change(ticket, new_status):
     """Send notification when ticket status changes"""
@@ -247,8 +373,15 @@ View: {app_url}/tickets/{ticket.id}
 </html>
 """
 
-    send_sms(creator.phone, sms_message.strip())
-    send_email(creator.email, f"Ticket #{ticket.id} Update", email_html)
+    queue_sms(creator.phone, sms_message.strip(), ticket_id=ticket.id, recipient_user_id=creator.id)
+    queue_email(
+        creator.email,
+        f"Ticket #{ticket.id} Update",
+        email_html,
+        ticket_id=ticket.id,
+        recipient_user_id=creator.id,
+    )
+    commit_session()
 
 
 def _optics_admin_emails():
@@ -289,7 +422,102 @@ def notify_optics_request_created(optics_request):
 
     subject = f"Optics Request #{optics_request.id} - {optics_request.part_number}"
     for recipient in recipients:
-        send_email(recipient, subject, email_html)
+        queue_email(recipient, subject, email_html)
+    commit_session()
+
+
+def _optics_kit_email_html(title, kit_name, kit_quantity, rows, link, link_label):
+    first = rows[0]
+    requested_by = first.requester.username if first.requester else 'Unknown'
+    component_rows = ''.join(
+        f"<tr><td>#{row.id}</td><td>{row.part_number}</td><td>{row.quantity}</td></tr>" for row in rows
+    )
+    return f"""
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <div style="max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #ddd; border-radius: 8px;">
+        <h2 style="color: #2563eb;">{title}</h2>
+
+        <div style="background-color: #f3f4f6; padding: 15px; border-radius: 5px; margin: 20px 0;">
+            <p><strong>Kit:</strong> {kit_name} x {kit_quantity}</p>
+            <p><strong>Kit Order:</strong> {first.kit_order_id}</p>
+            <p><strong>Requester Name:</strong> {first.requester_name}</p>
+            <p><strong>Submitted By:</strong> {requested_by}</p>
+            <p><strong>Status:</strong> {first.status.upper()}</p>
+            <table style="width: 100%; text-align: left;">
+                <tr><th>ID</th><th>Part Number</th><th>Quantity</th></tr>
+                {component_rows}
+            </table>
+        </div>
+
+        <p><a href="{link}" style="color: #2563eb;">{link_label}</a></p>
+    </div>
+</body>
+</html>
+"""
+
+
+def notify_optics_request_kit_created(optics_requests, kit_name, kit_quantity):
+    """Queue one email per admin for a whole kit order instead of one per component."""
+    recipients = _optics_admin_emails()
+    if not recipients or not optics_requests:
+        return
+
+    app_url = current_app.config['APP_URL'].rstrip('/')
+    email_html = _optics_kit_email_html(
+        'New Optics Kit Request', kit_name, kit_quantity, optics_requests, f'{app_url}/optics', 'Open Optics Requests'
+    )
+    subject = f"Optics Kit Request - {kit_name} x {kit_quantity} ({len(optics_requests)} parts)"
+    for recipient in recipients:
+        queue_email(recipient, subject, email_html)
+    commit_session()
+
+
+def _optics_status_digest(rows, new_status, noun, link, link_label):
+    """
+    Group bulk-updated optics rows by requester as ``[(email, subject, html), ...]``.
+
+    Each requester gets one message listing all of their rows instead of one
+    email per row.
+    """
+    by_requester = {}
+    for row in rows:
+        requester = row.requester
+        if requester and requester.email:
+            by_requester.setdefault(requester.email, []).append(row)
+
+    status_label = (new_status or '').upper()
+    digests = []
+    for email, requester_rows in by_requester.items():
+        first = requester_rows[0]
+        admin_actor = first.admin_actor.username if first.admin_actor else 'Admin'
+        item_rows = ''.join(
+            f"<tr><td>#{row.id}</td><td>{row.part_number}</td><td>{row.quantity}</td></tr>" for row in requester_rows
+        )
+        email_html = f"""
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <div style="max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #ddd; border-radius: 8px;">
+        <h2 style="color: #2563eb;">Optics {noun} Update</h2>
+        <p style="font-size: 18px; font-weight: bold;">{len(requester_rows)} of your {noun.lower()}s are now {status_label}.</p>
+
+        <div style="background-color: #f3f4f6; padding: 15px; border-radius: 5px; margin: 20px 0;">
+            <p><strong>Updated By:</strong> {admin_actor}</p>
+            {f"<p><strong>Admin Note:</strong> {first.admin_note}</p>" if first.admin_note else ""}
+            <table style="width: 100%; text-align: left;">
+                <tr><th>ID</th><th>Part Number</th><th>Quantity</th></tr>
+                {item_rows}
+            </table>
+        </div>
+
+        <p><a href="{link}" style="color: #2563eb;">{link_label}</a></p>
+    </div>
+</body>
+</html>
+"""
+        subject = f"Optics {noun}s {status_label} ({len(requester_rows)})"
+        digests.append((email, subject, email_html))
+    return digests
 
 
 def notify_optics_request_status_change(optics_request, new_status):
@@ -323,11 +551,23 @@ def notify_optics_request_status_change(optics_request, new_status):
 </html>
 """
 
-    send_email(
+    queue_email(
         requester.email,
         f"Optics Request #{optics_request.id} {status_label}",
         email_html,
     )
+    commit_session()
+
+
+def notify_optics_request_bulk_status_change(optics_requests, new_status):
+    """Queue one email per requester for a bulk admin action instead of one per request."""
+    app_url = current_app.config['APP_URL'].rstrip('/')
+    digests = _optics_status_digest(optics_requests, new_status, 'Request', f'{app_url}/optics', 'View Optics Requests')
+    if not digests:
+        return
+    for recipient, subject, email_html in digests:
+        queue_email(recipient, subject, email_html)
+    commit_session()
 
 
 def notify_optics_return_created(optics_return):
@@ -361,7 +601,24 @@ def notify_optics_return_created(optics_return):
 
     subject = f"Optics Return #{optics_return.id} - {optics_return.part_number}"
     for recipient in recipients:
-        send_email(recipient, subject, email_html)
+        queue_email(recipient, subject, email_html)
+    commit_session()
+
+
+def notify_optics_return_kit_created(optics_returns, kit_name, kit_quantity):
+    """Queue one email per admin for a whole kit return instead of one per component."""
+    recipients = _optics_admin_emails()
+    if not recipients or not optics_returns:
+        return
+
+    app_url = current_app.config['APP_URL'].rstrip('/')
+    email_html = _optics_kit_email_html(
+        'New Optics Kit Return', kit_name, kit_quantity, optics_returns, f'{app_url}/optics-return', 'Open Optics Returns'
+    )
+    subject = f"Optics Kit Return - {kit_name} x {kit_quantity} ({len(optics_returns)} parts)"
+    for recipient in recipients:
+        queue_email(recipient, subject, email_html)
+    commit_session()
 
 
 def notify_optics_return_status_change(optics_return, new_status):
@@ -395,8 +652,22 @@ def notify_optics_return_status_change(optics_return, new_status):
 </html>
 """
 
-    send_email(
+    queue_email(
         requester.email,
         f"Optics Return #{optics_return.id} {status_label}",
         email_html,
     )
+    commit_session()
+
+
+def notify_optics_return_bulk_status_change(optics_returns, new_status):
+    """Queue one email per requester for a bulk admin action instead of one per return."""
+    app_url = current_app.config['APP_URL'].rstrip('/')
+    digests = _optics_status_digest(
+        optics_returns, new_status, 'Return', f'{app_url}/optics-return', 'View Optics Returns'
+    )
+    if not digests:
+        return
+    for recipient, subject, email_html in digests:
+        queue_email(recipient, subject, email_html)
+    commit_session()
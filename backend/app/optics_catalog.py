@@ -0,0 +1,146 @@
+"""Optics part catalog snapshot and kit BOM flattening.
+
+The catalog lives in ``optics_parts`` and ``optics_kit_components``; every edit
+bumps ``optics_catalog_state.version`` in the same transaction. Each worker
+keeps one immutable snapshot of the catalog, with flattened BOMs memoized per
+kit for that version, and reloads it when the shared ``optics_catalog`` marker
+moves, so edits reach every worker without a restart.
+"""
+
+import threading
+
+from flask import has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.cache import bump_marker, marker_version
+
+CATALOG_MARKER = 'optics_catalog'
+OTHER_OPTION = "Other"
+
+# Seeded into an empty catalog; edit the tables (or the admin API) afterwards.
+DEFAULT_PARTS = [
+    "MMS4X50-NM",
+    "EX-SFP-1GE-LX-LU",
+    "MMS4X00-NM-T",
+    "Kitted GB 300",
+    "MMS1X00-NS400",
+    "MMS1V70-CM",
+    "MMS4X00-NM-FLT",
+    "QSFP-100G-DR-LWP-LU",
+    "HIGH4-4LG-KIT",
+    "EX-SFP-10GE-LR-LU",
+    "MAM1Q00A-QSA28",
+    "QDD-400G-LR4-S-LU",
+    "SFP-GE-T-LU",
+    "UACC-OM-SM-10G-D",
+]
+DEFAULT_KIT_BOMS = {
+    "Kitted GB 300": [
+        {"part_number": "MMS1V70-CM", "quantity": 4},
+        {"part_number": "MMS1X00-NS400", "quantity": 36},
+        {"part_number": "MMS4X00-NM-FLT", "quantity": 72},
+    ],
+}
+
+
+class CatalogCycleError(ValueError):
+    """A kit contains itself, directly or through a nested kit."""
+
+
+class CatalogSnapshot:
+    """
+    One version of the catalog.
+
+    ``parts`` lists active part numbers in display order; ``components`` maps a
+    kit's part number to its ``[(component, quantity), ...]``.
+    """
+
+    def __init__(self, version, parts, components):
+        self.version = version
+        self.parts = list(parts)
+        self._active = set(self.parts)
+        self._components = components
+        self._flattened = {}
+
+    def is_active(self, part_number):
+        return part_number in self._active
+
+    def is_kit(self, part_number):
+        return bool(self._components.get(part_number))
+
+    def components(self, part_number):
+        return list(self._components.get(part_number, []))
+
+    def flatten(self, part_number):
+        """Leaf parts and quantities for one ``part_number``, in first-seen order; memoized for this version."""
+        return self._flatten(part_number, ())
+
+    def _flatten(self, part_number, path):
+        if part_number in path:
+            raise CatalogCycleError(' -> '.join(path + (part_number,)))
+        children = self._components.get(part_number)
+        if not children:
+            return ((part_number, 1),)
+        # Snapshots are never mutated, so a racing worker thread can only compute the same tuple.
+        memoized = self._flattened.get(part_number)
+        if memoized is not None:
+            return memoized
+        totals = {}
+        for component, quantity in children:
+            for leaf, leaf_quantity in self._flatten(component, path + (part_number,)):
+                totals[leaf] = totals.get(leaf, 0) + quantity * leaf_quantity
+        self._flattened[part_number] = tuple(totals.items())
+        return self._flattened[part_number]
+
+    def expand(self, part_number, quantity):
+        """Order lines for ``quantity`` of ``part_number``; a plain part expands to itself."""
+        return [
+            {'part_number': leaf, 'quantity': leaf_quantity * quantity}
+            for leaf, leaf_quantity in self.flatten(part_number)
+        ]
+
+
+class CatalogCache:
+    def __init__(self):
+        self._snapshot = None
+        self._marker = None
+        self._lock = threading.Lock()
+
+    def get(self, load):
+        """Return the current ``CatalogSnapshot``, calling ``load()`` when the shared marker has moved."""
+        current = marker_version(CATALOG_MARKER)
+        with self._lock:
+            if self._snapshot is not None and self._marker == current:
+                return self._snapshot
+        snapshot = load()
+        with self._lock:
+            self._snapshot = snapshot
+            self._marker = current
+        return snapshot
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
+            self._marker = None
+
+
+catalog_cache = CatalogCache()
+
+
+def mark_changed(session):
+    """Note that ``session`` edited the catalog; the marker is bumped once it commits."""
+    session.info['optics_catalog_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('optics_catalog_changed', False):
+        catalog_cache.clear()
+        if has_app_context():
+            bump_marker(CATALOG_MARKER)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_after_rollback(session):
+    session.info.pop('optics_catalog_changed', None)
@@ -0,0 +1,121 @@
+"""Delivery side of the notification outbox.
+
+``notify_*`` in ``app.notifications`` only stage rows in ``notification_outbox``;
+this module claims due rows, sends them through a provider on a thread pool and
+records the outcome with exponential backoff between attempts.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+import time
+
+from flask import current_app
+
+from app import db
+from app.models import NotificationOutbox
+from app.notifications import send_email, send_sms
+
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+LEASE_SECONDS = 300
+
+
+class DeliveryError(Exception):
+    """A provider could not deliver a message; ``permanent`` skips further retries."""
+
+    def __init__(self, message, permanent=False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+class LiveProvider:
+    """Delivers through the configured SNS/Twilio and Resend/SendGrid accounts."""
+
+    def send(self, message):
+        config = current_app.config
+        if message['channel'] == 'sms':
+            sms_configured = (config.get('AWS_ACCESS_KEY_ID') and config.get('AWS_SECRET_ACCESS_KEY')) or all(
+                [config.get('TWILIO_ACCOUNT_SID'), config.get('TWILIO_AUTH_TOKEN'), config.get('TWILIO_PHONE_NUMBER')]
+            )
+            if not sms_configured:
+                raise DeliveryError('No SMS service configured (AWS SNS or Twilio)', permanent=True)
+            if not send_sms(message['recipient'], message['body']):
+                raise DeliveryError('SMS provider did not accept the message')
+            return
+
+        if not (config.get('RESEND_API_KEY') or config.get('SENDGRID_API_KEY')):
+            raise DeliveryError('No email service configured (Resend or SendGrid)', permanent=True)
+        if not send_email(message['recipient'], message['subject'], message['body']):
+            raise DeliveryError('Email provider did not accept the message')
+
+
+class FakeProvider:
+    """Records messages in memory so the worker can run offline and in tests."""
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(message)
+        print(f"📭 Fake {message['channel']} to {message['recipient']}: {message['subject'] or message['body'][:40]}")
+
+
+def get_provider(name=None):
+    name = (name or current_app.config.get('NOTIFICATION_PROVIDER') or 'live').lower()
+    if name == 'fake':
+        return FakeProvider()
+    if name == 'live':
+        return LiveProvider()
+    raise ValueError(f'Unknown notification provider: {name}')
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS))
+
+
+def _deliver(app, provider, message):
+    with app.app_context():
+        try:
+            provider.send(message)
+        except DeliveryError as exc:
+            return message, exc
+        except Exception as exc:  # Provider SDKs raise their own exception types.
+            return message, DeliveryError(str(exc))
+    return message, None
+
+
+def drain_once(app, provider, executor, batch_size=20, max_attempts=MAX_ATTEMPTS):
+    """
+    Claim one batch of due messages, deliver them concurrently and record results.
+
+    Returns the number of messages claimed.
+    """
+    messages = [row.to_message() for row in NotificationOutbox.claim_due(batch_size, LEASE_SECONDS)]
+    if not messages:
+        return 0
+
+    results = executor.map(lambda message: _deliver(app, provider, message), messages)
+    now = datetime.now(timezone.utc)
+    for message, error in results:
+        if error is None:
+            NotificationOutbox.mark_sent(message['id'])
+            continue
+        final = error.permanent or message['attempts'] >= max_attempts
+        retry_at = None if final else now + retry_delay(message['attempts'])
+        NotificationOutbox.mark_failed(message['id'], str(error), retry_at=retry_at)
+        print(f"⚠️ Outbox message {message['id']} attempt {message['attempts']} failed: {error}")
+    db.session.commit()
+    return len(messages)
+
+
+def run_worker(app, provider, batch_size=20, concurrency=4, poll_interval=2.0, once=False):
+    """Drain the outbox until stopped, or until nothing is due when ``once`` is set."""
+    with app.app_context(), ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while True:
+            claimed = drain_once(app, provider, executor, batch_size=batch_size)
+            if claimed:
+                continue
+            if once:
+                return
+            time.sleep(poll_interval)
@@ -1,16 +1,51 @@
-from flask import Blueprint, current_app, request, jsonify
-from app.models import User, Ticket, Notification, CableReceipt, InventoryMovement, OpticsRequest, OpticsReturn
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from app import unit_of_work
+from app.metrics import render_latest
+from app.auth_cache import AuthenticatedUser, auth_cache
+from app.balance_cache import balance_cache
+from app.cache import DASHBOARD_STATS_KEY, INVENTORY_LEDGER_MARKER, cache_get, cache_set, marker_version
+from app.forecast import forecast as forecast_inventory
+from app.optics_catalog import OTHER_OPTION as OPTICS_OTHER_OPTION, CatalogCycleError
+from app.models import (
+    User,
+    Ticket,
+    TicketStatusCount,
+    Notification,
+    CableReceipt,
+    InsufficientStockError,
+    InventoryBalance,
+    InventoryLocationBalance,
+    InventoryMovement,
+    InventoryRollup,
+    OpticsBalance,
+    OpticsMovement,
+    OpticsPart,
+    OpticsRequest,
+    OpticsReturn,
+    Sku,
+    StockReservation,
+)
 from app.notifications import (
     notify_ticket_created,
     notify_status_change,
+    notify_optics_request_bulk_status_change,
     notify_optics_request_created,
+    notify_optics_request_kit_created,
     notify_optics_request_status_change,
+    notify_optics_return_bulk_status_change,
     notify_optics_return_created,
+    notify_optics_return_kit_created,
     notify_optics_return_status_change,
 )
 from werkzeug.security import generate_password_hash, check_password_hash
 from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
 from datetime import datetime, timezone
+import base64
+import csv
+import io
+import json
+import math
+import time
 
 api = Blueprint('api', __name__)
 
@@ -30,36 +65,13 @@ STATUS_TRANSITIONS = {
     'fulfilled': {'closed'},
     'closed': set(),
 }
-OPTICS_ALLOWED_PARTS = [
-    "MMS4X50-NM",
-    "EX-SFP-1GE-LX-LU",
-    "MMS4X00-NM-T",
-    "Kitted GB 300",
-    "MMS1X00-NS400",
-    "MMS1V70-CM",
-    "MMS4X00-NM-FLT",
-    "QSFP-100G-DR-LWP-LU",
-    "HIGH4-4LG-KIT",
-    "EX-SFP-10GE-LR-LU",
-    "MAM1Q00A-QSA28",
-    "QDD-400G-LR4-S-LU",
-    "SFP-GE-T-LU",
-    "UACC-OM-SM-10G-D",
-]
-OPTICS_ALLOWED_PARTS_SET = set(OPTICS_ALLOWED_PARTS)
-OPTICS_OTHER_OPTION = "Other"
-OPTICS_KIT_BOMS = {
-    "Kitted GB 300": [
-        {"part_number": "MMS1V70-CM", "quantity": 4},
-        {"part_number": "MMS1X00-NS400", "quantity": 36},
-        {"part_number": "MMS4X00-NM-FLT", "quantity": 72},
-    ],
-}
 OPTICS_ADMIN_ACTIONS = {
     'approve': 'approved',
     'deny': 'denied',
     'archive': 'archived',
 }
+OPTICS_STATUSES = {'pending', *OPTICS_ADMIN_ACTIONS.values()}
+OPTICS_BULK_MAX_IDS = 200
 
 
 def _token_serializer():
@@ -79,9 +91,13 @@ def _require_actor():
     if not token:
         return None, jsonify({'error': 'Authorization bearer token is required'}), 401
 
+    cached_actor = auth_cache.get(token)
+    if cached_actor is not None:
+        return cached_actor, None, None
+
     max_age = int(current_app.config.get('AUTH_TOKEN_TTL_SECONDS', 86400))
     try:
-        payload = _token_serializer().loads(token, max_age=max_age)
+        payload, issued_at = _token_serializer().loads(token, max_age=max_age, return_timestamp=True)
     except SignatureExpired:
         return None, jsonify({'error': 'Token expired'}), 401
     except BadSignature:
@@ -91,7 +107,137 @@ def _require_actor():
     user = User.get(user_id)
     if not user:
         return None, jsonify({'error': 'User not found'}), 404
-    return user, None, None
+
+    actor = AuthenticatedUser.from_user(user)
+    cache_ttl = int(current_app.config.get('AUTH_CACHE_TTL_SECONDS', 60))
+    if cache_ttl > 0:
+        # Never serve a cached actor past the token's own expiry.
+        auth_cache.put(token, actor, min(time.time() + cache_ttl, issued_at.timestamp() + max_age))
+    return actor, None, None
+
+
+def _encode_cursor(created_at, row_id):
+    raw = f'{created_at.isoformat()}|{row_id}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor):
+    """Decode an opaque page cursor into ``(created_at, id)``; raises ValueError."""
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+    except (UnicodeError, ValueError) as exc:
+        raise ValueError('cursor is invalid') from exc
+    created_at_raw, _, row_id_raw = raw.rpartition('|')
+    created_at = _parse_datetime(created_at_raw)
+    return created_at, int(row_id_raw)
+
+
+def _parse_datetime(value):
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _parse_page_args(default_limit=50, max_limit=200):
+    """
+    Read ``limit``, ``cursor``, ``created_from`` and ``created_to`` from the query string.
+
+    Returns ``(args, error_message)`` in the style of the payload validators.
+    """
+    limit_raw = request.args.get('limit') or str(default_limit)
+    try:
+        limit = int(limit_raw)
+    except ValueError:
+        return None, 'limit must be an integer'
+
+    cursor = None
+    cursor_raw = request.args.get('cursor')
+    if cursor_raw:
+        try:
+            cursor = _decode_cursor(cursor_raw)
+        except ValueError:
+            return None, 'cursor is invalid'
+
+    bounds, validation_error = _parse_date_range_args()
+    if validation_error:
+        return None, validation_error
+
+    return {
+        'limit': max(1, min(limit, max_limit)),
+        'cursor': cursor,
+        **bounds,
+    }, None
+
+
+def _parse_date_range_args():
+    """Read optional ``created_from`` (inclusive) and ``created_to`` (exclusive) from the query string."""
+    bounds = {}
+    for name in ('created_from', 'created_to'):
+        value = request.args.get(name)
+        if not value:
+            bounds[name] = None
+            continue
+        try:
+            bounds[name] = _parse_datetime(value)
+        except ValueError:
+            return None, f'{name} must be an ISO 8601 date or datetime'
+    return bounds, None
+
+
+def _parse_length_range_args():
+    """Read optional ``min_meters`` / ``max_meters`` (inclusive) from the query string."""
+    bounds = {}
+    for name in ('min_meters', 'max_meters'):
+        value = request.args.get(name)
+        if not value:
+            bounds[name] = None
+            continue
+        try:
+            bounds[name] = float(value)
+        except ValueError:
+            return None, f'{name} must be a number'
+        if not math.isfinite(bounds[name]):
+            return None, f'{name} must be a finite number'
+    return bounds, None
+
+
+def _csv_value(value):
+    if isinstance(value, dict):
+        return value.get('username', json.dumps(value))
+    if isinstance(value, list):
+        return json.dumps(value)
+    return '' if value is None else value
+
+
+def _stream_export(rows, export_format, filename):
+    """Stream model rows as NDJSON or CSV without materializing the result set."""
+    if export_format == 'csv':
+        def generate():
+            buffer = io.StringIO()
+            writer = None
+            for row in rows:
+                record = row.to_dict()
+                if writer is None:
+                    writer = csv.DictWriter(buffer, fieldnames=list(record))
+                    writer.writeheader()
+                writer.writerow({key: _csv_value(value) for key, value in record.items()})
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        mimetype = 'text/csv'
+    else:
+        def generate():
+            for row in rows:
+                yield json.dumps(row.to_dict()) + '\n'
+
+        mimetype = 'application/x-ndjson'
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{export_format}"'},
+    )
 
 
 def _validate_inventory_items(items):
@@ -124,6 +270,123 @@ def _validate_inventory_items(items):
     return normalized, None
 
 
+def _availability_report(quantities):
+    """Availability of ``{(cable_type, cable_length): requested}`` against cached balances."""
+    items = InventoryBalance.availability(quantities)
+    return {
+        'items': items,
+        'has_shortfall': any(item['shortfall'] > 0 for item in items),
+    }
+
+
+def _fulfillment_movements(ticket, stock_location=None):
+    """Build consumption ledger rows for a fulfilled ticket's valid items."""
+    movement_docs = []
+    for item in ticket.items:
+        cable_type = (item.get('cable_type') or '').strip()
+        cable_length = (item.get('cable_length') or '').strip()
+        try:
+            quantity = int(item.get('quantity', 0))
+        except (TypeError, ValueError):
+            continue
+        if not cable_type or not cable_length or quantity <= 0:
+            continue
+        movement_docs.append(
+            {
+                'movement_type': 'consumption',
+                'source_type': 'ticket_fulfillment',
+                'source_id': ticket.id,
+                'actor_user_id': ticket.assigned_to_id,
+                'cable_type': cable_type,
+                'cable_length': cable_length,
+                'quantity_delta': -quantity,
+                # ticket.location is the delivery address, not a storage location.
+                'location': stock_location,
+                'notes': f'Ticket #{ticket.id} fulfilled',
+            }
+        )
+    return movement_docs
+
+
+def _validate_optics_bulk_payload(data):
+    """Validate ``{'ids': [...], 'action': ..., 'admin_note': ...}`` for the bulk status endpoints."""
+    if not isinstance(data, dict):
+        return None, 'Request body must be a JSON object'
+    action = (data.get('action') or '').strip().lower()
+    if action not in OPTICS_ADMIN_ACTIONS:
+        return None, 'action must be one of approve, deny, archive'
+
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not ids:
+        return None, 'ids must be a non-empty list'
+    if len(ids) > OPTICS_BULK_MAX_IDS:
+        return None, f'ids must contain at most {OPTICS_BULK_MAX_IDS} entries'
+    if any(isinstance(value, bool) or not isinstance(value, int) for value in ids):
+        return None, 'ids must be integers'
+
+    admin_note = data.get('admin_note')
+    if admin_note is not None:
+        admin_note = str(admin_note).strip() or None
+
+    return {
+        'action': action,
+        # Keep the caller's order for the per-id results, without repeats.
+        'ids': list(dict.fromkeys(ids)),
+        'admin_note': admin_note,
+    }, None
+
+
+def _bulk_optics_status(model, source_type, movement_type, sign, notify, collection_key):
+    """
+    Apply one admin action to many optics requests or returns in one transaction.
+
+    Only rows whose status actually changes are updated, in a single
+    UPDATE. Their stock is posted (or reversed, for denials) in one ledger
+    batch by ``OpticsMovement.sync_postings``, and their requesters get one
+    digest email each. The response lists an outcome per requested id:
+    ``updated``, ``unchanged`` (already in that status) or ``not_found``.
+    """
+    actor, error_response, status_code = _require_actor()
+    if error_response:
+        return error_response, status_code
+    if actor.role != 'admin':
+        return jsonify({'error': f'Only admins can update optics {collection_key}'}), 403
+
+    payload, validation_error = _validate_optics_bulk_payload(request.json or {})
+    if validation_error:
+        return jsonify({'error': validation_error}), 400
+
+    status = OPTICS_ADMIN_ACTIONS[payload['action']]
+    with unit_of_work():
+        updated, unchanged_ids = model.set_status_many(
+            payload['ids'], status, admin_actor_id=actor.id, admin_note=payload['admin_note']
+        )
+        OpticsMovement.sync_postings(source_type, movement_type, sign, updated, actor_user_id=actor.id)
+        if updated:
+            notify(updated, status)
+
+    updated_ids = {row.id for row in updated}
+    current_app.logger.info(
+        'optics_bulk_status_changed source_type=%s actor_id=%s action=%s updated=%s',
+        source_type,
+        actor.id,
+        payload['action'],
+        len(updated_ids),
+    )
+
+    def outcome(row_id):
+        if row_id in updated_ids:
+            return 'updated'
+        return 'unchanged' if row_id in unchanged_ids else 'not_found'
+
+    return jsonify({
+        'action': payload['action'],
+        'results': [{'id': row_id, 'outcome': outcome(row_id)} for row_id in payload['ids']],
+        'updated': len(updated_ids),
+        collection_key: [row.to_dict() for row in updated],
+    }), 200
+
+
 def _validate_optics_request_payload(data):
     selected_part = (data.get('selected_part') or '').strip()
     other_part = (data.get('other_part') or '').strip()
@@ -142,6 +405,7 @@ def _validate_optics_request_payload(data):
     if quantity <= 0:
         return None, 'quantity must be greater than zero'
 
+    kit_name = None
     if selected_part == OPTICS_OTHER_OPTION:
         if not other_part:
             return None, 'other_part is required when selected_part is Other'
@@ -149,22 +413,16 @@ def _validate_optics_request_payload(data):
             return None, 'other_part must be 255 characters or fewer'
         line_items = [{'part_number': other_part, 'quantity': quantity}]
     else:
-        if selected_part not in OPTICS_ALLOWED_PARTS_SET:
+        catalog = OpticsPart.catalog()
+        if not catalog.is_active(selected_part):
             return None, 'selected_part is invalid'
-        kit_bom = OPTICS_KIT_BOMS.get(selected_part)
-        if kit_bom:
-            line_items = [
-                {
-                    'part_number': component['part_number'],
-                    'quantity': component['quantity'] * quantity,
-                }
-                for component in kit_bom
-            ]
-        else:
-            line_items = [{'part_number': selected_part, 'quantity': quantity}]
+        if catalog.is_kit(selected_part):
+            kit_name = selected_part
+        line_items = catalog.expand(selected_part, quantity)
 
     return {
         'line_items': line_items,
+        'kit_name': kit_name,
         'requester_name': requester_name,
         'requested_quantity': quantity,
     }, None
@@ -243,10 +501,50 @@ def get_user(user_id):
 
 @api.route('/tickets', methods=['GET'])
 def get_tickets():
-    """Get all tickets"""
+    """
+    Get tickets.
+
+    Without ``limit`` or ``cursor`` this returns the full list for older
+    clients. With either, it returns ``{'tickets': [...], 'next_cursor': ...}``
+    one keyset page at a time, newest first.
+    """
     include_deleted = request.args.get('include_deleted') == 'true'
-    tickets = Ticket.all(include_deleted=include_deleted)
-    return jsonify([ticket.to_dict() for ticket in tickets]), 200
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        tickets = Ticket.all(include_deleted=include_deleted)
+        return jsonify([ticket.to_dict() for ticket in tickets]), 200
+
+    page_args, validation_error = _parse_page_args()
+    if validation_error:
+        return jsonify({'error': validation_error}), 400
+
+    user_filters = {}
+    for name in ('assigned_to_id', 'created_by_id'):
+        value = request.args.get(name)
+        if value is None:
+            user_filters[name] = None
+            continue
+        try:
+            user_filters[name] = int(value)
+        except ValueError:
+            return jsonify({'error': f'{name} must be an integer'}), 400
+
+    status = request.args.get('status')
+    if status and status not in ALLOWED_STATUSES and status != 'deleted':
+        return jsonify({'error': f'Invalid status: {status}'}), 400
+
+    tickets, next_cursor = Ticket.page(
+        include_deleted=include_deleted,
+        status=status,
+        assigned_to_id=user_filters['assigned_to_id'],
+        created_by_id=user_filters['created_by_id'],
+        priority=request.args.get('priority'),
+        location=request.args.get('location'),
+        **page_args,
+    )
+    return jsonify({
+        'tickets': [ticket.to_dict() for ticket in tickets],
+        'next_cursor': _encode_cursor(*next_cursor) if next_cursor else None,
+    }), 200
 
 @api.route('/tickets/<int:ticket_id>', methods=['GET'])
 def get_ticket(ticket_id):
@@ -290,23 +588,33 @@ def create_ticket():
     if not assignee:
         return jsonify({'error': 'assigned_to_id must reference a valid user'}), 400
 
-    ticket = Ticket.create(
-        created_by_id=creator.id,
-        assigned_to_id=assigned_to_id,
-        items=items,
-        location=data.get('location'),
-        notes=data.get('notes'),
-        priority=data.get('priority', 'medium'),
-    )
+    with unit_of_work():
+        ticket = Ticket.create(
+            created_by_id=creator.id,
+            assigned_to_id=assigned_to_id,
+            items=items,
+            location=data.get('location'),
+            notes=data.get('notes'),
+            priority=data.get('priority', 'medium'),
+        )
 
-    # Send notifications
-    notify_ticket_created(ticket)
+        # Queue notifications in the same transaction as the ticket
+        notify_ticket_created(ticket)
 
-    return jsonify({'message': 'Ticket created', 'ticket': ticket.to_dict()}), 201
+    payload = {'message': 'Ticket created', 'ticket': ticket.to_dict()}
+    if data.get('check_availability'):
+        # Advisory only: shortfalls are flagged, the ticket is still created.
+        payload['availability'] = _availability_report(ticket.item_quantities())
+    return jsonify(payload), 201
 
 @api.route('/tickets/<int:ticket_id>', methods=['PATCH'])
 def update_ticket(ticket_id):
-    """Update ticket status"""
+    """
+    Update ticket status.
+
+    When the ticket becomes ``fulfilled``, ``stock_location`` names the storage
+    location the cable was issued from; without it consumption is unassigned.
+    """
     actor, error_response, status_code = _require_actor()
     if error_response:
         return error_response, status_code
@@ -336,43 +644,28 @@ def update_ticket(ticket_id):
         if actor.role != 'admin' and ticket.assigned_to_id != actor.id:
             return jsonify({'error': 'Only assignee or admin can update rejection reason'}), 403
         updates['rejection_reason'] = data['rejection_reason']
+    stock_location = data.get('stock_location')
+    if stock_location is not None:
+        if not isinstance(stock_location, str):
+            return jsonify({'error': 'stock_location must be a string'}), 400
+        stock_location = stock_location.strip() or None
 
-    ticket = Ticket.update_fields(ticket_id, updates) if updates else ticket
-
-    if old_status != ticket.status and ticket.status == 'fulfilled':
-        if not InventoryMovement.exists_for_source('ticket_fulfillment', ticket.id):
-            movement_docs = []
-            for item in ticket.items:
-                cable_type = (item.get('cable_type') or '').strip()
-                cable_length = (item.get('cable_length') or '').strip()
-                try:
-                    quantity = int(item.get('quantity', 0))
-                except (TypeError, ValueError):
-                    continue
-                if not cable_type or not cable_length or quantity <= 0:
-                    continue
-                movement_docs.append(
-                    {
-                        'movement_type': 'consumption',
-                        'source_type': 'ticket_fulfillment',
-                        'source_id': ticket.id,
-                        'actor_user_id': ticket.assigned_to_id,
-                        'cable_type': cable_type,
-                        'cable_length': cable_length,
-                        'quantity_delta': -quantity,
-                        'notes': f'Ticket #{ticket.id} fulfilled',
-                    }
+    # Status change, ledger rows and queued notifications commit together.
+    try:
+        with unit_of_work():
+            ticket = Ticket.update_fields(ticket_id, updates) if updates else ticket
+
+            if old_status != ticket.status and ticket.status == 'fulfilled':
+                InventoryMovement.create_once(
+                    'ticket_fulfillment', ticket.id, _fulfillment_movements(ticket, stock_location)
                 )
-            try:
-                InventoryMovement.create_many(movement_docs)
-            except Exception:
-                # Roll back status to avoid fulfilled-without-ledger inconsistency.
-                Ticket.update_fields(ticket_id, {'status': old_status})
-                return jsonify({'error': 'Inventory ledger update failed; ticket status rolled back'}), 500
 
-    # Notify if status changed significantly
-    if old_status != ticket.status and ticket.status in ['approved', 'rejected', 'fulfilled']:
-        notify_status_change(ticket, ticket.status)
+            # Notify if status changed significantly
+            if old_status != ticket.status and ticket.status in ['approved', 'rejected', 'fulfilled']:
+                notify_status_change(ticket, ticket.status)
+    except Exception:
+        current_app.logger.exception('ticket_update_failed ticket_id=%s actor_id=%s', ticket_id, actor.id)
+        return jsonify({'error': 'Ticket update failed; no changes were saved'}), 500
 
     return jsonify({'message': 'Ticket updated', 'ticket': ticket.to_dict()}), 200
 
@@ -436,8 +729,10 @@ def purge_ticket(ticket_id):
     if ticket.status != 'deleted':
         return jsonify({'error': 'Ticket must be archived before purge'}), 409
 
-    Notification.delete_by_ticket_id(ticket.id)
-    Ticket.hard_delete(ticket.id)
+    with unit_of_work():
+        Notification.delete_by_ticket_id(ticket.id)
+        StockReservation.delete_by_ticket_id(ticket.id)
+        Ticket.hard_delete(ticket.id)
     current_app.logger.info('ticket_purged ticket_id=%s actor_id=%s', ticket.id, actor.id)
     return jsonify({'message': 'Ticket permanently deleted'}), 200
 
@@ -458,32 +753,35 @@ def create_cable_receiving():
     if validation_error:
         return jsonify({'error': validation_error}), 400
 
-    receipt = CableReceipt.create(
-        received_by_id=actor.id,
-        items=items,
-        vendor=data.get('vendor'),
-        po_number=data.get('po_number'),
-        storage_location=data.get('storage_location'),
-        notes=data.get('notes'),
-    )
-
-    movement_docs = [
-        {
-            'movement_type': 'receipt',
-            'source_type': 'cable_receiving',
-            'source_id': receipt.id,
-            'actor_user_id': actor.id,
-            'cable_type': item['cable_type'],
-            'cable_length': item['cable_length'],
-            'quantity_delta': int(item['quantity']),
-            'notes': f'Cable receipt #{receipt.id}',
-        }
-        for item in receipt.items
-    ]
+    # Receipt and ledger rows commit together; a ledger failure leaves neither.
     try:
-        InventoryMovement.create_many(movement_docs)
+        with unit_of_work():
+            receipt = CableReceipt.create(
+                received_by_id=actor.id,
+                items=items,
+                vendor=data.get('vendor'),
+                po_number=data.get('po_number'),
+                storage_location=data.get('storage_location'),
+                notes=data.get('notes'),
+            )
+
+            movement_docs = [
+                {
+                    'movement_type': 'receipt',
+                    'source_type': 'cable_receiving',
+                    'source_id': receipt.id,
+                    'actor_user_id': actor.id,
+                    'cable_type': item['cable_type'],
+                    'cable_length': item['cable_length'],
+                    'quantity_delta': int(item['quantity']),
+                    'location': receipt.storage_location,
+                    'notes': f'Cable receipt #{receipt.id}',
+                }
+                for item in receipt.items
+            ]
+            InventoryMovement.create_many(movement_docs)
     except Exception:
-        CableReceipt.delete_by_id(receipt.id)
+        current_app.logger.exception('cable_receiving_failed actor_id=%s', actor.id)
         return jsonify({'error': 'Failed to write inventory ledger; receipt rolled back'}), 500
     current_app.logger.info('cable_receiving_created receipt_id=%s actor_id=%s', receipt.id, actor.id)
 
@@ -499,46 +797,389 @@ def list_cable_receiving():
 
 @api.route('/inventory/movements', methods=['GET'])
 def list_inventory_movements():
-    """List inventory movement ledger entries"""
-    source_type = request.args.get('source_type')
-    movement_type = request.args.get('movement_type')
-    source_id_raw = request.args.get('source_id')
-    limit_raw = request.args.get('limit') or '200'
-
-    source_id = None
-    if source_id_raw is not None:
+    """
+    List inventory movement ledger entries, newest first.
+
+    Without ``cursor`` this returns up to ``limit`` rows as a plain list for
+    older clients. With ``cursor`` (empty for the first page) it returns
+    ``{'movements': [...], 'next_cursor': ...}`` one keyset page at a time and
+    also accepts ``created_from``/``created_to``.
+    """
+    filters = {
+        'movement_type': request.args.get('movement_type'),
+        'source_type': request.args.get('source_type'),
+        'location': request.args.get('location') or None,
+    }
+    for name in ('source_id', 'actor_user_id'):
+        value = request.args.get(name)
+        if value is None:
+            filters[name] = None
+            continue
+        try:
+            filters[name] = int(value)
+        except ValueError:
+            return jsonify({'error': f'{name} must be an integer'}), 400
+
+    filters['sku_ids'] = None
+    if request.args.get('sku_id'):
         try:
-            source_id = int(source_id_raw)
+            filters['sku_ids'] = [int(request.args['sku_id'])]
         except ValueError:
-            return jsonify({'error': 'source_id must be an integer'}), 400
+            return jsonify({'error': 'sku_id must be an integer'}), 400
+    else:
+        length_bounds, validation_error = _parse_length_range_args()
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        sku_filters = {
+            'cable_type': request.args.get('cable_type') or None,
+            'cable_length': request.args.get('cable_length') or None,
+            **length_bounds,
+        }
+        if any(value is not None for value in sku_filters.values()):
+            filters['sku_ids'] = Sku.ids_matching(**sku_filters)
+
+    if 'cursor' in request.args:
+        page_args, validation_error = _parse_page_args(default_limit=200, max_limit=1000)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        movements, next_cursor = InventoryMovement.page(**filters, **page_args)
+        return jsonify({
+            'movements': [movement.to_dict() for movement in movements],
+            'next_cursor': _encode_cursor(*next_cursor) if next_cursor else None,
+        }), 200
+
     try:
-        limit = int(limit_raw)
+        limit = int(request.args.get('limit') or '200')
     except ValueError:
         return jsonify({'error': 'limit must be an integer'}), 400
 
-    limit = max(1, min(limit, 1000))
-    movements = InventoryMovement.list(
-        movement_type=movement_type,
-        source_type=source_type,
-        source_id=source_id,
-        limit=limit,
-    )
+    movements = InventoryMovement.list(**filters, limit=max(1, min(limit, 1000)))
     return jsonify([movement.to_dict() for movement in movements]), 200
 
 
+@api.route('/inventory/trends', methods=['GET'])
+def inventory_trends():
+    """
+    Per-SKU quantity and movement counts per day or week, from the rollup table.
+
+    ``created_from``/``created_to`` select buckets by their start date; filter
+    with ``movement_type``, ``sku_id`` or ``cable_type``/``cable_length``.
+    """
+    period = request.args.get('period') or 'day'
+    if period not in InventoryRollup.PERIODS:
+        return jsonify({'error': 'period must be one of day, week'}), 400
+    bounds, validation_error = _parse_date_range_args()
+    if validation_error:
+        return jsonify({'error': validation_error}), 400
+
+    sku_ids = None
+    if request.args.get('sku_id'):
+        try:
+            sku_ids = [int(request.args['sku_id'])]
+        except ValueError:
+            return jsonify({'error': 'sku_id must be an integer'}), 400
+    elif request.args.get('cable_type') or request.args.get('cable_length'):
+        sku_ids = Sku.ids_matching(
+            cable_type=request.args.get('cable_type') or None,
+            cable_length=request.args.get('cable_length') or None,
+        )
+
+    rows = InventoryRollup.trends(
+        period=period,
+        movement_type=request.args.get('movement_type'),
+        sku_ids=sku_ids,
+        start=bounds['created_from'].date() if bounds['created_from'] else None,
+        end=bounds['created_to'].date() if bounds['created_to'] else None,
+    )
+    return jsonify(rows), 200
+
+
+FORECAST_INT_ARGS = {
+    'window_days': (28, 1, 365),
+    'lead_time_days': (7, 0, 365),
+    'review_days': (7, 0, 365),
+}
+
+
+@api.route('/inventory/forecast', methods=['GET'])
+def inventory_forecast():
+    """Days of cover and reorder suggestions per SKU, cached until the next ledger write"""
+    params = {}
+    for name, (default, lowest, highest) in FORECAST_INT_ARGS.items():
+        try:
+            value = int(request.args.get(name) or default)
+        except ValueError:
+            return jsonify({'error': f'{name} must be an integer'}), 400
+        if not lowest <= value <= highest:
+            return jsonify({'error': f'{name} must be between {lowest} and {highest}'}), 400
+        params[name] = value
+    try:
+        service_z = float(request.args.get('service_z') or 1.65)
+    except ValueError:
+        return jsonify({'error': 'service_z must be a number'}), 400
+    if not 0 <= service_z <= 5:
+        return jsonify({'error': 'service_z must be between 0 and 5'}), 400
+    params['service_z'] = round(service_z, 2)
+
+    # One entry per parameter set; the ledger marker and day live in the value,
+    # so a ledger write overwrites the entry instead of orphaning a new file.
+    today = datetime.now(timezone.utc).date()
+    version = [marker_version(INVENTORY_LEDGER_MARKER), today.isoformat()]
+    cache_key = '-'.join(['inventory_forecast'] + [str(params[name]) for name in sorted(params)])
+    cached = cache_get(cache_key)
+    if cached is not None and cached.get('version') == version:
+        rows = cached['rows']
+    else:
+        rows = forecast_inventory(today=today, **params)
+        cache_set(cache_key, {'version': version, 'rows': rows}, current_app.config.get('FORECAST_CACHE_TTL', 3600))
+    return jsonify(rows), 200
+
+
 @api.route('/inventory/on-hand', methods=['GET'])
 def inventory_on_hand():
-    """Get on-hand inventory grouped by cable type and length"""
+    """
+    Get on-hand, reserved and available inventory grouped by cable type and length.
+
+    With ``as_of`` only historical on-hand is returned; reservations are not versioned.
+    ``location`` (or ``by_location=true`` for every location) returns on-hand per
+    storage location instead; reservations are not tied to a location.
+    """
     include_zero = request.args.get('include_zero') == 'true'
-    summary = InventoryMovement.summary_on_hand()
+    location = request.args.get('location') or None
+    if location is not None or request.args.get('by_location') == 'true':
+        if request.args.get('as_of'):
+            return jsonify({'error': 'as_of cannot be combined with location'}), 400
+        summary = InventoryLocationBalance.summary(location=location)
+        if not include_zero:
+            summary = [row for row in summary if row['on_hand'] != 0]
+        return jsonify(summary), 200
+
+    as_of = None
+    if request.args.get('as_of'):
+        try:
+            as_of = _parse_datetime(request.args['as_of'])
+        except ValueError:
+            return jsonify({'error': 'as_of must be an ISO 8601 date or datetime'}), 400
+    summary = InventoryMovement.summary_on_hand(as_of=as_of)
     if not include_zero:
-        summary = [row for row in summary if row.get('on_hand', 0) != 0]
+        summary = [row for row in summary if row.get('on_hand', 0) != 0 or row.get('reserved', 0) != 0]
     return jsonify(summary), 200
 
 
+@api.route('/inventory/transfers', methods=['POST'])
+def create_inventory_transfer():
+    """Move stock between storage locations as paired transfer movements"""
+    actor, error_response, status_code = _require_actor()
+    if error_response:
+        return error_response, status_code
+    if actor.role != 'admin':
+        return jsonify({'error': 'Only admins can transfer inventory'}), 403
+
+    data = request.json or {}
+    from_location = (data.get('from_location') or '').strip()
+    to_location = (data.get('to_location') or '').strip()
+    if not from_location or not to_location:
+        return jsonify({'error': 'from_location and to_location are required'}), 400
+    if from_location == to_location:
+        return jsonify({'error': 'from_location and to_location must differ'}), 400
+    items, validation_error = _validate_inventory_items(data.get('items'))
+    if validation_error:
+        return jsonify({'error': validation_error}), 400
+
+    try:
+        with unit_of_work():
+            movements = InventoryMovement.transfer(
+                from_location, to_location, items, actor_user_id=actor.id, notes=data.get('notes')
+            )
+    except InsufficientStockError as exc:
+        return jsonify({'error': str(exc), 'shortfalls': exc.shortfalls}), 409
+    except Exception:
+        current_app.logger.exception('inventory_transfer_failed actor_id=%s', actor.id)
+        return jsonify({'error': 'Failed to write inventory ledger; transfer rolled back'}), 500
+    current_app.logger.info(
+        'inventory_transfer_created from=%s to=%s actor_id=%s', from_location, to_location, actor.id
+    )
+    return jsonify({
+        'message': 'Inventory transferred',
+        'movements': [movement.to_dict() for movement in movements],
+    }), 201
+
+
+@api.route('/inventory/availability', methods=['POST'])
+def inventory_availability():
+    """Check a batch of requested items against available (on-hand minus reserved) stock"""
+    data = request.json or {}
+    items, error = _validate_inventory_items(data.get('items'))
+    if error:
+        return jsonify({'error': error}), 400
+    quantities = {}
+    for item in items:
+        key = (item['cable_type'], item['cable_length'])
+        quantities[key] = quantities.get(key, 0) + item['quantity']
+    return jsonify(_availability_report(quantities)), 200
+
+
+@api.route('/inventory/footage', methods=['GET'])
+def inventory_footage():
+    """Total meters moved per cable type for one movement type and date window"""
+    bounds, validation_error = _parse_date_range_args()
+    if validation_error:
+        return jsonify({'error': validation_error}), 400
+    length_bounds, validation_error = _parse_length_range_args()
+    if validation_error:
+        return jsonify({'error': validation_error}), 400
+
+    rows = InventoryMovement.footage(
+        movement_type=request.args.get('movement_type') or 'consumption',
+        cable_type=request.args.get('cable_type'),
+        **bounds,
+        **length_bounds,
+    )
+    return jsonify(rows), 200
+
+
+# ============= EXPORT ROUTES =============
+
+EXPORT_FORMATS = {'ndjson', 'csv'}
+
+
+@api.route('/exports/<dataset>', methods=['GET'])
+def export_dataset(dataset):
+    """Stream tickets, cable receipts or ledger rows as NDJSON or CSV"""
+    actor, error_response, status_code = _require_actor()
+    if error_response:
+        return error_response, status_code
+
+    export_format = (request.args.get('format') or 'ndjson').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': 'format must be one of ndjson, csv'}), 400
+    bounds, validation_error = _parse_date_range_args()
+    if validation_error:
+        return jsonify({'error': validation_error}), 400
+
+    if dataset == 'tickets':
+        rows = Ticket.iter_export(**bounds)
+    elif dataset == 'cable-receiving':
+        rows = CableReceipt.iter_export(**bounds)
+    elif dataset == 'inventory-movements':
+        rows = InventoryMovement.iter_export(
+            movement_type=request.args.get('movement_type'),
+            source_type=request.args.get('source_type'),
+            **bounds,
+        )
+    else:
+        return jsonify({'error': 'dataset must be one of tickets, cable-receiving, inventory-movements'}), 404
+
+    current_app.logger.info('export_started dataset=%s format=%s actor_id=%s', dataset, export_format, actor.id)
+    return _stream_export(rows, export_format, dataset)
+
+
 @api.route('/optics-parts', methods=['GET'])
 def list_optics_parts():
-    return jsonify(OPTICS_ALLOWED_PARTS + [OPTICS_OTHER_OPTION]), 200
+    """Orderable part numbers; the ETag is the catalog version, so clients revalidate with a cheap 304"""
+    catalog = OpticsPart.catalog()
+    response = jsonify(catalog.parts + [OPTICS_OTHER_OPTION])
+    response.set_etag(f'optics-catalog-{catalog.version}')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+
+def _validate_optics_components(components):
+    if not isinstance(components, list):
+        return None, 'components must be a list'
+    # A part listed twice is one BOM line with the quantities summed.
+    normalized = {}
+    for item in components:
+        part_number = (item.get('part_number') or '').strip() if isinstance(item, dict) else ''
+        if not part_number:
+            return None, 'Each component requires part_number'
+        try:
+            quantity = int(item.get('quantity'))
+        except (TypeError, ValueError):
+            return None, 'Each component quantity must be an integer'
+        if quantity <= 0:
+            return None, 'Each component quantity must be greater than zero'
+        normalized[part_number] = normalized.get(part_number, 0) + quantity
+    return [{'part_number': part_number, 'quantity': quantity} for part_number, quantity in normalized.items()], None
+
+
+def _save_optics_part(actor, part_number, write):
+    """Run a catalog edit, mapping BOM errors to 400/409 responses."""
+    try:
+        with unit_of_work():
+            part = write()
+    except KeyError as exc:
+        return jsonify({'error': f'Unknown component part: {exc.args[0]}'}), 400
+    except CatalogCycleError as exc:
+        return jsonify({'error': f'Kit would contain itself: {exc}'}), 409
+    current_app.logger.info('optics_part_saved part_number=%s actor_id=%s', part_number, actor.id)
+    return jsonify({'message': 'Optics part saved', 'part': part.to_dict(OpticsPart.catalog())}), 200
+
+
+@api.route('/optics-parts', methods=['POST'])
+def create_optics_part():
+    """Add a part or kit to the catalog (admin only)"""
+    actor, error_response, status_code = _require_actor()
+    if error_response:
+        return error_response, status_code
+    if actor.role != 'admin':
+        return jsonify({'error': 'Only admins can edit the optics catalog'}), 403
+
+    data = request.json or {}
+    part_number = (data.get('part_number') or '').strip()
+    if not part_number or len(part_number) > 255:
+        return jsonify({'error': 'part_number is required and must be 255 characters or fewer'}), 400
+    if part_number == OPTICS_OTHER_OPTION:
+        return jsonify({'error': f'{OPTICS_OTHER_OPTION} is reserved'}), 400
+    components, validation_error = _validate_optics_components(data.get('components') or [])
+    if validation_error:
+        return jsonify({'error': validation_error}), 400
+    if OpticsPart.get(part_number):
+        return jsonify({'error': 'Part already exists'}), 409
+
+    response, status = _save_optics_part(
+        actor, part_number, lambda: OpticsPart.create(part_number, components=components)
+    )
+    return response, 201 if status == 200 else status
+
+
+@api.route('/optics-parts/<path:part_number>', methods=['GET'])
+def get_optics_part(part_number):
+    """A catalog part with its direct components and its fully flattened BOM"""
+    part = OpticsPart.get(part_number)
+    if not part:
+        return jsonify({'error': 'Part not found'}), 404
+    catalog = OpticsPart.catalog()
+    payload = part.to_dict(catalog)
+    payload['flattened'] = catalog.expand(part_number, 1)
+    return jsonify(payload), 200
+
+
+@api.route('/optics-parts/<path:part_number>', methods=['PATCH'])
+def update_optics_part(part_number):
+    """Change a part's BOM or hide it from ordering (admin only)"""
+    actor, error_response, status_code = _require_actor()
+    if error_response:
+        return error_response, status_code
+    if actor.role != 'admin':
+        return jsonify({'error': 'Only admins can edit the optics catalog'}), 403
+
+    part = OpticsPart.get(part_number)
+    if not part:
+        return jsonify({'error': 'Part not found'}), 404
+    data = request.json or {}
+    components = None
+    if 'components' in data:
+        components, validation_error = _validate_optics_components(data['components'])
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+    active = data.get('active')
+    if active is not None and not isinstance(active, bool):
+        return jsonify({'error': 'active must be a boolean'}), 400
+
+    return _save_optics_part(
+        actor, part_number, lambda: OpticsPart.update(part, active=active, components=components)
+    )
 
 
 @api.route('/optics-requests', methods=['POST'])
@@ -552,37 +1193,97 @@ def create_optics_request():
     if validation_error:
         return jsonify({'error': validation_error}), 400
 
-    created_rows = []
-    for item in payload['line_items']:
-        optics_request = OpticsRequest.create(
-            requested_by_id=actor.id,
-            part_number=item['part_number'],
-            quantity=item['quantity'],
-            requester_name=payload['requester_name'],
-        )
-        notify_optics_request_created(optics_request)
+    if payload['kit_name'] is None:
+        with unit_of_work():
+            item = payload['line_items'][0]
+            optics_request = OpticsRequest.create(
+                requested_by_id=actor.id,
+                part_number=item['part_number'],
+                quantity=item['quantity'],
+                requester_name=payload['requester_name'],
+            )
+            notify_optics_request_created(optics_request)
         current_app.logger.info('optics_request_created request_id=%s actor_id=%s', optics_request.id, actor.id)
-        created_rows.append(optics_request)
-
-    if len(created_rows) == 1:
-        return jsonify({'message': 'Optics request created', 'request': created_rows[0].to_dict()}), 201
+        return jsonify({'message': 'Optics request created', 'request': optics_request.to_dict()}), 201
+
+    # All components and the single admin notification commit together.
+    with unit_of_work():
+        created_rows = OpticsRequest.create_kit(actor.id, payload['line_items'], payload['requester_name'])
+        notify_optics_request_kit_created(created_rows, payload['kit_name'], payload['requested_quantity'])
+        kit_order_id = created_rows[0].kit_order_id
+    # One query reloads the group (with requester) instead of refreshing each expired row.
+    created_rows = OpticsRequest.for_kit_order(kit_order_id)
+    current_app.logger.info(
+        'optics_request_kit_created kit_order_id=%s request_ids=%s actor_id=%s',
+        kit_order_id,
+        ','.join(str(row.id) for row in created_rows),
+        actor.id,
+    )
     return jsonify(
         {
             'message': 'Optics kit request created',
+            'kit_order_id': kit_order_id,
             'requested_quantity': payload['requested_quantity'],
             'requests': [row.to_dict() for row in created_rows],
         }
     ), 201
 
 
+def _optics_queue(model, actor, collection_key):
+    """
+    List optics requests or returns for ``actor``, newest first, archived rows excluded.
+
+    Filters: ``status``, ``part_number``, ``requested_by_id`` (admins),
+    ``created_from``/``created_to``, and ``include_archived=true`` to bring
+    archived rows back. Without ``limit`` or ``cursor`` this returns the
+    filtered plain list for older clients. With either, it returns
+    ``{collection_key: [...], 'next_cursor': ...}`` one keyset page at a time.
+    """
+    status = request.args.get('status')
+    if status and status not in OPTICS_STATUSES:
+        return jsonify({'error': f'Invalid status: {status}'}), 400
+
+    requested_by_id = request.args.get('requested_by_id')
+    if requested_by_id is not None:
+        try:
+            requested_by_id = int(requested_by_id)
+        except ValueError:
+            return jsonify({'error': 'requested_by_id must be an integer'}), 400
+
+    filters = {
+        'status': status,
+        'part_number': request.args.get('part_number'),
+        'requested_by_id': requested_by_id,
+        'include_archived': request.args.get('include_archived') == 'true',
+    }
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        bounds, validation_error = _parse_date_range_args()
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        rows = model.all_for_actor(actor, **filters, **bounds)
+        return jsonify([row.to_dict() for row in rows]), 200
+
+    page_args, validation_error = _parse_page_args()
+    if validation_error:
+        return jsonify({'error': validation_error}), 400
+
+    rows, next_cursor = model.page(actor, **filters, **page_args)
+    return jsonify({
+        collection_key: [row.to_dict() for row in rows],
+        'next_cursor': _encode_cursor(*next_cursor) if next_cursor else None,
+    }), 200
+
+
 @api.route('/optics-requests', methods=['GET'])
 def list_optics_requests():
+    """
+    List the actor's optics requests; see ``_optics_queue`` for the query string.
+    """
     actor, error_response, status_code = _require_actor()
     if error_response:
         return error_response, status_code
 
-    rows = OpticsRequest.all_for_actor(actor)
-    return jsonify([row.to_dict() for row in rows]), 200
+    return _optics_queue(OpticsRequest, actor, 'requests')
 
 
 @api.route('/optics-requests/<int:request_id>/status', methods=['PATCH'])
@@ -606,13 +1307,16 @@ def update_optics_request_status(request_id):
     if admin_note is not None:
         admin_note = str(admin_note).strip() or None
 
-    updated = OpticsRequest.set_status(
-        request_id=request_id,
-        status=OPTICS_ADMIN_ACTIONS[action],
-        admin_actor_id=actor.id,
-        admin_note=admin_note,
-    )
-    notify_optics_request_status_change(updated, updated.status)
+    with unit_of_work():
+        updated = OpticsRequest.set_status(
+            request_id=request_id,
+            status=OPTICS_ADMIN_ACTIONS[action],
+            admin_actor_id=actor.id,
+            admin_note=admin_note,
+        )
+        # Approval issues the stock once; denying an approved request reverses it.
+        OpticsMovement.sync_postings('optics_request', 'issue', -1, [updated], actor_user_id=actor.id)
+        notify_optics_request_status_change(updated, updated.status)
     current_app.logger.info(
         'optics_request_status_changed request_id=%s actor_id=%s action=%s',
         request_id,
@@ -622,6 +1326,13 @@ def update_optics_request_status(request_id):
     return jsonify({'message': 'Optics request updated', 'request': updated.to_dict()}), 200
 
 
+@api.route('/optics-requests/bulk-status', methods=['POST'])
+def bulk_update_optics_request_status():
+    return _bulk_optics_status(
+        OpticsRequest, 'optics_request', 'issue', -1, notify_optics_request_bulk_status_change, 'requests'
+    )
+
+
 @api.route('/optics-returns', methods=['POST'])
 def create_optics_return():
     actor, error_response, status_code = _require_actor()
@@ -633,23 +1344,36 @@ def create_optics_return():
     if validation_error:
         return jsonify({'error': validation_error}), 400
 
-    created_rows = []
-    for item in payload['line_items']:
-        optics_return = OpticsReturn.create(
-            requested_by_id=actor.id,
-            part_number=item['part_number'],
-            quantity=item['quantity'],
-            requester_name=payload['requester_name'],
-        )
-        notify_optics_return_created(optics_return)
+    if payload['kit_name'] is None:
+        with unit_of_work():
+            item = payload['line_items'][0]
+            optics_return = OpticsReturn.create(
+                requested_by_id=actor.id,
+                part_number=item['part_number'],
+                quantity=item['quantity'],
+                requester_name=payload['requester_name'],
+            )
+            notify_optics_return_created(optics_return)
         current_app.logger.info('optics_return_created return_id=%s actor_id=%s', optics_return.id, actor.id)
-        created_rows.append(optics_return)
-
-    if len(created_rows) == 1:
-        return jsonify({'message': 'Optics return created', 'return': created_rows[0].to_dict()}), 201
+        return jsonify({'message': 'Optics return created', 'return': optics_return.to_dict()}), 201
+
+    # All components and the single admin notification commit together.
+    with unit_of_work():
+        created_rows = OpticsReturn.create_kit(actor.id, payload['line_items'], payload['requester_name'])
+        notify_optics_return_kit_created(created_rows, payload['kit_name'], payload['requested_quantity'])
+        kit_order_id = created_rows[0].kit_order_id
+    # One query reloads the group (with requester) instead of refreshing each expired row.
+    created_rows = OpticsReturn.for_kit_order(kit_order_id)
+    current_app.logger.info(
+        'optics_return_kit_created kit_order_id=%s return_ids=%s actor_id=%s',
+        kit_order_id,
+        ','.join(str(row.id) for row in created_rows),
+        actor.id,
+    )
     return jsonify(
         {
             'message': 'Optics kit return created',
+            'kit_order_id': kit_order_id,
             'requested_quantity': payload['requested_quantity'],
             'returns': [row.to_dict() for row in created_rows],
         }
@@ -658,12 +1382,14 @@ def create_optics_return():
 
 @api.route('/optics-returns', methods=['GET'])
 def list_optics_returns():
+    """
+    List the actor's optics returns; see ``_optics_queue`` for the query string.
+    """
     actor, error_response, status_code = _require_actor()
     if error_response:
         return error_response, status_code
 
-    rows = OpticsReturn.all_for_actor(actor)
-    return jsonify([row.to_dict() for row in rows]), 200
+    return _optics_queue(OpticsReturn, actor, 'returns')
 
 
 @api.route('/optics-returns/<int:return_id>/status', methods=['PATCH'])
@@ -687,13 +1413,15 @@ def update_optics_return_status(return_id):
     if admin_note is not None:
         admin_note = str(admin_note).strip() or None
 
-    updated = OpticsReturn.set_status(
-        request_id=return_id,
-        status=OPTICS_ADMIN_ACTIONS[action],
-        admin_actor_id=actor.id,
-        admin_note=admin_note,
-    )
-    notify_optics_return_status_change(updated, updated.status)
+    with unit_of_work():
+        updated = OpticsReturn.set_status(
+            request_id=return_id,
+            status=OPTICS_ADMIN_ACTIONS[action],
+            admin_actor_id=actor.id,
+            admin_note=admin_note,
+        )
+        OpticsMovement.sync_postings('optics_return', 'return', 1, [updated], actor_user_id=actor.id)
+        notify_optics_return_status_change(updated, updated.status)
     current_app.logger.info(
         'optics_return_status_changed return_id=%s actor_id=%s action=%s',
         return_id,
@@ -702,6 +1430,34 @@ def update_optics_return_status(return_id):
     )
     return jsonify({'message': 'Optics return updated', 'return': updated.to_dict()}), 200
 
+
+@api.route('/optics-returns/bulk-status', methods=['POST'])
+def bulk_update_optics_return_status():
+    return _bulk_optics_status(
+        OpticsReturn, 'optics_return', 'return', 1, notify_optics_return_bulk_status_change, 'returns'
+    )
+
+
+@api.route('/optics/on-hand', methods=['GET'])
+def optics_on_hand():
+    """On-hand per optics part number from the running balances"""
+    include_zero = request.args.get('include_zero') == 'true'
+    summary = OpticsBalance.summary(part_number=request.args.get('part_number') or None)
+    if not include_zero:
+        summary = [row for row in summary if row['on_hand'] != 0]
+    return jsonify(summary), 200
+
+
+@api.route('/optics/movements', methods=['GET'])
+def list_optics_movements():
+    """Optics ledger entries, newest first"""
+    try:
+        limit = int(request.args.get('limit') or '200')
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    movements = OpticsMovement.list(part_number=request.args.get('part_number') or None, limit=max(1, min(limit, 1000)))
+    return jsonify([movement.to_dict() for movement in movements]), 200
+
 # ============= APPROVAL ROUTES (Token-based) =============
 
 @api.route('/tickets/<int:ticket_id>/approve/<token>', methods=['GET', 'POST'])
@@ -720,10 +1476,11 @@ def approve_ticket(ticket_id, token):
     if ticket.status != 'pending_approval':
         return jsonify({'message': 'Ticket already processed', 'status': ticket.status}), 200
 
-    ticket = Ticket.update_fields(ticket.id, {'status': 'approved'})
+    with unit_of_work():
+        ticket = Ticket.update_fields(ticket.id, {'status': 'approved'})
 
-    # Notify creator
-    notify_status_change(ticket, 'approved')
+        # Notify creator
+        notify_status_change(ticket, 'approved')
 
     return jsonify({
         'message': 'Ticket approved successfully!',
@@ -749,16 +1506,17 @@ def reject_ticket(ticket_id, token):
     # Get rejection reason from query params or body
     reason = request.args.get('reason') or request.json.get('reason') if request.json else None
 
-    ticket = Ticket.update_fields(
-        ticket.id,
-        {
-            'status': 'rejected',
-            'rejection_reason': reason or 'No reason provided',
-        }
-    )
+    with unit_of_work():
+        ticket = Ticket.update_fields(
+            ticket.id,
+            {
+                'status': 'rejected',
+                'rejection_reason': reason or 'No reason provided',
+            }
+        )
 
-    # Notify creator
-    notify_status_change(ticket, 'rejected')
+        # Notify creator
+        notify_status_change(ticket, 'rejected')
 
     return jsonify({
         'message': 'Ticket rejected',
@@ -770,25 +1528,39 @@ def reject_ticket(ticket_id, token):
 @api.route('/dashboard/stats', methods=['GET'])
 def get_dashboard_stats():
     """Get dashboard statistics"""
-    total_tickets = Ticket.count_all()
-    pending = Ticket.count_by_status('pending_approval')
-    approved = Ticket.count_by_status('approved')
-    rejected = Ticket.count_by_status('rejected')
-    fulfilled = Ticket.count_by_status('fulfilled')
-    archived = Ticket.count_by_status('deleted')
+    stats = cache_get(DASHBOARD_STATS_KEY)
+    if stats is None:
+        if current_app.config.get('DASHBOARD_STATS_SOURCE') == 'counters':
+            counts = TicketStatusCount.counts()
+        else:
+            counts = Ticket.status_counts()
+        stats = {
+            'total_tickets': sum(count for status, count in counts.items() if status != 'deleted'),
+            'pending_approval': counts.get('pending_approval', 0),
+            'approved': counts.get('approved', 0),
+            'rejected': counts.get('rejected', 0),
+            'fulfilled': counts.get('fulfilled', 0),
+            'archived': counts.get('deleted', 0),
+        }
+        cache_set(DASHBOARD_STATS_KEY, stats, current_app.config.get('DASHBOARD_STATS_CACHE_TTL', 10))
 
-    return jsonify({
-        'total_tickets': total_tickets,
-        'pending_approval': pending,
-        'approved': approved,
-        'rejected': rejected,
-        'fulfilled': fulfilled,
-        'archived': archived,
-    }), 200
+    return jsonify(stats), 200
 
 # ============= HEALTH CHECK =============
 
 @api.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({'status': 'healthy', 'timestamp': datetime.now(timezone.utc).isoformat()}), 200
+    return jsonify({
+        'status': 'healthy',
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'auth_cache': auth_cache.stats(),
+        'balance_cache': balance_cache.stats(),
+    }), 200
+
+
+@api.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = render_latest()
+    return Response(body, mimetype=content_type)
@@ -0,0 +1,72 @@
+"""Per-process map between ``(cable_type, cable_length)`` and ``skus.id``.
+
+SKU rows are never updated or deleted, so a resolved pair stays valid for the
+life of the process. Pairs resolved inside a transaction are only published to
+the shared map once that transaction commits; a rollback may have discarded
+the ``skus`` row they point at.
+"""
+
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class SkuCache:
+    def __init__(self):
+        self._ids = {}
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def id_for(self, key):
+        return self._ids.get(key)
+
+    def key_for(self, sku_id):
+        return self._keys.get(sku_id)
+
+    def publish(self, mapping):
+        with self._lock:
+            for key, sku_id in mapping.items():
+                self._ids[key] = sku_id
+                self._keys[sku_id] = key
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+            self._keys.clear()
+
+    def __len__(self):
+        return len(self._ids)
+
+
+sku_cache = SkuCache()
+
+
+def remember(session, mapping, inserted=False):
+    """
+    Record pairs resolved through ``session``.
+
+    Once the transaction has inserted ``skus`` rows (``inserted``), everything
+    it resolves is held back until commit; before that, every row it can see
+    is already committed and is published straight away.
+    """
+    if inserted or 'pending_skus' in session.info:
+        session.info.setdefault('pending_skus', {}).update(mapping)
+    else:
+        sku_cache.publish(mapping)
+
+
+def staged(session):
+    return session.info.get('pending_skus', {})
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_after_commit(session):
+    pending = session.info.pop('pending_skus', None)
+    if pending:
+        sku_cache.publish(pending)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('pending_skus', None)
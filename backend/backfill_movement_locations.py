@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Fill inventory_movements.location for rows posted before locations were tracked.
+
+Usage:
+    python backfill_movement_locations.py
+    python backfill_movement_locations.py --unassign-ticket-sites   # also undo an earlier run's ticket addresses
+
+Receipt rows take their receipt's storage_location; every other row, including
+ticket fulfillments (a ticket's location is its delivery address, not where the
+stock came from), stays unassigned. inventory_location_balances is then rebuilt
+from the ledger. Safe to re-run; only rows without a location are touched.
+
+An earlier version of this script, and fulfillments posted before
+``stock_location`` existed, stamped ticket_fulfillment rows with the ticket's
+address. ``--unassign-ticket-sites`` clears those rows back to unassigned before
+the rebuild.
+"""
+
+import argparse
+import sys
+
+from sqlalchemy import func, select, update
+
+from app import create_app, db
+from app.models import CableReceipt, InventoryLocationBalance, InventoryMovement, Ticket
+
+SOURCE_LOCATIONS = {
+    'cable_receiving': (CableReceipt.__table__, 'storage_location'),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--chunk-size', type=int, default=50000, help='ledger ids updated per transaction')
+    parser.add_argument(
+        '--unassign-ticket-sites',
+        action='store_true',
+        help="clear fulfillment rows whose location is their ticket's delivery address",
+    )
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        movement = InventoryMovement.__table__
+        max_id = db.session.query(func.max(InventoryMovement.id)).scalar() or 0
+        if args.unassign_ticket_sites:
+            ticket = Ticket.__table__
+            ticket_site = (
+                select(func.trim(ticket.c.location)).where(ticket.c.id == movement.c.source_id).scalar_subquery()
+            )
+            lower = 0
+            cleared = 0
+            while lower < max_id:
+                upper = lower + args.chunk_size
+                cleared += db.session.execute(
+                    update(movement)
+                    .where(
+                        movement.c.id > lower,
+                        movement.c.id <= upper,
+                        movement.c.source_type == 'ticket_fulfillment',
+                        movement.c.location == ticket_site,
+                    )
+                    .values(location=None)
+                ).rowcount
+                db.session.commit()
+                lower = upper
+            print(f"Unassigned {cleared} ticket_fulfillment ledger rows")
+
+        for source_type, (source, column) in SOURCE_LOCATIONS.items():
+            source_location = (
+                select(func.nullif(func.trim(source.c[column]), ''))
+                .where(source.c.id == movement.c.source_id)
+                .scalar_subquery()
+            )
+            lower = 0
+            updated = 0
+            while lower < max_id:
+                upper = lower + args.chunk_size
+                updated += db.session.execute(
+                    update(movement)
+                    .where(
+                        movement.c.id > lower,
+                        movement.c.id <= upper,
+                        movement.c.source_type == source_type,
+                        movement.c.location.is_(None),
+                    )
+                    .values(location=source_location)
+                ).rowcount
+                db.session.commit()
+                lower = upper
+            print(f"Checked {updated} {source_type} ledger rows")
+
+        totals = InventoryMovement.location_totals(chunk_size=args.chunk_size)
+        InventoryLocationBalance.replace_all(totals)
+        print(f"Rebuilt {len(totals)} location balances from ledger")
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Post optics ledger rows for requests and returns approved before the optics ledger existed.
+
+Usage:
+    python backfill_optics_ledger.py
+
+Safe to re-run; each approval is posted at most once (inventory_postings), and
+optics_balances is updated in the same transaction as each batch.
+"""
+
+import argparse
+import sys
+
+from app import create_app, unit_of_work
+from app.models import OpticsMovement, OpticsRequest, OpticsReturn
+
+SOURCES = (
+    (OpticsRequest, 'optics_request', 'issue', -1),
+    (OpticsReturn, 'optics_return', 'return', 1),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--batch-size', type=int, default=500, help='approvals posted per transaction')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        for model, source_type, movement_type, sign in SOURCES:
+            # Archived rows may have been approved first; admin_action_at alone cannot tell, so only
+            # rows still marked approved are posted.
+            rows = model.query.filter_by(status='approved').order_by(model.id.asc()).all()
+            posted = 0
+            for start in range(0, len(rows), args.batch_size):
+                with unit_of_work():
+                    for row in rows[start:start + args.batch_size]:
+                        created = OpticsMovement.create_once(
+                            source_type,
+                            row.id,
+                            [
+                                {
+                                    'movement_type': movement_type,
+                                    'source_type': source_type,
+                                    'source_id': row.id,
+                                    'actor_user_id': row.admin_action_by_id,
+                                    'part_number': row.part_number,
+                                    'quantity_delta': sign * int(row.quantity),
+                                    'notes': f'Backfilled {source_type} #{row.id}',
+                                }
+                            ],
+                        )
+                        if created:
+                            posted += 1
+            print(f"Posted {posted} of {len(rows)} approved {source_type} rows")
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""Parse skus.length_meters for SKUs created before lengths were parsed on write.
+
+Usage:
+    python backfill_sku_lengths.py
+
+Safe to re-run; SKUs whose cable_length has no recognised unit are listed and
+left NULL, so they count towards unparsed_quantity in footage totals.
+"""
+
+import sys
+
+from app import create_app
+from app.models import Sku
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        updated, unparsed = Sku.backfill_lengths()
+        for cable_length in unparsed:
+            print(f"  ⚠️  no unit in cable_length {cable_length!r}")
+        print(f"Parsed {updated} SKU lengths, {len(unparsed)} left without a length")
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
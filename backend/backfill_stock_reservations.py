@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""Hold stock for tickets approved before stock_reservations existed.
+
+Usage:
+    python backfill_stock_reservations.py
+
+Run once after upgrading an existing deployment. Safe to re-run; tickets that
+already hold stock are skipped, and inventory_balances.reserved is adjusted in
+the same transaction as each batch of holds.
+"""
+
+import argparse
+import sys
+
+from app import create_app
+from app.models import StockReservation
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--batch-size', type=int, default=500, help='tickets held per transaction')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        checked, held = StockReservation.backfill(batch_size=args.batch_size)
+        print(f"Checked {checked} open tickets, {held} newly holding stock")
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
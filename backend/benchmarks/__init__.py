@@ -0,0 +1 @@
+"""Performance benchmarks for the backend; each module runs with ``python -m benchmarks.<name>``."""
@@ -0,0 +1,220 @@
+"""Synthetic dataset generator for the endpoint benchmarks.
+
+Rows are bulk-inserted through the model tables in batches, so volumes in the
+millions fit in memory. Derived tables (``inventory_balances``,
+``inventory_location_balances``, ``inventory_rollups``,
+``stock_reservations`` and ``ticket_status_counts``) are rebuilt from the
+seeded rows at the end, exactly as the maintenance scripts would on a real
+deployment.
+"""
+
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+import itertools
+import random
+import secrets
+
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+
+from app import db
+from app.models import (
+    CableReceipt,
+    InventoryBalance,
+    InventoryLocationBalance,
+    InventoryMovement,
+    InventoryRollup,
+    OpticsRequest,
+    OpticsReturn,
+    Sku,
+    StockReservation,
+    Ticket,
+    TicketStatusCount,
+    User,
+)
+
+CABLE_TYPES = ['Cat6', 'Cat6A', 'OM4 LC-LC', 'OS2 LC-LC', 'DAC 100G', 'AOC 400G', 'Power C13-C14']
+CABLE_LENGTHS = ['1m', '2m', '3m', '5m', '10m', '15m', '30m', '100m']
+LOCATIONS = ['DC1-R01', 'DC1-R02', 'DC2-R11', 'DC2-R12', 'Lab', None]
+PRIORITIES = ['low', 'medium', 'high', 'urgent']
+TICKET_STATUSES = ['pending_approval', 'approved', 'rejected', 'in_progress', 'fulfilled', 'closed', 'deleted']
+OPTICS_PARTS = ['MMS4X50-NM', 'EX-SFP-1GE-LX-LU', 'MMS1X00-NS400', 'QSFP-100G-DR-LWP-LU', 'SFP-GE-T-LU']
+OPTICS_STATUSES = ['pending', 'approved', 'denied', 'archived']
+MOVEMENT_TYPES = ['receipt', 'consumption', 'adjustment']
+
+
+@dataclass
+class Scale:
+    users: int = 50
+    tickets: int = 5000
+    receipts: int = 1000
+    movements: int = 200000
+    optics_requests: int = 2000
+    optics_returns: int = 500
+    days: int = 365
+    batch_size: int = 10000
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def _batched_insert(model, rows, batch_size):
+    """Insert an iterable of row dicts ``batch_size`` at a time; returns the row count."""
+    batch = []
+    total = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(insert(model), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(model), batch)
+        total += len(batch)
+    db.session.commit()
+    return total
+
+
+def _spread(rng, start, days):
+    return start + timedelta(seconds=rng.randrange(days * 86400))
+
+
+def _items(rng, max_items=4):
+    return [
+        {
+            'cable_type': rng.choice(CABLE_TYPES),
+            'cable_length': rng.choice(CABLE_LENGTHS),
+            'quantity': str(rng.randint(1, 48)),
+        }
+        for _ in range(rng.randint(1, max_items))
+    ]
+
+
+def seed(scale, rng_seed=1):
+    """
+    Populate an empty schema with ``scale`` rows per table.
+
+    Returns ``{'counts': {...}, 'admin_id': int}``; the admin user can be used
+    to issue tokens for authenticated endpoints.
+    """
+    rng = random.Random(rng_seed)
+    start = datetime.now(timezone.utc) - timedelta(days=scale.days)
+    password_hash = generate_password_hash('benchmark')
+
+    _batched_insert(
+        User,
+        (
+            {
+                'username': f'bench_user_{index}',
+                'email': f'bench_user_{index}@example.com',
+                'phone': f'555-{index:07d}',
+                'password_hash': password_hash,
+                'role': 'admin' if index == 0 else 'user',
+                'created_at': start,
+            }
+            for index in range(max(scale.users, 2))
+        ),
+        scale.batch_size,
+    )
+    user_ids = [row.id for row in db.session.query(User.id).order_by(User.id.asc())]
+    admin_id = user_ids[0]
+
+    counts = {'users': len(user_ids)}
+    counts['tickets'] = _batched_insert(Ticket, _ticket_rows(rng, start, scale, user_ids), scale.batch_size)
+    counts['cable_receiving'] = _batched_insert(
+        CableReceipt,
+        (
+            {
+                'vendor': rng.choice(['Acme Cable', 'FiberCo', 'Patchworks']),
+                'po_number': f'PO-{index:06d}',
+                'storage_location': rng.choice(LOCATIONS),
+                'items': _items(rng, max_items=6),
+                'notes': None,
+                'received_by_id': rng.choice(user_ids),
+                'received_at': _spread(rng, start, scale.days),
+                'created_at': start,
+            }
+            for index in range(scale.receipts)
+        ),
+        scale.batch_size,
+    )
+    sku_ids = Sku.ids_for(itertools.product(CABLE_TYPES, CABLE_LENGTHS))
+    db.session.commit()
+    counts['inventory_movements'] = _batched_insert(
+        InventoryMovement, _movement_rows(rng, start, scale, user_ids, sku_ids), scale.batch_size
+    )
+    counts['optics_requests'] = _batched_insert(
+        OpticsRequest, _optics_rows(rng, start, scale, scale.optics_requests, user_ids), scale.batch_size
+    )
+    counts['optics_returns'] = _batched_insert(
+        OpticsReturn, _optics_rows(rng, start, scale, scale.optics_returns, user_ids), scale.batch_size
+    )
+
+    InventoryBalance.replace_all(InventoryMovement.ledger_totals())
+    InventoryLocationBalance.replace_all(InventoryMovement.location_totals())
+    InventoryRollup.rebuild()
+    StockReservation.backfill()
+    TicketStatusCount.rebuild()
+    counts['inventory_balances'] = InventoryBalance.query.count()
+    return {'counts': counts, 'admin_id': admin_id}
+
+
+def _ticket_rows(rng, start, scale, user_ids):
+    for _ in range(scale.tickets):
+        created_at = _spread(rng, start, scale.days)
+        status = rng.choice(TICKET_STATUSES)
+        yield {
+            'created_by_id': rng.choice(user_ids),
+            'assigned_to_id': rng.choice(user_ids),
+            'status': status,
+            'items': _items(rng),
+            'location': rng.choice(LOCATIONS),
+            'notes': None,
+            'priority': rng.choice(PRIORITIES),
+            'approval_token': secrets.token_urlsafe(24),
+            'deleted_at': created_at if status == 'deleted' else None,
+            'deleted_previous_status': 'closed' if status == 'deleted' else None,
+            'created_at': created_at,
+            'updated_at': created_at,
+        }
+
+
+def _movement_rows(rng, start, scale, user_ids, sku_ids):
+    source_types = {'receipt': 'cable_receiving', 'consumption': 'ticket_fulfillment', 'adjustment': None}
+    for index in range(scale.movements):
+        movement_type = rng.choice(MOVEMENT_TYPES)
+        quantity = rng.randint(1, 50)
+        cable_type = rng.choice(CABLE_TYPES)
+        cable_length = rng.choice(CABLE_LENGTHS)
+        yield {
+            'movement_type': movement_type,
+            'source_type': source_types[movement_type],
+            'source_id': index if movement_type != 'adjustment' else None,
+            'actor_user_id': rng.choice(user_ids),
+            'sku_id': sku_ids[(cable_type, cable_length)],
+            'cable_type': cable_type,
+            'cable_length': cable_length,
+            'quantity_delta': -quantity if movement_type == 'consumption' else quantity,
+            'location': rng.choice(LOCATIONS),
+            'notes': None,
+            'created_at': _spread(rng, start, scale.days),
+        }
+
+
+def _optics_rows(rng, start, scale, total, user_ids):
+    for _ in range(total):
+        created_at = _spread(rng, start, scale.days)
+        status = rng.choice(OPTICS_STATUSES)
+        requester_id = rng.choice(user_ids)
+        yield {
+            'part_number': rng.choice(OPTICS_PARTS),
+            'quantity': rng.randint(1, 16),
+            'requester_name': f'bench_user_{requester_id}',
+            'requested_by_id': requester_id,
+            'status': status,
+            'archived_at': created_at if status == 'archived' else None,
+            'admin_action_by_id': None if status == 'pending' else user_ids[0],
+            'admin_action_at': None if status == 'pending' else created_at,
+            'created_at': created_at,
+            'updated_at': created_at,
+        }
@@ -0,0 +1,171 @@
+"""Benchmark: latency of the hot read endpoints over a seeded dataset.
+
+Seeds a fresh database with ``benchmarks.dataset`` and times each endpoint
+through the Flask test client. Results are printed (and optionally written) as
+JSON; pass an earlier result with ``--compare`` to get per-endpoint ratios.
+
+The dashboard stats cache is disabled so every call measures the query path.
+
+Usage:
+    python -m benchmarks.endpoints                                  # SQLite temp file
+    python -m benchmarks.endpoints --movements 2000000 --output after.json --compare before.json
+    python -m benchmarks.endpoints --database-url postgresql://localhost/bench --reset
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.dataset import Scale, seed
+
+ENDPOINTS = [
+    ('tickets_full_list', '/api/tickets'),
+    ('tickets_page', '/api/tickets?limit=50'),
+    ('tickets_page_by_status', '/api/tickets?limit=50&status=in_progress'),
+    ('inventory_on_hand', '/api/inventory/on-hand'),
+    ('inventory_movements', '/api/inventory/movements?limit=200'),
+    ('inventory_movements_by_type', '/api/inventory/movements?limit=200&movement_type=receipt'),
+    ('inventory_trends_week', '/api/inventory/trends?period=week&movement_type=consumption'),
+    ('dashboard_stats', '/api/dashboard/stats'),
+    ('optics_requests', '/api/optics-requests'),
+    ('optics_returns', '/api/optics-returns'),
+    ('optics_requests_page', '/api/optics-requests?limit=50'),
+    ('optics_requests_page_by_status', '/api/optics-requests?limit=50&status=pending'),
+]
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _time_endpoint(client, path, headers, warmup, repeat):
+    for _ in range(warmup):
+        client.get(path, headers=headers)
+
+    samples = []
+    response = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(path, headers=headers)
+        body = response.get_data()
+        samples.append((time.perf_counter() - started) * 1000)
+    ordered = sorted(samples)
+    return {
+        'path': path,
+        'status': response.status_code,
+        'requests': repeat,
+        'response_bytes': len(body),
+        'mean_ms': round(statistics.fmean(samples), 3),
+        'p50_ms': round(ordered[len(ordered) // 2], 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        'max_ms': round(ordered[-1], 3),
+    }
+
+
+def _compare(results, baseline):
+    comparison = {}
+    for name, current in results.items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if not previous or not previous.get('p50_ms'):
+            continue
+        comparison[name] = {
+            'baseline_p50_ms': previous['p50_ms'],
+            'p50_ms': current['p50_ms'],
+            'ratio': round(current['p50_ms'] / previous['p50_ms'], 3),
+        }
+    return comparison
+
+
+def main():
+    defaults = Scale()
+    parser = argparse.ArgumentParser(description='Time hot read endpoints over a synthetic dataset.')
+    parser.add_argument('--database-url', help='database to seed (default: a temporary SQLite file)')
+    parser.add_argument('--reset', action='store_true', help='drop existing tables in --database-url first')
+    for field, value in defaults.to_dict().items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=int, default=value)
+    parser.add_argument('--repeat', type=int, default=20, help='timed requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=2, help='untimed requests per endpoint')
+    parser.add_argument('--seed', type=int, default=1, help='random seed for the generated data')
+    parser.add_argument('--output', help='also write the JSON result to this path')
+    parser.add_argument('--compare', help='earlier JSON result to compare p50 latencies against')
+    args = parser.parse_args()
+
+    temp_path = None
+    database_url = args.database_url
+    if not database_url:
+        fd, temp_path = tempfile.mkstemp(prefix='cable-bench-', suffix='.db')
+        os.close(fd)
+        database_url = f'sqlite:///{temp_path}'
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['DASHBOARD_STATS_CACHE_TTL'] = '0'
+
+    from app import create_app, db
+    from app.models import User
+    from app.routes import _issue_access_token
+
+    scale = Scale(**{field: getattr(args, field) for field in defaults.to_dict()})
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            app = create_app()
+        with app.app_context():
+            if args.reset:
+                db.drop_all()
+                db.create_all()
+            elif User.query.first() is not None:
+                print('Refusing to seed a non-empty database; pass --reset to drop its tables.', file=sys.stderr)
+                return 1
+
+            started = time.perf_counter()
+            seeded = seed(scale, rng_seed=args.seed)
+            seed_seconds = time.perf_counter() - started
+            token = _issue_access_token(db.session.get(User, seeded['admin_id']))
+            db.session.remove()
+
+        headers = {'Authorization': f'Bearer {token}'}
+        results = {}
+        with app.test_client() as client, contextlib.redirect_stdout(io.StringIO()):
+            for name, path in ENDPOINTS:
+                results[name] = _time_endpoint(client, path, headers, args.warmup, args.repeat)
+
+        report = {
+            'benchmark': 'endpoints',
+            'revision': _git_revision(),
+            'recorded_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'database': database_url.split(':', 1)[0],
+            'scale': scale.to_dict(),
+            'seeded': seeded['counts'],
+            'seed_seconds': round(seed_seconds, 2),
+            'endpoints': results,
+        }
+        if args.compare:
+            with open(args.compare, encoding='utf-8') as handle:
+                report['compare'] = _compare(results, json.load(handle))
+
+        output = json.dumps(report, indent=2)
+        print(output)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as handle:
+                handle.write(output + '\n')
+        return 0
+    finally:
+        if temp_path:
+            os.remove(temp_path)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Microbenchmark: Resend-style email sends with per-call vs pooled HTTP clients.
+
+Starts a local keep-alive HTTP server standing in for the Resend API and
+measures sends/second for the old per-call ``requests.post`` path and for
+``send_email`` using the shared provider session.
+
+Usage:
+    python -m benchmarks.notification_clients --sends 500
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from flask import Flask
+
+from app.notifications import provider_clients, provider_stats, send_email
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Send headers and body in one segment; split writes on a kept-alive
+    # connection stall on Nagle + delayed ACK and would skew the comparison.
+    wbufsize = 64 * 1024
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        body = b'{"id": "bench"}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _per_call_send(url, api_key):
+    # The pre-registry code path: a fresh connection for every message.
+    response = requests.post(
+        url,
+        headers={'Authorization': f'Bearer {api_key}', 'Content-Type': 'application/json'},
+        json={'from': 'bench@example.com', 'to': ['to@example.com'], 'subject': 'bench', 'html': '<p>bench</p>'},
+        timeout=10,
+    )
+    return response.status_code in [200, 201]
+
+
+def _rate(sends, fn):
+    started = time.perf_counter()
+    for _ in range(sends):
+        if not fn():
+            raise RuntimeError('stand-in server rejected a send')
+    elapsed = time.perf_counter() - started
+    return {'sends': sends, 'seconds': round(elapsed, 4), 'sends_per_second': round(sends / elapsed, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-call and pooled notification HTTP clients.')
+    parser.add_argument('--sends', type=int, default=500)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/emails'
+
+    app = Flask(__name__)
+    app.config.update(RESEND_API_KEY='bench-key', RESEND_API_URL=url, SENDGRID_FROM_EMAIL='bench@example.com')
+
+    with app.app_context(), contextlib.redirect_stdout(io.StringIO()):
+        provider_clients.reset()
+        before = _rate(args.sends, lambda: _per_call_send(url, 'bench-key'))
+        after = _rate(args.sends, lambda: send_email('to@example.com', 'bench', '<p>bench</p>'))
+        stats = provider_stats()
+
+    server.shutdown()
+    print(json.dumps(
+        {
+            'benchmark': 'notification_clients',
+            'before_per_call_client': before,
+            'after_pooled_client': after,
+            'speedup': round(after['sends_per_second'] / before['sends_per_second'], 2),
+            'provider_stats': stats,
+        },
+        indent=2,
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Create inventory_snapshots checkpoints from the inventory_movements ledger.
+
+Usage:
+    python create_inventory_snapshots.py                 # daily checkpoints up to now
+    python create_inventory_snapshots.py --every month   # month-end checkpoints
+    python create_inventory_snapshots.py --batch-size 50
+
+Continues from the latest existing checkpoint (or the first ledger row), so it
+is safe to run from cron. Each checkpoint is the previous one plus the
+movements in between; checkpoints are committed --batch-size at a time.
+Boundaries newer than --settle-seconds are skipped so movements still being
+committed are not missed.
+"""
+
+import argparse
+from datetime import datetime, timedelta, timezone
+import sys
+
+from sqlalchemy import func
+
+from app import create_app, db, unit_of_work
+from app.models import InventoryMovement, InventorySnapshot
+
+
+def _as_utc(value):
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def next_boundary(value, every):
+    """First UTC day/week/month boundary strictly after ``value``."""
+    day = _as_utc(value).replace(hour=0, minute=0, second=0, microsecond=0)
+    if every == 'day':
+        return day + timedelta(days=1)
+    if every == 'week':
+        return day + timedelta(days=7 - day.weekday())
+    if day.month == 12:
+        return day.replace(year=day.year + 1, month=1, day=1)
+    return day.replace(month=day.month + 1, day=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--every', choices=['day', 'week', 'month'], default='day', help='checkpoint interval')
+    parser.add_argument('--batch-size', type=int, default=30, help='checkpoints committed per transaction')
+    parser.add_argument('--settle-seconds', type=int, default=300, help='skip boundaries newer than this')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        latest = InventorySnapshot.latest()
+        if latest:
+            after = _as_utc(latest.taken_at)
+            totals = latest.totals()
+        else:
+            first = db.session.query(func.min(InventoryMovement.created_at)).scalar()
+            if first is None:
+                print('Ledger is empty; nothing to snapshot')
+                return 0
+            after = None
+            totals = {}
+
+        until = datetime.now(timezone.utc) - timedelta(seconds=args.settle_seconds)
+        boundary = next_boundary(after or first, args.every)
+        created = 0
+        while boundary <= until:
+            with unit_of_work():
+                for _ in range(args.batch_size):
+                    if boundary > until:
+                        break
+                    for key, delta in InventoryMovement.totals_between(after, boundary).items():
+                        totals[key] = totals.get(key, 0) + delta
+                    InventorySnapshot.create(boundary, totals)
+                    after = boundary
+                    boundary = next_boundary(boundary, args.every)
+                    created += 1
+            print(f"  ✓ through {after.isoformat()}")
+
+        print(f"Created {created} snapshots")
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,61 @@
 #!/bin/sh
 set -e
 
+# `entrypoint.sh worker [args]` runs only the notification worker, for
+# deployments that give it its own container.
+if [ "${1:-}" = "worker" ]; then
+  shift
+  echo "Starting notification worker..."
+  exec python notification_worker.py "$@"
+fi
+
 if [ "${RUN_SEED_ON_START:-false}" = "true" ]; then
   echo "Running database seed..."
   python seed_users.py
 fi
 
+# Shared across gunicorn workers so /api/metrics reports server-wide totals;
+# cleared on start so samples from a previous container run are not counted.
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/cable-ticketing-metrics}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+if [ "${RUN_NOTIFICATION_WORKER:-true}" != "true" ]; then
+  echo "Starting server..."
+  exec gunicorn --bind 0.0.0.0:5000 --workers 3 --timeout 120 run:app
+fi
+
+# Nothing else restarts the worker, so either process exiting stops the
+# container and the restart policy brings both back; otherwise the outbox
+# would stop draining behind a healthy /api/health.
+echo "Starting notification worker..."
+python notification_worker.py &
+worker_pid=$!
+
 echo "Starting server..."
-exec gunicorn --bind 0.0.0.0:5000 --workers 3 --timeout 120 run:app
+gunicorn --bind 0.0.0.0:5000 --workers 3 --timeout 120 run:app &
+server_pid=$!
+
+stopping=false
+trap 'stopping=true; kill -TERM "$server_pid" "$worker_pid" 2>/dev/null || true' INT TERM
+
+while kill -0 "$worker_pid" 2>/dev/null && kill -0 "$server_pid" 2>/dev/null; do
+  sleep 5
+done
+
+if [ "$stopping" = "false" ]; then
+  if kill -0 "$server_pid" 2>/dev/null; then
+    echo "Notification worker exited; stopping container." >&2
+  else
+    echo "Server exited; stopping container." >&2
+  fi
+fi
+
+kill -TERM "$server_pid" "$worker_pid" 2>/dev/null || true
+wait "$server_pid" 2>/dev/null || true
+wait "$worker_pid" 2>/dev/null || true
+
+if [ "$stopping" = "true" ]; then
+  exit 0
+fi
+exit 1
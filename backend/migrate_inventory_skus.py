@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Backfill skus and inventory_movements.sku_id from the ledger's cable strings.
+
+Usage:
+    python migrate_inventory_skus.py            # backfill, then drop the old string indexes
+    python migrate_inventory_skus.py --verify   # report rows still missing sku_id (exit 1 if any)
+
+Run once after upgrading an existing deployment, before rebuilding balances
+or creating snapshots. Safe to re-run; only rows without sku_id are touched.
+"""
+
+import argparse
+import sys
+
+from sqlalchemy import and_, exists, func, insert, select, text, update
+
+from app import create_app, db
+from app.models import InventoryMovement, Sku
+
+LEGACY_INDEXES = ('ix_inventory_movements_cable_type', 'ix_inventory_movements_cable_length')
+
+
+def _missing_count():
+    return db.session.query(func.count(InventoryMovement.id)).filter(InventoryMovement.sku_id.is_(None)).scalar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--verify', action='store_true', help='only report rows without sku_id')
+    parser.add_argument('--chunk-size', type=int, default=50000, help='ledger ids updated per transaction')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.verify:
+            missing = _missing_count()
+            print(f"{missing} ledger rows without sku_id")
+            return 1 if missing else 0
+
+        movement, sku = InventoryMovement.__table__, Sku.__table__
+        distinct_pairs = (
+            select(movement.c.cable_type, movement.c.cable_length, func.current_timestamp())
+            .where(movement.c.sku_id.is_(None))
+            .where(
+                ~exists().where(
+                    and_(sku.c.cable_type == movement.c.cable_type, sku.c.cable_length == movement.c.cable_length)
+                )
+            )
+            .distinct()
+        )
+        created = db.session.execute(
+            insert(sku).from_select(['cable_type', 'cable_length', 'created_at'], distinct_pairs)
+        ).rowcount
+        db.session.commit()
+        parsed, _ = Sku.backfill_lengths()
+        print(f"Created {created} SKUs ({parsed} lengths parsed)")
+
+        sku_lookup = (
+            select(sku.c.id)
+            .where(sku.c.cable_type == movement.c.cable_type, sku.c.cable_length == movement.c.cable_length)
+            .scalar_subquery()
+        )
+        max_id = db.session.query(func.max(InventoryMovement.id)).scalar() or 0
+        lower = 0
+        updated = 0
+        while lower < max_id:
+            upper = lower + args.chunk_size
+            updated += db.session.execute(
+                update(movement)
+                .where(movement.c.id > lower, movement.c.id <= upper, movement.c.sku_id.is_(None))
+                .values(sku_id=sku_lookup)
+            ).rowcount
+            db.session.commit()
+            lower = upper
+        print(f"Linked {updated} ledger rows to SKUs")
+
+        for index_name in LEGACY_INDEXES:
+            db.session.execute(text(f'DROP INDEX IF EXISTS {index_name}'))
+        db.session.commit()
+        print('Dropped string indexes on inventory_movements')
+
+        missing = _missing_count()
+        if missing:
+            print(f"  ⚠️  {missing} ledger rows still without sku_id")
+            return 1
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
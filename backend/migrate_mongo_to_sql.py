@@ -8,7 +8,7 @@ from dotenv import load_dotenv
 from pymongo import MongoClient
 
 from app import create_app, db
-from app.models import User, Ticket, Notification, CableReceipt, InventoryMovement
+from app.models import User, Ticket, Notification, CableReceipt, InventoryBalance, InventoryMovement, Sku
 
 
 def _parse_dt(value):
@@ -38,6 +38,7 @@ def main():
     with app.app_context():
         if truncate_first:
             db.session.query(Notification).delete()
+            db.session.query(InventoryBalance).delete()
             db.session.query(InventoryMovement).delete()
             db.session.query(CableReceipt).delete()
             db.session.query(Ticket).delete()
@@ -125,13 +126,15 @@ def main():
                 source_id = id_maps['receipts'].get(source_id)
             if source_type == 'ticket_fulfillment':
                 source_id = id_maps['tickets'].get(source_id)
+            sku_key = (doc.get('cable_type', ''), doc.get('cable_length', ''))
             movement = InventoryMovement(
                 movement_type=doc.get('movement_type', 'adjustment'),
                 source_type=source_type,
                 source_id=source_id,
                 actor_user_id=id_maps['users'].get(doc.get('actor_user_id')),
-                cable_type=doc.get('cable_type', ''),
-                cable_length=doc.get('cable_length', ''),
+                sku_id=Sku.ids_for([sku_key])[sku_key],
+                cable_type=sku_key[0],
+                cable_length=sku_key[1],
                 quantity_delta=int(doc.get('quantity_delta', 0)),
                 notes=doc.get('notes'),
                 created_at=_parse_dt(doc.get('created_at')) or datetime.now(timezone.utc),
@@ -140,6 +143,7 @@ def main():
             db.session.flush()
             id_maps['movements'][doc['id']] = movement.id
         db.session.commit()
+        InventoryBalance.replace_all(InventoryMovement.ledger_totals())
 
         # Notifications
         for doc in mongo.notifications.find().sort('id', 1):
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Deliver queued SMS/email notifications from the notification_outbox table.
+
+Usage:
+    python notification_worker.py                 # run until stopped
+    python notification_worker.py --once --fake   # drain due messages offline and exit
+
+Run more than one worker only against Postgres, where claims use
+SELECT ... FOR UPDATE SKIP LOCKED.
+"""
+
+import argparse
+
+from app import create_app
+from app.notifications import provider_stats
+from app.outbox import get_provider, run_worker
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--once', action='store_true', help='exit once no messages are due')
+    parser.add_argument('--fake', action='store_true', help='record messages instead of calling providers')
+    parser.add_argument('--batch-size', type=int, default=20, help='messages claimed per batch')
+    parser.add_argument('--concurrency', type=int, default=4, help='parallel provider calls')
+    parser.add_argument('--poll-interval', type=float, default=2.0, help='seconds to sleep when idle')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        provider = get_provider('fake' if args.fake else None)
+    print(f"📬 Notification worker started ({type(provider).__name__}, concurrency={args.concurrency})")
+    try:
+        run_worker(
+            app,
+            provider,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            poll_interval=args.poll_interval,
+            once=args.once,
+        )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for name, stats in sorted(provider_stats().items()):
+            average_ms = 1000 * stats['total_seconds'] / stats['calls'] if stats['calls'] else 0
+            print(f"  {name}: calls={stats['calls']} errors={stats['errors']} avg_ms={average_ms:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Recompute cable and optics balance tables from their ledgers.
+
+Usage:
+    python rebuild_inventory_balances.py            # report drift, then rebuild
+    python rebuild_inventory_balances.py --verify   # report drift only (exit 1 on drift)
+
+Run once after upgrading an existing deployment so the balance table is
+seeded from ledger history.
+"""
+
+import argparse
+import sys
+
+from sqlalchemy import text
+
+from app import create_app, db
+from app.models import (
+    InventoryBalance,
+    InventoryLocationBalance,
+    InventoryMovement,
+    OpticsBalance,
+    OpticsMovement,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--verify', action='store_true', help='only report drift, do not rewrite balances')
+    parser.add_argument('--chunk-size', type=int, default=50000, help='ledger ids summed per query')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if not args.verify and db.engine.dialect.name == 'postgresql':
+            # Block ledger writers until the rebuilt balances are committed.
+            db.session.execute(text('LOCK TABLE inventory_movements, optics_movements IN SHARE MODE'))
+
+        totals = InventoryMovement.ledger_totals(chunk_size=args.chunk_size)
+        drift = InventoryBalance.drift(totals)
+        for row in drift:
+            print(
+                f"  ⚠️  {row['cable_type']} | {row['cable_length']}: "
+                f"stored={row['stored']} ledger={row['expected']}"
+            )
+        print(f"Checked {len(totals)} SKUs, {len(drift)} drifted")
+
+        optics_totals = OpticsMovement.ledger_totals()
+        optics_drift = OpticsBalance.drift(optics_totals)
+        for row in optics_drift:
+            print(f"  ⚠️  {row['part_number']}: stored={row['stored']} ledger={row['expected']}")
+        print(f"Checked {len(optics_totals)} optics parts, {len(optics_drift)} drifted")
+
+        if args.verify:
+            db.session.rollback()
+            return 1 if drift or optics_drift else 0
+
+        # Sum everything before the first replace commits and releases the lock.
+        location_totals = InventoryMovement.location_totals(chunk_size=args.chunk_size)
+        InventoryBalance.replace_all(totals)
+        print(f"Rebuilt {len(totals)} balances from ledger")
+        InventoryLocationBalance.replace_all(location_totals)
+        print(f"Rebuilt {len(location_totals)} location balances from ledger")
+        OpticsBalance.replace_all(optics_totals)
+        print(f"Rebuilt {len(optics_totals)} optics balances from ledger")
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
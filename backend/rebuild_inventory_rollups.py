@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Recompute inventory_rollups (day/week trend buckets) from the inventory_movements ledger.
+
+Usage:
+    python rebuild_inventory_rollups.py
+    python rebuild_inventory_rollups.py --chunk-size 100000
+
+Run once after upgrading an existing deployment so trends include ledger
+history; new movements keep the rollups current from then on.
+"""
+
+import argparse
+import sys
+
+from sqlalchemy import text
+
+from app import create_app, db
+from app.models import InventoryRollup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--chunk-size', type=int, default=50000, help='ledger ids summed per query')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if db.engine.dialect.name == 'postgresql':
+            # Block ledger writers until the rebuilt rollups are committed.
+            db.session.execute(text('LOCK TABLE inventory_movements IN SHARE MODE'))
+
+        InventoryRollup.rebuild(chunk_size=args.chunk_size)
+        print(f"Rebuilt {InventoryRollup.query.count()} rollup buckets from ledger")
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
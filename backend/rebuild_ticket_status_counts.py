@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Recompute ticket_status_counts from the tickets table.
+
+Usage:
+    python rebuild_ticket_status_counts.py            # report drift, then rebuild
+    python rebuild_ticket_status_counts.py --verify   # report drift only (exit 1 on drift)
+
+Run once before setting DASHBOARD_STATS_SOURCE=counters on an existing
+deployment so the counters start from the current ticket totals.
+"""
+
+import argparse
+import sys
+
+from app import create_app, db
+from app.models import Ticket, TicketStatusCount
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--verify', action='store_true', help='only report drift, do not rewrite counters')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        expected = Ticket.status_counts()
+        stored = TicketStatusCount.counts()
+        drifted = sorted(status for status in set(expected) | set(stored) if expected.get(status, 0) != stored.get(status, 0))
+        for status in drifted:
+            print(f"  ⚠️  {status}: stored={stored.get(status, 0)} tickets={expected.get(status, 0)}")
+        print(f"Checked {len(expected)} statuses, {len(drifted)} drifted")
+
+        if args.verify:
+            db.session.rollback()
+            return 1 if drifted else 0
+
+        TicketStatusCount.rebuild()
+        print("Rebuilt ticket status counters")
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
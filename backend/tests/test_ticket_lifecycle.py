@@ -1,9 +1,24 @@
+import math
 import os
 import uuid
 import pytest
 
 import app as app_module
-from app.models import Ticket
+from app import db
+from app.models import (
+    InventoryBalance,
+    InventoryLocationBalance,
+    InventoryMovement,
+    InventoryPosting,
+    InventoryRollup,
+    InventorySnapshot,
+    Notification,
+    NotificationOutbox,
+    Sku,
+    StockReservation,
+    Ticket,
+    TicketStatusCount,
+)
 
 @pytest.fixture
 def client(monkeypatch):
@@ -16,9 +31,13 @@ def client(monkeypatch):
     monkeypatch.setattr(routes, "notify_ticket_created", lambda ticket: None)
     monkeypatch.setattr(routes, "notify_status_change", lambda ticket, status: None)
     monkeypatch.setattr(routes, "notify_optics_request_created", lambda optics_request: None)
+    monkeypatch.setattr(routes, "notify_optics_request_kit_created", lambda rows, kit_name, quantity: None)
     monkeypatch.setattr(routes, "notify_optics_request_status_change", lambda optics_request, status: None)
+    monkeypatch.setattr(routes, "notify_optics_request_bulk_status_change", lambda rows, status: None)
     monkeypatch.setattr(routes, "notify_optics_return_created", lambda optics_return: None)
+    monkeypatch.setattr(routes, "notify_optics_return_kit_created", lambda rows, kit_name, quantity: None)
     monkeypatch.setattr(routes, "notify_optics_return_status_change", lambda optics_return, status: None)
+    monkeypatch.setattr(routes, "notify_optics_return_bulk_status_change", lambda rows, status: None)
 
     with flask_app.test_client() as test_client:
         yield test_client
@@ -242,8 +261,8 @@ def test_cable_receiving_creates_positive_inventory(client):
     on_hand = client.get("/api/inventory/on-hand")
     assert on_hand.status_code == 200
     entries = on_hand.get_json()
-    assert {"cable_type": "Cat6", "cable_length": "100m", "on_hand": 5} in entries
-    assert {"cable_type": "Fiber", "cable_length": "200m", "on_hand": 2} in entries
+    assert {"cable_type": "Cat6", "cable_length": "100m", "on_hand": 5, "reserved": 0, "available": 5} in entries
+    assert {"cable_type": "Fiber", "cable_length": "200m", "on_hand": 2, "reserved": 0, "available": 2} in entries
 
 
 def test_cable_receiving_stores_po_and_storage_location(client):
@@ -308,7 +327,7 @@ def test_ticket_fulfillment_creates_consumption_movements(client):
 
     on_hand = client.get("/api/inventory/on-hand")
     assert on_hand.status_code == 200
-    assert {"cable_type": "Cat6", "cable_length": "100m", "on_hand": 9} in on_hand.get_json()
+    assert {"cable_type": "Cat6", "cable_length": "100m", "on_hand": 9, "reserved": 0, "available": 9} in on_hand.get_json()
 
 
 def test_optics_request_create_and_visibility(client):
@@ -589,3 +608,1272 @@ def test_optics_return_kit_expands_to_component_rows(client):
     assert by_part["MMS1V70-CM"] == 4
     assert by_part["MMS1X00-NS400"] == 36
     assert by_part["MMS4X00-NM-FLT"] == 72
+
+
+def test_ticket_keyset_pagination_and_filters(client):
+    creator = _create_user(client, "page_creator", "page_creator@example.com")
+    assignee_a = _create_user(client, "page_assignee_a", "page_assignee_a@example.com")
+    assignee_b = _create_user(client, "page_assignee_b", "page_assignee_b@example.com")
+    created_ids = [_create_ticket(client, creator, assignee_a["id"])["id"] for _ in range(5)]
+    other_id = _create_ticket(client, creator, assignee_b["id"])["id"]
+
+    seen = []
+    cursor = None
+    while True:
+        url = "/api/tickets?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        page = client.get(url)
+        assert page.status_code == 200
+        payload = page.get_json()
+        assert len(payload["tickets"]) <= 2
+        seen.extend(ticket["id"] for ticket in payload["tickets"])
+        cursor = payload["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == sorted(created_ids + [other_id], reverse=True)
+
+    filtered = client.get(f"/api/tickets?limit=50&assigned_to_id={assignee_b['id']}")
+    assert filtered.status_code == 200
+    assert [ticket["id"] for ticket in filtered.get_json()["tickets"]] == [other_id]
+    assert filtered.get_json()["next_cursor"] is None
+
+    by_status = client.get("/api/tickets?limit=50&status=approved")
+    assert by_status.get_json()["tickets"] == []
+
+    future = client.get("/api/tickets?limit=50&created_from=2999-01-01")
+    assert future.get_json()["tickets"] == []
+
+    assert client.get("/api/tickets?limit=2&cursor=not-a-cursor").status_code == 400
+    assert client.get("/api/tickets?limit=2&assigned_to_id=abc").status_code == 400
+
+
+def test_inventory_balances_track_ledger_and_report_drift(client):
+    admin = _create_user(client, "admin_balance", "admin_balance@example.com", role="admin")
+    for quantity in (5, 7):
+        created = client.post(
+            "/api/cable-receiving",
+            json={"items": [{"cable_type": "Cat6", "cable_length": "100m", "quantity": quantity}]},
+            headers={"Authorization": f"Bearer {admin['access_token']}"},
+        )
+        assert created.status_code == 201
+
+    assert InventoryBalance.summary() == [
+        {"cable_type": "Cat6", "cable_length": "100m", "on_hand": 12, "reserved": 0, "available": 12}
+    ]
+
+    totals = InventoryMovement.ledger_totals(chunk_size=1)
+    assert totals == {("Cat6", "100m"): 12}
+    assert InventoryBalance.drift(totals) == []
+
+    InventoryBalance.query.update({"on_hand": 3})
+    db.session.commit()
+    assert InventoryBalance.drift(totals) == [
+        {"cable_type": "Cat6", "cable_length": "100m", "expected": 12, "stored": 3}
+    ]
+
+    InventoryBalance.replace_all(totals)
+    assert InventoryBalance.drift(totals) == []
+    on_hand = client.get("/api/inventory/on-hand")
+    assert on_hand.get_json() == [
+        {"cable_type": "Cat6", "cable_length": "100m", "on_hand": 12, "reserved": 0, "available": 12}
+    ]
+
+
+def test_notification_outbox_worker_delivers_and_retries(client):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app import notifications, outbox
+
+    creator = _create_user(client, "outbox_creator", "outbox_creator@example.com")
+    assignee = _create_user(client, "outbox_assignee", "outbox_assignee@example.com")
+    ticket = Ticket.get(_create_ticket(client, creator, assignee["id"])["id"])
+
+    notifications.notify_ticket_created(ticket)
+    assert NotificationOutbox.count_by_status("pending") == 2
+    assert {n.status for n in Notification.query.filter_by(ticket_id=ticket.id)} == {"pending"}
+
+    class FlakyProvider:
+        def send(self, message):
+            raise outbox.DeliveryError("provider timeout")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert outbox.drain_once(client.application, FlakyProvider(), executor) == 2
+        # Failed messages back off instead of being retried immediately.
+        assert outbox.drain_once(client.application, FlakyProvider(), executor) == 0
+    assert NotificationOutbox.count_by_status("pending") == 2
+    assert {n.error_message for n in Notification.query.filter_by(ticket_id=ticket.id)} == {"provider timeout"}
+
+    NotificationOutbox.query.update({"next_attempt_at": NotificationOutbox.created_at})
+    db.session.commit()
+    fake = outbox.FakeProvider()
+    outbox.run_worker(client.application, fake, once=True)
+    assert sorted(message["channel"] for message in fake.sent) == ["email", "sms"]
+    assert NotificationOutbox.count_by_status("sent") == 2
+    sent = Notification.query.filter_by(ticket_id=ticket.id).all()
+    assert {n.status for n in sent} == {"sent"}
+    assert all(n.sent_at is not None for n in sent)
+
+    notifications.notify_status_change(ticket, "approved")
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        outbox.drain_once(client.application, FlakyProvider(), executor, max_attempts=1)
+    assert NotificationOutbox.count_by_status("failed") == 2
+
+
+def test_provider_clients_are_reused_and_rebuilt_after_fork(monkeypatch):
+    from app.notifications import ProviderClients
+
+    clients = ProviderClients()
+    built = []
+
+    def factory():
+        built.append(object())
+        return built[-1]
+
+    first = clients.get(("sns", "key"), factory)
+    assert clients.get(("sns", "key"), factory) is first
+    assert len(built) == 1
+
+    with clients.timed("sns"):
+        pass
+    assert clients.stats()["sns"]["calls"] == 1
+
+    monkeypatch.setattr("app.notifications.os.getpid", lambda: -1)
+    assert clients.get(("sns", "key"), factory) is not first
+    assert clients.stats() == {}
+
+
+def test_dashboard_stats_counters_and_cache_invalidation(client):
+    creator = _create_user(client, "stats_creator", "stats_creator@example.com")
+    assignee = _create_user(client, "stats_assignee", "stats_assignee@example.com")
+    admin = _create_user(client, "stats_admin", "stats_admin@example.com", role="admin")
+    tickets = [_create_ticket(client, creator, assignee["id"]) for _ in range(3)]
+
+    first = client.get("/api/dashboard/stats").get_json()
+    assert first["total_tickets"] == 3
+    assert first["pending_approval"] == 3
+
+    client.patch(
+        f"/api/tickets/{tickets[0]['id']}",
+        json={"status": "approved"},
+        headers={"Authorization": f"Bearer {assignee['access_token']}"},
+    )
+    client.delete(f"/api/tickets/{tickets[1]['id']}", headers={"Authorization": f"Bearer {creator['access_token']}"})
+    client.delete(f"/api/tickets/{tickets[2]['id']}", headers={"Authorization": f"Bearer {creator['access_token']}"})
+    client.post(f"/api/tickets/{tickets[2]['id']}/restore", headers={"Authorization": f"Bearer {creator['access_token']}"})
+    client.delete(f"/api/tickets/{tickets[1]['id']}/purge", headers={"Authorization": f"Bearer {admin['access_token']}"})
+
+    # Writes invalidate the shared cache, so the next read is fresh.
+    expected = {
+        "total_tickets": 2,
+        "pending_approval": 1,
+        "approved": 1,
+        "rejected": 0,
+        "fulfilled": 0,
+        "archived": 0,
+    }
+    assert client.get("/api/dashboard/stats").get_json() == expected
+    assert TicketStatusCount.counts() == Ticket.status_counts()
+
+    client.application.config["DASHBOARD_STATS_SOURCE"] = "counters"
+    from app.cache import invalidate_dashboard_stats
+
+    invalidate_dashboard_stats()
+    assert client.get("/api/dashboard/stats").get_json() == expected
+
+
+def test_auth_cache_hits_and_invalidates_on_role_change(client):
+    from app.auth_cache import AuthCache, auth_cache
+    from app.models import User
+
+    user = _create_user(client, "cached_user", "cached_user@example.com")
+    headers = {"Authorization": f"Bearer {user['access_token']}"}
+
+    before = auth_cache.stats()
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+    after = auth_cache.stats()
+    assert after["misses"] == before["misses"] + 1
+    assert after["hits"] == before["hits"] + 1
+
+    User.get(user["id"]).role = "admin"
+    db.session.commit()
+    me = client.get("/api/auth/me", headers=headers)
+    assert me.get_json()["user"]["role"] == "admin"
+    assert auth_cache.stats()["misses"] == after["misses"] + 1
+
+    bounded = AuthCache(max_entries=2)
+    for token in ("a", "b", "c"):
+        bounded.put(token, object(), expires_at=float("inf"))
+    assert bounded.get("a") is None
+    assert bounded.stats()["size"] == 2
+
+
+def test_exports_stream_ndjson_and_csv_with_date_filters(client):
+    import csv
+    import io
+    import json
+
+    admin = _create_user(client, "export_admin", "export_admin@example.com", role="admin")
+    headers = {"Authorization": f"Bearer {admin['access_token']}"}
+    for quantity in (1, 2, 3):
+        client.post(
+            "/api/cable-receiving",
+            json={"items": [{"cable_type": "Cat6", "cable_length": "10m", "quantity": quantity}]},
+            headers=headers,
+        )
+    _create_ticket(client, admin, admin["id"])
+
+    assert client.get("/api/exports/tickets").status_code == 401
+    assert client.get("/api/exports/unknown", headers=headers).status_code == 404
+    assert client.get("/api/exports/tickets?format=xml", headers=headers).status_code == 400
+
+    ndjson = client.get("/api/exports/inventory-movements", headers=headers)
+    assert ndjson.status_code == 200
+    assert ndjson.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in ndjson.get_data(as_text=True).splitlines()]
+    assert [row["quantity_delta"] for row in rows] == [1, 2, 3]
+
+    exported = client.get("/api/exports/tickets?format=csv", headers=headers)
+    assert exported.mimetype == "text/csv"
+    records = list(csv.DictReader(io.StringIO(exported.get_data(as_text=True))))
+    assert len(records) == 1
+    assert records[0]["created_by"] == "export_admin"
+    assert json.loads(records[0]["items"])[0]["cable_type"] == "Cat6"
+
+    future = client.get("/api/exports/cable-receiving?created_from=2999-01-01", headers=headers)
+    assert future.get_data(as_text=True) == ""
+
+
+def _count_commits():
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    commits = []
+
+    def record(session):
+        commits.append(session)
+
+    event.listen(Session, "after_commit", record)
+    return commits, lambda: event.remove(Session, "after_commit", record)
+
+
+def test_fulfillment_is_one_transaction_and_rolls_back_on_ledger_failure(client, monkeypatch):
+    creator = _create_user(client, "uow_creator", "uow_creator@example.com")
+    assignee = _create_user(client, "uow_assignee", "uow_assignee@example.com")
+    ticket = _create_ticket(client, creator, assignee["id"])
+    headers = {"Authorization": f"Bearer {assignee['access_token']}"}
+    client.patch(f"/api/tickets/{ticket['id']}", json={"status": "approved"}, headers=headers)
+    client.patch(f"/api/tickets/{ticket['id']}", json={"status": "in_progress"}, headers=headers)
+
+    def failing_apply(movements):
+        raise RuntimeError("disk full")
+
+    apply_movements = InventoryBalance.apply_movements
+    monkeypatch.setattr(InventoryBalance, "apply_movements", failing_apply)
+    failed = client.patch(f"/api/tickets/{ticket['id']}", json={"status": "fulfilled"}, headers=headers)
+    assert failed.status_code == 500
+    assert Ticket.get(ticket["id"]).status == "in_progress"
+    assert InventoryMovement.query.count() == 0
+    monkeypatch.setattr(InventoryBalance, "apply_movements", apply_movements)
+
+    commits, stop = _count_commits()
+    try:
+        fulfilled = client.patch(f"/api/tickets/{ticket['id']}", json={"status": "fulfilled"}, headers=headers)
+    finally:
+        stop()
+    assert fulfilled.status_code == 200
+    assert len(commits) == 1
+    assert InventoryMovement.query.count() == 1
+
+
+def test_cable_receiving_rolls_back_receipt_when_ledger_write_fails(client, monkeypatch):
+    admin = _create_user(client, "uow_admin", "uow_admin@example.com", role="admin")
+    headers = {"Authorization": f"Bearer {admin['access_token']}"}
+
+    def failing_apply(movements):
+        raise RuntimeError("constraint violation")
+
+    apply_movements = InventoryBalance.apply_movements
+    monkeypatch.setattr(InventoryBalance, "apply_movements", failing_apply)
+    failed = client.post(
+        "/api/cable-receiving",
+        json={"items": [{"cable_type": "Cat6", "cable_length": "5m", "quantity": 3}]},
+        headers=headers,
+    )
+    assert failed.status_code == 500
+    assert client.get("/api/cable-receiving").get_json() == []
+    assert InventoryMovement.query.count() == 0
+    monkeypatch.setattr(InventoryBalance, "apply_movements", apply_movements)
+
+    commits, stop = _count_commits()
+    try:
+        created = client.post(
+            "/api/cable-receiving",
+            json={"items": [{"cable_type": "Cat6", "cable_length": "5m", "quantity": 3}]},
+            headers=headers,
+        )
+    finally:
+        stop()
+    assert created.status_code == 201
+    assert len(commits) == 1
+
+
+def test_benchmark_dataset_seeds_consistent_derived_tables(client):
+    from benchmarks.dataset import Scale, seed
+
+    scale = Scale(users=5, tickets=40, receipts=10, movements=500, optics_requests=20, optics_returns=5, batch_size=64)
+    with client.application.app_context():
+        seeded = seed(scale)
+        assert seeded["counts"]["inventory_movements"] == 500
+        assert InventoryBalance.drift(InventoryMovement.ledger_totals()) == []
+        assert TicketStatusCount.counts() == Ticket.status_counts()
+
+    stats = client.get("/api/dashboard/stats").get_json()
+    assert stats["total_tickets"] + stats["archived"] == 40
+
+
+def test_metrics_record_latency_and_query_counts_per_route(client):
+    from prometheus_client import REGISTRY
+
+    user = _create_user(client, "metrics_user", "metrics_user@example.com")
+    headers = {"Authorization": f"Bearer {user['access_token']}"}
+    ticket = _create_ticket(client, user, user["id"])
+    labels = {"endpoint": "/api/tickets/<int:ticket_id>", "method": "GET"}
+
+    def sample(name, **extra):
+        return REGISTRY.get_sample_value(name, {**labels, **extra}) or 0
+
+    requests_before = sample("http_request_duration_seconds_count", status="200")
+    queries_before = sample("http_request_db_queries_sum")
+    for _ in range(2):
+        assert client.get(f"/api/tickets/{ticket['id']}", headers=headers).status_code == 200
+
+    assert sample("http_request_duration_seconds_count", status="200") == requests_before + 2
+    assert sample("http_request_db_queries_sum") > queries_before
+    assert sample("http_response_bytes_count") >= 2
+
+    scrape = client.get("/api/metrics")
+    assert scrape.status_code == 200
+    assert scrape.mimetype == "text/plain"
+    assert 'http_request_db_queries_count{endpoint="/api/tickets/<int:ticket_id>",method="GET"}' in scrape.get_data(
+        as_text=True
+    )
+
+
+def test_on_hand_as_of_uses_latest_snapshot_plus_later_movements(client, monkeypatch, capsys):
+    from datetime import datetime, timedelta, timezone
+
+    from sqlalchemy import event
+
+    import create_inventory_snapshots
+
+    start = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0) - timedelta(days=5)
+    with client.application.app_context():
+        sku_id = Sku.ids_for([("Cat6", "5m")])[("Cat6", "5m")]
+        for day, delta in enumerate([10, -3, 7, -2, 5]):
+            db.session.add(
+                InventoryMovement(
+                    movement_type="receipt" if delta > 0 else "consumption",
+                    sku_id=sku_id,
+                    cable_type="Cat6",
+                    cable_length="5m",
+                    quantity_delta=delta,
+                    created_at=start + timedelta(days=day),
+                )
+            )
+        db.session.commit()
+
+    monkeypatch.setattr("sys.argv", ["create_inventory_snapshots.py", "--batch-size", "2", "--settle-seconds", "0"])
+    assert create_inventory_snapshots.main() == 0
+    assert "Created 5 snapshots" in capsys.readouterr().out
+
+    with client.application.app_context():
+        assert InventorySnapshot.query.count() == 5
+        queries = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            queries.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            as_of = start + timedelta(days=2, hours=6)
+            summary = InventoryMovement.summary_on_hand(as_of=as_of)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+        assert summary == [{"cable_type": "Cat6", "cable_length": "5m", "on_hand": 14}]
+        assert any("inventory_snapshots" in statement for statement in queries)
+
+    before_ledger = client.get(
+        "/api/inventory/on-hand", query_string={"as_of": (start - timedelta(days=1)).isoformat()}
+    )
+    assert before_ledger.get_json() == []
+    latest = client.get("/api/inventory/on-hand", query_string={"as_of": datetime.now(timezone.utc).isoformat()})
+    assert latest.get_json() == [{"cable_type": "Cat6", "cable_length": "5m", "on_hand": 17}]
+    assert client.get("/api/inventory/on-hand?as_of=yesterday").status_code == 400
+
+
+def test_ledger_references_sku_ids_and_cache_ignores_rolled_back_skus(client, monkeypatch):
+    from app.sku_cache import sku_cache
+
+    admin = _create_user(client, "sku_admin", "sku_admin@example.com", role="admin")
+    headers = {"Authorization": f"Bearer {admin['access_token']}"}
+    items = [
+        {"cable_type": "Cat6", "cable_length": "5m", "quantity": 3},
+        {"cable_type": "Cat6", "cable_length": "10m", "quantity": 2},
+        {"cable_type": "OM4", "cable_length": "5m", "quantity": 1},
+    ]
+    assert client.post("/api/cable-receiving", json={"items": items}, headers=headers).status_code == 201
+
+    movements = client.get("/api/inventory/movements").get_json()
+    assert all(movement["sku_id"] for movement in movements)
+    cat6 = client.get("/api/inventory/movements", query_string={"cable_type": "Cat6"}).get_json()
+    cat6_sku_ids = {movement["cable_length"]: movement["sku_id"] for movement in cat6}
+    assert sorted(cat6_sku_ids) == ["10m", "5m"]
+    by_id = client.get("/api/inventory/movements", query_string={"sku_id": cat6_sku_ids["5m"]}).get_json()
+    assert [(movement["cable_type"], movement["cable_length"]) for movement in by_id] == [("Cat6", "5m")]
+    assert client.get("/api/inventory/movements", query_string={"cable_type": "Nope"}).get_json() == []
+
+    def failing_apply(movements):
+        raise RuntimeError("constraint violation")
+
+    monkeypatch.setattr(InventoryBalance, "apply_movements", failing_apply)
+    failed = client.post(
+        "/api/cable-receiving",
+        json={"items": [{"cable_type": "Cat8", "cable_length": "1m", "quantity": 1}]},
+        headers=headers,
+    )
+    assert failed.status_code == 500
+    assert sku_cache.id_for(("Cat8", "1m")) is None
+    assert sku_cache.id_for(("Cat6", "5m")) == cat6_sku_ids["5m"]
+    with client.application.app_context():
+        assert Sku.query.filter_by(cable_type="Cat8").count() == 0
+
+
+def test_migrate_inventory_skus_backfills_legacy_ledger_rows(client, monkeypatch, capsys):
+    import migrate_inventory_skus
+
+    with client.application.app_context():
+        for cable_type, cable_length, delta in [("Cat6", "5m", 4), ("Cat6", "5m", -1), ("OS2", "3m", 2)]:
+            db.session.add(
+                InventoryMovement(
+                    movement_type="adjustment",
+                    cable_type=cable_type,
+                    cable_length=cable_length,
+                    quantity_delta=delta,
+                )
+            )
+        db.session.commit()
+
+    monkeypatch.setattr("sys.argv", ["migrate_inventory_skus.py", "--verify"])
+    assert migrate_inventory_skus.main() == 1
+    monkeypatch.setattr("sys.argv", ["migrate_inventory_skus.py", "--chunk-size", "2"])
+    assert migrate_inventory_skus.main() == 0
+    assert "Linked 3 ledger rows" in capsys.readouterr().out
+
+    with client.application.app_context():
+        assert Sku.query.count() == 2
+        assert InventoryMovement.query.filter(InventoryMovement.sku_id.is_(None)).count() == 0
+        assert InventoryMovement.ledger_totals() == {("Cat6", "5m"): 3, ("OS2", "3m"): 2}
+
+
+def test_length_parser_handles_common_units():
+    from decimal import Decimal
+
+    from app.lengths import parse_length_meters
+
+    assert parse_length_meters("100m") == Decimal("100.000")
+    assert parse_length_meters("3 ft") == Decimal("0.914")
+    assert parse_length_meters("10'") == Decimal("3.048")
+    assert parse_length_meters("6 inches") == Decimal("0.152")
+    assert parse_length_meters("1.5 Metres") == Decimal("1.500")
+    assert parse_length_meters("100") is None
+    assert parse_length_meters("patch") is None
+
+
+def test_footage_totals_and_length_range_filters(client):
+    admin = _create_user(client, "footage_admin", "footage_admin@example.com", role="admin")
+    headers = {"Authorization": f"Bearer {admin['access_token']}"}
+    client.post(
+        "/api/cable-receiving",
+        json={
+            "items": [
+                {"cable_type": "Cat6", "cable_length": "5m", "quantity": 4},
+                {"cable_type": "Cat6", "cable_length": "10ft", "quantity": 2},
+                {"cable_type": "Cat6", "cable_length": "long", "quantity": 1},
+                {"cable_type": "OM4", "cable_length": "30m", "quantity": 1},
+            ]
+        },
+        headers=headers,
+    )
+
+    footage = client.get("/api/inventory/footage", query_string={"movement_type": "receipt"}).get_json()
+    assert footage == [
+        {"cable_type": "Cat6", "meters": 26.096, "quantity": 7, "unparsed_quantity": 1},
+        {"cable_type": "OM4", "meters": 30.0, "quantity": 1, "unparsed_quantity": 0},
+    ]
+    short = client.get(
+        "/api/inventory/footage", query_string={"movement_type": "receipt", "max_meters": "5"}
+    ).get_json()
+    assert short == [{"cable_type": "Cat6", "meters": 26.096, "quantity": 6, "unparsed_quantity": 0}]
+    assert client.get("/api/inventory/footage", query_string={"movement_type": "consumption"}).get_json() == []
+
+    long_runs = client.get("/api/inventory/movements", query_string={"min_meters": "10"}).get_json()
+    assert [(row["cable_type"], row["cable_length"]) for row in long_runs] == [("OM4", "30m")]
+    assert client.get("/api/inventory/footage?min_meters=abc").status_code == 400
+    assert client.get("/api/inventory/footage?min_meters=nan").status_code == 400
+    assert client.get("/api/inventory/movements?max_meters=inf").status_code == 400
+
+
+def test_fulfillment_ledger_posts_once_per_ticket(client):
+    from app import _backfill_inventory_postings
+
+    with client.application.app_context():
+        docs = [
+            {
+                "movement_type": "consumption",
+                "source_type": "ticket_fulfillment",
+                "source_id": 41,
+                "cable_type": "Cat6",
+                "cable_length": "5m",
+                "quantity_delta": -2,
+            }
+        ] * 2
+        assert len(InventoryMovement.create_once("ticket_fulfillment", 41, docs)) == 2
+        assert InventoryMovement.create_once("ticket_fulfillment", 41, docs) is None
+        assert InventoryMovement.query.filter_by(source_id=41).count() == 2
+
+        # A ledger written before postings existed is claimed on startup.
+        InventoryPosting.query.delete()
+        InventoryMovement.create_many([{**docs[0], "source_id": 42}])
+        _backfill_inventory_postings()
+        assert InventoryMovement.create_once("ticket_fulfillment", 42, docs) is None
+        assert InventoryMovement.create_once("ticket_fulfillment", 43, docs) is not None
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def plan_app(request, monkeypatch):
+    if request.param == "postgresql":
+        url = os.environ.get("TEST_POSTGRES_URL")
+        if not url:
+            pytest.skip("TEST_POSTGRES_URL is not set")
+    else:
+        url = f"sqlite:////tmp/ticketing_plan_{uuid.uuid4().hex}.db"
+    monkeypatch.setenv("DATABASE_URL", url)
+    flask_app = app_module.create_app()
+    with flask_app.app_context():
+        yield flask_app
+        db.session.rollback()
+    if url.startswith("sqlite:////"):
+        os.remove(url[len("sqlite:///"):])
+
+
+def _query_plan(query):
+    """Return the database's plan for ``query`` as one lowercase string."""
+    sql = str(query.statement.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}))
+    connection = db.session.connection()
+    if db.engine.dialect.name == "postgresql":
+        # Tiny test tables would otherwise always be sequentially scanned.
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        rows = connection.exec_driver_sql(f"EXPLAIN {sql}").all()
+    else:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+    return " ".join(str(value) for row in rows for value in row).lower()
+
+
+def test_ledger_source_and_type_lookups_use_composite_indexes(plan_app):
+    source_lookup = InventoryMovement.query.filter_by(source_type="ticket_fulfillment", source_id=7).limit(1)
+    assert "ix_inventory_movements_source" in _query_plan(source_lookup)
+
+    typed_listing = (
+        InventoryMovement.query.filter_by(movement_type="receipt")
+        .order_by(InventoryMovement.created_at.desc())
+        .limit(200)
+    )
+    plan = _query_plan(typed_listing)
+    assert "ix_inventory_movements_type_created_at" in plan
+    assert "temp b-tree" not in plan  # SQLite: no separate sort step
+
+
+def test_inventory_movements_keyset_pages_with_filters(client):
+    admin = _create_user(client, "ledger_pager", "ledger_pager@example.com", role="admin")
+    other = _create_user(client, "ledger_other", "ledger_other@example.com", role="admin")
+    for actor, length in [(admin, "5m")] * 5 + [(other, "10m")] * 2:
+        response = client.post(
+            "/api/cable-receiving",
+            json={"items": [{"cable_type": "Cat6", "cable_length": length, "quantity": 1}]},
+            headers={"Authorization": f"Bearer {actor['access_token']}"},
+        )
+        assert response.status_code == 201
+
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        page = client.get(
+            "/api/inventory/movements",
+            query_string={"cursor": cursor, "limit": 2, "cable_length": "5m", "actor_user_id": admin["id"]},
+        ).get_json()
+        assert len(page["movements"]) <= 2
+        seen.extend(page["movements"])
+        cursor = page["next_cursor"]
+    assert len(seen) == 5
+    assert len({row["id"] for row in seen}) == 5
+    assert [(row["created_at"], row["id"]) for row in seen] == sorted(
+        ((row["created_at"], row["id"]) for row in seen), reverse=True
+    )
+    assert {row["actor_user_id"] for row in seen} == {admin["id"]}
+
+    future = client.get(
+        "/api/inventory/movements", query_string={"cursor": "", "created_from": "2999-01-01"}
+    ).get_json()
+    assert future == {"movements": [], "next_cursor": None}
+    legacy = client.get("/api/inventory/movements", query_string={"actor_user_id": other["id"]}).get_json()
+    assert [row["cable_length"] for row in legacy] == ["10m", "10m"]
+    assert client.get("/api/inventory/movements?cursor=bogus").status_code == 400
+
+
+def test_deep_movement_pages_are_index_range_scans(plan_app):
+    from datetime import datetime, timezone
+
+    cursor = (datetime(2024, 1, 1, tzinfo=timezone.utc), 500)
+    for filters, index_name in [
+        ({}, "ix_inventory_movements_created_at_id"),
+        ({"sku_ids": [3]}, "ix_inventory_movements_sku_created_at_id"),
+        ({"actor_user_id": 2}, "ix_inventory_movements_actor_created_at_id"),
+    ]:
+        query = (
+            InventoryMovement._filtered(**filters)
+            .filter(db.tuple_(InventoryMovement.created_at, InventoryMovement.id) < cursor)
+            .order_by(InventoryMovement.created_at.desc(), InventoryMovement.id.desc())
+            .limit(201)
+        )
+        plan = _query_plan(query)
+        assert index_name in plan
+        assert "temp b-tree" not in plan
+
+
+def test_optics_queue_keyset_pages_filter_and_hide_archived(client):
+    admin = _create_user(client, "queue_admin", "queue_admin@example.com", role="admin")
+    user = _create_user(client, "queue_user", "queue_user@example.com")
+    admin_headers = {"Authorization": f"Bearer {admin['access_token']}"}
+    user_headers = {"Authorization": f"Bearer {user['access_token']}"}
+    ids = []
+    for part, actor_headers in [("SFP-GE-T-LU", user_headers)] * 4 + [("MMS4X50-NM", admin_headers)] * 2:
+        created = client.post(
+            "/api/optics-requests",
+            json={"selected_part": part, "quantity": 1, "requester_name": "Queue T"},
+            headers=actor_headers,
+        )
+        assert created.status_code == 201
+        ids.append(created.get_json()["request"]["id"])
+    client.patch(f"/api/optics-requests/{ids[0]}/status", json={"action": "archive"}, headers=admin_headers)
+
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        page = client.get(
+            "/api/optics-requests",
+            query_string={"cursor": cursor, "limit": 2, "part_number": "SFP-GE-T-LU"},
+            headers=admin_headers,
+        ).get_json()
+        assert len(page["requests"]) <= 2
+        seen.extend(page["requests"])
+        cursor = page["next_cursor"]
+    assert [row["id"] for row in seen] == sorted(ids[1:4], reverse=True)
+
+    own = client.get("/api/optics-requests", query_string={"limit": 10}, headers=user_headers).get_json()
+    assert {row["requested_by"]["id"] for row in own["requests"]} == {user["id"]}
+    archived = client.get(
+        "/api/optics-requests", query_string={"limit": 10, "status": "archived"}, headers=admin_headers
+    ).get_json()
+    assert [row["id"] for row in archived["requests"]] == [ids[0]]
+    legacy = client.get("/api/optics-requests", headers=admin_headers).get_json()
+    assert len(legacy) == 5
+    everything = client.get("/api/optics-requests?include_archived=true", headers=admin_headers).get_json()
+    assert len(everything) == 6
+    legacy_filtered = client.get(
+        "/api/optics-requests", query_string={"part_number": "MMS4X50-NM"}, headers=admin_headers
+    ).get_json()
+    assert [row["id"] for row in legacy_filtered] == sorted(ids[4:], reverse=True)
+    assert client.get(
+        "/api/optics-requests", query_string={"created_from": "2999-01-01"}, headers=admin_headers
+    ).get_json() == []
+    assert client.get("/api/optics-returns?limit=5", headers=user_headers).get_json() == {
+        "returns": [],
+        "next_cursor": None,
+    }
+    assert client.get("/api/optics-requests?limit=5&status=lost", headers=admin_headers).status_code == 400
+
+
+def test_optics_queue_pages_are_index_range_scans(plan_app):
+    from datetime import datetime, timezone
+    from types import SimpleNamespace
+
+    from app.models import OpticsRequest, OpticsReturn
+
+    cursor = (datetime(2024, 1, 1, tzinfo=timezone.utc), 500)
+    for model in (OpticsRequest, OpticsReturn):
+        table = model.__tablename__
+        for actor, filters, index_name in [
+            (SimpleNamespace(role="admin", id=1), {"status": "pending"}, f"ix_{table}_status_created_at_id"),
+            (SimpleNamespace(role="user", id=2), {}, f"ix_{table}_requester_created_at_id"),
+        ]:
+            query = (
+                model._filtered(actor, **filters)
+                .filter(db.tuple_(model.created_at, model.id) < cursor)
+                .order_by(model.created_at.desc(), model.id.desc())
+                .limit(51)
+            )
+            plan = _query_plan(query)
+            assert index_name in plan
+            assert "temp b-tree" not in plan
+
+
+def test_inventory_rollups_track_ledger_writes_and_rebuild_matches(client):
+    from datetime import datetime, timezone
+
+    admin = _create_user(client, "trend_admin", "trend_admin@example.com", role="admin")
+    headers = {"Authorization": f"Bearer {admin['access_token']}"}
+    ticket = _create_ticket(client, admin, admin["id"])
+    for item in [{"cable_type": "Cat6", "cable_length": "100m", "quantity": 5}] * 2:
+        client.post("/api/cable-receiving", json={"items": [item]}, headers=headers)
+    for status in ["approved", "in_progress", "fulfilled"]:
+        client.patch(f"/api/tickets/{ticket['id']}", json={"status": status}, headers=headers)
+
+    today = datetime.now(timezone.utc).date()
+    daily = client.get("/api/inventory/trends", query_string={"period": "day"}).get_json()
+    assert [(row["bucket_start"], row["movement_type"], row["quantity"], row["movements"]) for row in daily] == [
+        (today.isoformat(), "consumption", -1, 1),
+        (today.isoformat(), "receipt", 10, 2),
+    ]
+    weekly = client.get(
+        "/api/inventory/trends",
+        query_string={"period": "week", "movement_type": "receipt", "cable_type": "Cat6"},
+    ).get_json()
+    assert weekly[0]["bucket_start"] == InventoryRollup.bucket_start_for(today, "week").isoformat()
+    assert weekly[0]["quantity"] == 10
+    assert client.get("/api/inventory/trends?period=month").status_code == 400
+
+    with client.application.app_context():
+        InventoryRollup.rebuild(chunk_size=1)
+    assert client.get("/api/inventory/trends", query_string={"period": "day"}).get_json() == daily
+
+
+def test_inventory_forecast_computes_cover_and_refreshes_after_ledger_writes(client):
+    from datetime import datetime, timedelta, timezone
+
+    admin = _create_user(client, "forecast_admin", "forecast_admin@example.com", role="admin")
+    headers = {"Authorization": f"Bearer {admin['access_token']}"}
+    now = datetime.now(timezone.utc)
+    with client.application.app_context():
+        sku_ids = Sku.ids_for([("Cat6", "5m"), ("OM4", "3m")])
+        rows = [("Cat6", "5m", "receipt", 100, 20)]
+        # Cat6 5m: 4/day for the last 14 days of a 28-day window -> 2/day on average.
+        rows += [("Cat6", "5m", "consumption", -4, day) for day in range(1, 15)]
+        for cable_type, cable_length, movement_type, delta, days_ago in rows:
+            db.session.add(
+                InventoryMovement(
+                    movement_type=movement_type,
+                    sku_id=sku_ids[(cable_type, cable_length)],
+                    cable_type=cable_type,
+                    cable_length=cable_length,
+                    quantity_delta=delta,
+                    created_at=now - timedelta(days=days_ago),
+                )
+            )
+        db.session.commit()
+        InventoryBalance.replace_all(InventoryMovement.ledger_totals())
+        InventoryRollup.rebuild()
+
+    client.post(
+        "/api/cable-receiving",
+        json={"items": [{"cable_type": "OM4", "cable_length": "3m", "quantity": 9}]},
+        headers=headers,
+    )
+    rows = client.get("/api/inventory/forecast", query_string={"lead_time_days": 10}).get_json()
+    assert [(row["cable_type"], row["cable_length"]) for row in rows] == [("Cat6", "5m"), ("OM4", "3m")]
+    cat6, om4 = rows
+    assert cat6["on_hand"] == 44
+    assert cat6["avg_daily_demand"] == 2.0
+    assert cat6["recent_daily_demand"] == 4.0
+    assert cat6["days_of_cover"] == 22.0
+    assert cat6["reorder_point"] == round(20 + 1.65 * 2.0 * 10 ** 0.5, 1)
+    assert cat6["needs_reorder"] is False
+    assert cat6["suggested_order_quantity"] == 0
+    assert om4["days_of_cover"] is None and om4["suggested_order_quantity"] == 0
+
+    ticket = client.post(
+        "/api/tickets",
+        json={"assigned_to_id": admin["id"], "items": [{"cable_type": "Cat6", "cable_length": "5m", "quantity": "30"}]},
+        headers=headers,
+    ).get_json()["ticket"]
+    for status in ["approved", "in_progress", "fulfilled"]:
+        client.patch(f"/api/tickets/{ticket['id']}", json={"status": status}, headers=headers)
+    refreshed = client.get("/api/inventory/forecast", query_string={"lead_time_days": 10}).get_json()
+    assert refreshed[0]["on_hand"] == 14
+    assert refreshed[0]["needs_reorder"] is True
+    assert refreshed[0]["suggested_order_quantity"] == math.ceil(cat6["reorder_point"] + 2.0 * 7 - 14)
+    assert client.get("/api/inventory/forecast?window_days=0").status_code == 400
+    assert client.get("/api/inventory/forecast?service_z=inf").status_code == 400
+
+    from app.cache import _cache_dir
+
+    # The ledger writes above replaced the one entry for these parameters.
+    forecast_entries = [name for name in os.listdir(_cache_dir()) if name.startswith("inventory_forecast-")]
+    assert len(forecast_entries) == 1
+
+
+def test_reservations_hold_on_approval_and_release_on_exit_states(client):
+    admin = _create_user(client, "reserve_admin", "reserve_admin@example.com", role="admin")
+    headers = {"Authorization": f"Bearer {admin['access_token']}"}
+    client.post(
+        "/api/cable-receiving",
+        json={"items": [{"cable_type": "Cat6", "cable_length": "100m", "quantity": 10}]},
+        headers=headers,
+    )
+
+    def on_hand():
+        rows = client.get("/api/inventory/on-hand", query_string={"include_zero": "true"}).get_json()
+        return {(row["cable_type"], row["cable_length"]): (row["on_hand"], row["reserved"], row["available"]) for row in rows}
+
+    fulfilled = client.post(
+        "/api/tickets",
+        json={
+            "assigned_to_id": admin["id"],
+            "items": [
+                {"cable_type": "Cat6", "cable_length": "100m", "quantity": "3"},
+                {"cable_type": "Cat6", "cable_length": "100m", "quantity": "1"},
+                {"cable_type": "OM4", "cable_length": "3m", "quantity": "2"},
+            ],
+        },
+        headers=headers,
+    ).get_json()["ticket"]
+    rejected = _create_ticket(client, admin, admin["id"])
+    closed = _create_ticket(client, admin, admin["id"])
+    assert on_hand() == {("Cat6", "100m"): (10, 0, 10)}
+
+    client.patch(f"/api/tickets/{fulfilled['id']}", json={"status": "approved"}, headers=headers)
+    assert client.post(f"/api/tickets/{closed['id']}/approve/{Ticket.get(closed['id']).approval_token}").status_code == 200
+    assert on_hand() == {("Cat6", "100m"): (10, 5, 5), ("OM4", "3m"): (0, 2, -2)}
+
+    # Moving between holding states keeps the hold; rejection never held anything.
+    client.patch(f"/api/tickets/{fulfilled['id']}", json={"status": "in_progress"}, headers=headers)
+    client.patch(f"/api/tickets/{rejected['id']}", json={"status": "rejected"}, headers=headers)
+    assert on_hand() == {("Cat6", "100m"): (10, 5, 5), ("OM4", "3m"): (0, 2, -2)}
+
+    client.patch(f"/api/tickets/{fulfilled['id']}", json={"status": "fulfilled"}, headers=headers)
+    assert on_hand() == {("Cat6", "100m"): (6, 1, 5), ("OM4", "3m"): (-2, 0, -2)}
+    assert {row.release_reason for row in StockReservation.for_ticket(fulfilled["id"])} == {"fulfilled"}
+
+    # Deleting releases, restoring re-holds the same rows, closing releases for good.
+    client.delete(f"/api/tickets/{closed['id']}", headers=headers)
+    assert on_hand()[("Cat6", "100m")] == (6, 0, 6)
+    client.post(f"/api/tickets/{closed['id']}/restore", headers=headers)
+    assert on_hand()[("Cat6", "100m")] == (6, 1, 5)
+    client.patch(f"/api/tickets/{closed['id']}", json={"status": "closed"}, headers=headers)
+    assert on_hand()[("Cat6", "100m")] == (6, 0, 6)
+    assert len(StockReservation.for_ticket(closed["id"])) == 1
+
+    # A rebuild from the ledger keeps reservations that are still open.
+    reopened = _create_ticket(client, admin, admin["id"])
+    client.patch(f"/api/tickets/{reopened['id']}", json={"status": "approved"}, headers=headers)
+    InventoryBalance.replace_all(InventoryMovement.ledger_totals())
+    assert on_hand() == {("Cat6", "100m"): (6, 1, 5), ("OM4", "3m"): (-2, 0, -2)}
+
+
+def test_availability_checks_cached_balances_and_refreshes_after_writes(client):
+    from sqlalchemy import event
+
+    admin = _create_user(client, "avail_admin", "avail_admin@example.com", role="admin")
+    headers = {"Authorization": f"Bearer {admin['access_token']}"}
+    client.post(
+        "/api/cable-receiving",
+        json={"items": [{"cable_type": "Cat6", "cable_length": "100m", "quantity": 10}]},
+        headers=headers,
+    )
+    held = client.post(
+        "/api/tickets",
+        json={"assigned_to_id": admin["id"], "items": [{"cable_type": "Cat6", "cable_length": "100m", "quantity": "4"}]},
+        headers=headers,
+    ).get_json()["ticket"]
+    client.patch(f"/api/tickets/{held['id']}", json={"status": "approved"}, headers=headers)
+
+    batch = {
+        "items": [
+            {"cable_type": "Cat6", "cable_length": "100m", "quantity": 5},
+            {"cable_type": "OM4", "cable_length": "3m", "quantity": 1},
+            {"cable_type": "Cat6", "cable_length": "100m", "quantity": 2},
+        ]
+    }
+    first = client.post("/api/inventory/availability", json=batch)
+    assert first.status_code == 200
+    assert first.get_json() == {
+        "has_shortfall": True,
+        "items": [
+            {"cable_type": "Cat6", "cable_length": "100m", "requested": 7, "on_hand": 10, "reserved": 4, "available": 6, "shortfall": 1},
+            {"cable_type": "OM4", "cable_length": "3m", "requested": 1, "on_hand": 0, "reserved": 0, "available": 0, "shortfall": 1},
+        ],
+    }
+
+    statements = []
+    with client.application.app_context():
+        engine = db.engine
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        assert client.post("/api/inventory/availability", json=batch).get_json() == first.get_json()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert statements == []
+
+    client.post(
+        "/api/cable-receiving",
+        json={"items": [{"cable_type": "OM4", "cable_length": "3m", "quantity": 3}]},
+        headers=headers,
+    )
+    created = client.post(
+        "/api/tickets",
+        json={
+            "assigned_to_id": admin["id"],
+            "items": [{"cable_type": "OM4", "cable_length": "3m", "quantity": "2"}],
+            "check_availability": True,
+        },
+        headers=headers,
+    )
+    assert created.status_code == 201
+    assert created.get_json()["availability"] == {
+        "has_shortfall": False,
+        "items": [
+            {"cable_type": "OM4", "cable_length": "3m", "requested": 2, "on_hand": 3, "reserved": 0, "available": 3, "shortfall": 0},
+        ],
+    }
+    assert "availability" not in _create_ticket(client, admin, admin["id"])
+    assert client.post("/api/inventory/availability", json={"items": []}).status_code == 400
+
+
+def test_location_balances_follow_receipts_fulfillments_and_transfers(client):
+    admin = _create_user(client, "location_admin", "location_admin@example.com", role="admin")
+    headers = {"Authorization": f"Bearer {admin['access_token']}"}
+    for location, quantity in [("Cage A", 10), ("Cage B", 4), (None, 1)]:
+        client.post(
+            "/api/cable-receiving",
+            json={"storage_location": location, "items": [{"cable_type": "Cat6", "cable_length": "5m", "quantity": quantity}]},
+            headers=headers,
+        )
+    def fulfill(quantity, **extra):
+        # A ticket's location is where the cable is delivered, never a storage cage.
+        ticket = client.post(
+            "/api/tickets",
+            json={"assigned_to_id": admin["id"], "location": "Building 5, Room 301", "items": [{"cable_type": "Cat6", "cable_length": "5m", "quantity": str(quantity)}]},
+            headers=headers,
+        ).get_json()["ticket"]
+        for status in ["approved", "in_progress", "fulfilled"]:
+            body = {"status": status, **(extra if status == "fulfilled" else {})}
+            assert client.patch(f"/api/tickets/{ticket['id']}", json=body, headers=headers).status_code == 200
+
+    fulfill(3, stock_location="Cage B")
+
+    transfer = {"from_location": "Cage A", "to_location": "Cage B", "items": [{"cable_type": "Cat6", "cable_length": "5m", "quantity": 6}]}
+    created = client.post("/api/inventory/transfers", json=transfer, headers=headers)
+    assert created.status_code == 201
+    assert [(row["location"], row["quantity_delta"], row["movement_type"]) for row in created.get_json()["movements"]] == [
+        ("Cage A", -6, "transfer"),
+        ("Cage B", 6, "transfer"),
+    ]
+
+    def by_location():
+        rows = client.get("/api/inventory/on-hand", query_string={"by_location": "true"}).get_json()
+        return {row["location"]: row["on_hand"] for row in rows}
+
+    assert by_location() == {None: 1, "Cage A": 4, "Cage B": 7}
+    assert client.get("/api/inventory/on-hand").get_json()[0]["on_hand"] == 12
+    assert client.get("/api/inventory/on-hand", query_string={"location": "Cage B"}).get_json() == [
+        {"location": "Cage B", "cable_type": "Cat6", "cable_length": "5m", "on_hand": 7}
+    ]
+    cage_b = client.get("/api/inventory/movements", query_string={"location": "Cage B"}).get_json()
+    assert [row["quantity_delta"] for row in cage_b] == [6, -3, 4]
+
+    short = client.post("/api/inventory/transfers", json={**transfer, "items": [{"cable_type": "Cat6", "cable_length": "5m", "quantity": 5}]}, headers=headers)
+    assert short.status_code == 409
+    assert short.get_json()["shortfalls"] == [{"cable_type": "Cat6", "cable_length": "5m", "requested": 5, "on_hand": 4}]
+    # The check runs after the write in the same transaction, which is rolled back.
+    assert by_location()["Cage A"] == 4
+    assert len(client.get("/api/inventory/movements", query_string={"location": "Cage A"}).get_json()) == 2
+    assert client.post("/api/inventory/transfers", json={**transfer, "to_location": "Cage A"}, headers=headers).status_code == 400
+    assert client.get("/api/inventory/on-hand?location=Cage+A&as_of=2024-01-01").status_code == 400
+
+    InventoryLocationBalance.query.delete()
+    db.session.commit()
+    InventoryLocationBalance.replace_all(InventoryMovement.location_totals(chunk_size=2))
+    assert by_location() == {None: 1, "Cage A": 4, "Cage B": 7}
+
+    # Without stock_location consumption is unassigned; the delivery address never gets a balance.
+    fulfill(1)
+    assert by_location() == {"Cage A": 4, "Cage B": 7}
+    fulfill(4, stock_location="Cage A")
+    assert by_location() == {"Cage B": 7}
+    assert client.get("/api/inventory/on-hand").get_json()[0]["on_hand"] == 7
+    drained = client.post("/api/inventory/transfers", json={**transfer, "items": [{"cable_type": "Cat6", "cable_length": "5m", "quantity": 1}]}, headers=headers)
+    assert drained.status_code == 409
+    assert drained.get_json()["shortfalls"][0]["on_hand"] == 0
+
+
+def test_optics_kit_orders_insert_as_one_group_with_one_notification(client, monkeypatch):
+    import app.notifications as notifications
+    import app.routes as routes
+    from app.models import OpticsRequest, OpticsReturn
+
+    _create_user(client, "kit_admin", "kit_admin@example.com", role="admin")
+    user = _create_user(client, "kit_user", "kit_user@example.com")
+    headers = {"Authorization": f"Bearer {user['access_token']}"}
+    kit = {"selected_part": "Kitted GB 300", "quantity": 2, "requester_name": "Kit User"}
+
+    notified = []
+
+    def record(rows, kit_name, quantity):
+        notified.append(([row.id for row in rows], kit_name, quantity))
+        notifications.notify_optics_request_kit_created(rows, kit_name, quantity)
+
+    monkeypatch.setattr(routes, "notify_optics_request_kit_created", record)
+    created = client.post("/api/optics-requests", json=kit, headers=headers)
+    assert created.status_code == 201
+    payload = created.get_json()
+    kit_order_id = payload["kit_order_id"]
+    assert kit_order_id
+    assert {row["kit_order_id"] for row in payload["requests"]} == {kit_order_id}
+    assert [row["requested_by"]["id"] for row in payload["requests"]] == [user["id"]] * 3
+    assert notified == [([row["id"] for row in payload["requests"]], "Kitted GB 300", 2)]
+    emails = NotificationOutbox.query.all()
+    assert [email.recipient for email in emails] == ["kit_admin@example.com"]
+    assert "MMS4X00-NM-FLT" in emails[0].body and kit_order_id in emails[0].body
+
+    single = client.post(
+        "/api/optics-requests",
+        json={"selected_part": "SFP-GE-T-LU", "quantity": 1, "requester_name": "Kit User"},
+        headers=headers,
+    )
+    assert single.get_json()["request"]["kit_order_id"] is None
+
+    # A failing notification rolls back every component of the kit.
+    def fail(rows, kit_name, quantity):
+        raise RuntimeError("outbox unavailable")
+
+    monkeypatch.setattr(routes, "notify_optics_return_kit_created", fail)
+    assert client.post("/api/optics-returns", json=kit, headers=headers).status_code == 500
+    assert OpticsReturn.query.count() == 0
+    assert OpticsRequest.query.count() == 4
+
+
+def test_optics_catalog_nested_kits_etag_and_cross_worker_invalidation(client):
+    from app.models import OpticsPart
+    from app.optics_catalog import catalog_cache
+
+    admin = _create_user(client, "catalog_admin", "catalog_admin@example.com", role="admin")
+    user = _create_user(client, "catalog_user", "catalog_user@example.com")
+    admin_headers = {"Authorization": f"Bearer {admin['access_token']}"}
+
+    listed = client.get("/api/optics-parts")
+    assert listed.get_json()[:4] == ["MMS4X50-NM", "EX-SFP-1GE-LX-LU", "MMS4X00-NM-T", "Kitted GB 300"]
+    assert listed.get_json()[-1] == "Other"
+    assert listed.headers["Cache-Control"] == "no-cache"
+    etag = listed.headers["ETag"]
+    assert client.get("/api/optics-parts", headers={"If-None-Match": etag}).status_code == 304
+
+    mini = {"part_number": "Kit Mini", "components": [
+        {"part_number": "MMS1V70-CM", "quantity": 2},
+        {"part_number": "SFP-GE-T-LU", "quantity": 1},
+    ]}
+    assert client.post("/api/optics-parts", json=mini, headers=admin_headers).status_code == 201
+    stale_snapshot, stale_marker = catalog_cache._snapshot, catalog_cache._marker
+    mega = {"part_number": "Kit Mega", "components": [
+        {"part_number": "Kit Mini", "quantity": 3},
+        {"part_number": "Kitted GB 300", "quantity": 1},
+    ]}
+    assert client.post("/api/optics-parts", json=mega, headers=admin_headers).status_code == 201
+
+    # Another worker still holding the older snapshot reloads once the shared marker moves.
+    catalog_cache._snapshot, catalog_cache._marker = stale_snapshot, stale_marker
+    relisted = client.get("/api/optics-parts", headers={"If-None-Match": etag})
+    assert relisted.status_code == 200
+    assert "Kit Mega" in relisted.get_json()
+    assert relisted.headers["ETag"] != etag
+
+    catalog = OpticsPart.catalog()
+    assert catalog.flatten("Kit Mega") is catalog.flatten("Kit Mega")
+    created = client.post(
+        "/api/optics-requests",
+        json={"selected_part": "Kit Mega", "quantity": 2, "requester_name": "Nested"},
+        headers={"Authorization": f"Bearer {user['access_token']}"},
+    ).get_json()
+    assert [(row["part_number"], row["quantity"]) for row in created["requests"]] == [
+        ("MMS1V70-CM", 20),
+        ("SFP-GE-T-LU", 6),
+        ("MMS1X00-NS400", 72),
+        ("MMS4X00-NM-FLT", 144),
+    ]
+    assert client.get("/api/optics-parts/Kit Mini").get_json()["flattened"] == [
+        {"part_number": "MMS1V70-CM", "quantity": 2},
+        {"part_number": "SFP-GE-T-LU", "quantity": 1},
+    ]
+
+    doubled = {"part_number": "Kit Doubled", "components": [
+        {"part_number": "MMS1V70-CM", "quantity": 2},
+        {"part_number": "SFP-GE-T-LU", "quantity": 1},
+        {"part_number": "MMS1V70-CM", "quantity": 3},
+    ]}
+    saved = client.post("/api/optics-parts", json=doubled, headers=admin_headers)
+    assert saved.status_code == 201
+    assert client.get("/api/optics-parts/Kit Doubled").get_json()["flattened"] == [
+        {"part_number": "MMS1V70-CM", "quantity": 5},
+        {"part_number": "SFP-GE-T-LU", "quantity": 1},
+    ]
+
+    cycle = client.patch("/api/optics-parts/Kit Mini", json={"components": [{"part_number": "Kit Mega", "quantity": 1}]}, headers=admin_headers)
+    assert cycle.status_code == 409
+    unknown = client.patch("/api/optics-parts/Kit Mini", json={"components": [{"part_number": "Nope", "quantity": 1}]}, headers=admin_headers)
+    assert unknown.status_code == 400
+    assert [item["part_number"] for item in client.get("/api/optics-parts/Kit Mini").get_json()["components"]] == [
+        "MMS1V70-CM",
+        "SFP-GE-T-LU",
+    ]
+
+    hidden = client.patch("/api/optics-parts/Kit Mega", json={"active": False}, headers=admin_headers)
+    assert hidden.status_code == 200
+    assert "Kit Mega" not in client.get("/api/optics-parts").get_json()
+    rejected = client.post(
+        "/api/optics-requests",
+        json={"selected_part": "Kit Mega", "quantity": 1, "requester_name": "Nested"},
+        headers={"Authorization": f"Bearer {user['access_token']}"},
+    )
+    assert rejected.status_code == 400
+    assert client.post("/api/optics-parts", json=mini, headers={"Authorization": f"Bearer {user['access_token']}"}).status_code == 403
+
+
+def test_optics_approvals_post_to_optics_ledger_once(client):
+    from app.models import OpticsBalance, OpticsMovement
+
+    admin = _create_user(client, "optics_ledger_admin", "optics_ledger_admin@example.com", role="admin")
+    user = _create_user(client, "optics_ledger_user", "optics_ledger_user@example.com")
+    admin_headers = {"Authorization": f"Bearer {admin['access_token']}"}
+    user_headers = {"Authorization": f"Bearer {user['access_token']}"}
+
+    def order(path, part, quantity):
+        response = client.post(path, json={"selected_part": part, "quantity": quantity, "requester_name": "Ledger"}, headers=user_headers)
+        return response.get_json()
+
+    returned = order("/api/optics-returns", "SFP-GE-T-LU", 10)["return"]
+    issued = order("/api/optics-requests", "SFP-GE-T-LU", 4)["request"]
+    denied = order("/api/optics-requests", "SFP-GE-T-LU", 50)["request"]
+    client.patch(f"/api/optics-returns/{returned['id']}/status", json={"action": "approve"}, headers=admin_headers)
+    for action in ("approve", "archive", "approve"):
+        client.patch(f"/api/optics-requests/{issued['id']}/status", json={"action": action}, headers=admin_headers)
+    client.patch(f"/api/optics-requests/{denied['id']}/status", json={"action": "deny"}, headers=admin_headers)
+
+    assert client.get("/api/optics/on-hand").get_json() == [{"part_number": "SFP-GE-T-LU", "on_hand": 6}]
+    movements = client.get("/api/optics/movements", query_string={"part_number": "SFP-GE-T-LU"}).get_json()
+    assert [(row["movement_type"], row["quantity_delta"], row["source_type"]) for row in movements] == [
+        ("issue", -4, "optics_request"),
+        ("return", 10, "optics_return"),
+    ]
+
+    totals = OpticsMovement.ledger_totals()
+    assert OpticsBalance.drift(totals) == []
+    OpticsBalance.query.update({"on_hand": 0})
+    db.session.commit()
+    assert OpticsBalance.drift(totals) == [{"part_number": "SFP-GE-T-LU", "expected": 6, "stored": 0}]
+    OpticsBalance.replace_all(totals)
+    assert client.get("/api/optics/on-hand", query_string={"part_number": "SFP-GE-T-LU"}).get_json()[0]["on_hand"] == 6
+
+
+def test_denying_an_approved_optics_row_reverses_its_stock(client):
+    admin = _create_user(client, "optics_reverse_admin", "optics_reverse_admin@example.com", role="admin")
+    user = _create_user(client, "optics_reverse_user", "optics_reverse_user@example.com")
+    admin_headers = {"Authorization": f"Bearer {admin['access_token']}"}
+    body = {"selected_part": "SFP-GE-T-LU", "quantity": 3, "requester_name": "Reverse"}
+    user_headers = {"Authorization": f"Bearer {user['access_token']}"}
+    issued = client.post("/api/optics-requests", json=body, headers=user_headers).get_json()["request"]
+    returned = client.post("/api/optics-returns", json=body, headers=user_headers).get_json()["return"]
+
+    def on_hand():
+        rows = client.get("/api/optics/on-hand", query_string={"include_zero": "true"}).get_json()
+        return rows[0]["on_hand"] if rows else 0
+
+    steps = []
+    for action in ("approve", "deny", "deny", "approve", "archive", "deny", "approve"):
+        client.patch(f"/api/optics-requests/{issued['id']}/status", json={"action": action}, headers=admin_headers)
+        steps.append(on_hand())
+    assert steps == [-3, 0, 0, -3, -3, 0, -3]
+
+    for action in ("approve", "deny"):
+        client.patch(f"/api/optics-returns/{returned['id']}/status", json={"action": action}, headers=admin_headers)
+    assert on_hand() == -3
+    movements = client.get("/api/optics/movements").get_json()
+    assert [row["movement_type"] for row in movements].count("issue_reversal") == 2
+    assert [(row["movement_type"], row["quantity_delta"]) for row in movements[:2]] == [
+        ("return_reversal", -3),
+        ("return", 3),
+    ]
+
+
+def test_optics_bulk_status_updates_once_and_sends_one_email_per_requester(client, monkeypatch):
+    import app.notifications as notifications
+    import app.routes as routes
+
+    admin = _create_user(client, "bulk_admin", "bulk_admin@example.com", role="admin")
+    alice = _create_user(client, "bulk_alice", "bulk_alice@example.com")
+    bob = _create_user(client, "bulk_bob", "bulk_bob@example.com")
+    admin_headers = {"Authorization": f"Bearer {admin['access_token']}"}
+    ids = []
+    for requester, quantity in [(alice, 2), (alice, 3), (bob, 4)]:
+        created = client.post(
+            "/api/optics-requests",
+            json={"selected_part": "SFP-GE-T-LU", "quantity": quantity, "requester_name": "Bulk"},
+            headers={"Authorization": f"Bearer {requester['access_token']}"},
+        )
+        ids.append(created.get_json()["request"]["id"])
+    monkeypatch.setattr(
+        routes, "notify_optics_request_bulk_status_change", notifications.notify_optics_request_bulk_status_change
+    )
+
+    approved = client.post(
+        "/api/optics-requests/bulk-status",
+        json={"ids": ids + [9999, ids[0]], "action": "approve", "admin_note": "Shelf 4"},
+        headers=admin_headers,
+    )
+    assert approved.status_code == 200
+    payload = approved.get_json()
+    assert payload["updated"] == 3
+    assert payload["results"] == [{"id": row_id, "outcome": "updated"} for row_id in ids] + [
+        {"id": 9999, "outcome": "not_found"}
+    ]
+    assert {(row["status"], row["admin_note"]) for row in payload["requests"]} == {("approved", "Shelf 4")}
+    emails = sorted(NotificationOutbox.query.all(), key=lambda email: email.recipient)
+    assert [email.recipient for email in emails] == ["bulk_alice@example.com", "bulk_bob@example.com"]
+    assert [f"<td>#{row_id}</td>" in emails[0].body for row_id in ids] == [True, True, False]
+
+    # Re-approving leaves the rows alone: no second issue and no second digest.
+    again = client.post(
+        "/api/optics-requests/bulk-status", json={"ids": ids, "action": "approve"}, headers=admin_headers
+    ).get_json()
+    assert [row["outcome"] for row in again["results"]] == ["unchanged"] * 3
+    assert again["updated"] == 0 and NotificationOutbox.query.count() == 2
+    assert client.get("/api/optics/on-hand").get_json() == [{"part_number": "SFP-GE-T-LU", "on_hand": -9}]
+
+    denied = client.post(
+        "/api/optics-requests/bulk-status", json={"ids": ids[1:], "action": "deny"}, headers=admin_headers
+    ).get_json()
+    assert denied["updated"] == 2
+    assert client.get("/api/optics/on-hand").get_json() == [{"part_number": "SFP-GE-T-LU", "on_hand": -2}]
+    movements = client.get("/api/optics/movements").get_json()
+    assert sorted(row["quantity_delta"] for row in movements if row["movement_type"] == "issue_reversal") == [3, 4]
+
+    archived = client.post(
+        "/api/optics-requests/bulk-status", json={"ids": ids[:2], "action": "archive"}, headers=admin_headers
+    ).get_json()
+    assert [row["archived_at"] is not None for row in archived["requests"]] == [True, True]
+    assert client.post(
+        "/api/optics-returns/bulk-status",
+        json={"ids": ids, "action": "deny"},
+        headers={"Authorization": f"Bearer {alice['access_token']}"},
+    ).status_code == 403
+    for bad in ({"ids": [], "action": "approve"}, {"ids": ["1"], "action": "approve"}, {"ids": ids, "action": "x"}, ids):
+        rejected = client.post("/api/optics-returns/bulk-status", json=bad, headers=admin_headers)
+        assert rejected.status_code == 400 and "error" in rejected.get_json()
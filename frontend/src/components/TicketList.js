@@ -1,21 +1,57 @@
 import React, { useState, useEffect, useCallback, useMemo } from 'react';
 import axios from '../api/axiosinstance';
 
+const PAGE_SIZE = 50;
+
 function TicketList({ currentUser, refreshTrigger, onTicketDeleted }) {
   const [tickets, setTickets] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [filter, setFilter] = useState('all');
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  const filterParams = useMemo(() => {
+    if (filter === 'created') {
+      return { created_by_id: currentUser.id };
+    }
+    if (filter === 'assigned') {
+      return { assigned_to_id: currentUser.id };
+    }
+    return {};
+  }, [filter, currentUser.id]);
+
+  const fetchPage = useCallback(
+    (cursor) => axios.get('/tickets', {
+      params: { ...filterParams, limit: PAGE_SIZE, ...(cursor ? { cursor } : {}) },
+    }),
+    [filterParams]
+  );
 
   const fetchTickets = useCallback(async () => {
     try {
-      const response = await axios.get('/tickets');
-      setTickets(response.data);
+      const response = await fetchPage(null);
+      setTickets(response.data.tickets);
+      setNextCursor(response.data.next_cursor);
       setLoading(false);
     } catch (err) {
       console.error('Error fetching tickets:', err);
       setLoading(false);
     }
-  }, []);
+  }, [fetchPage]);
+
+  const fetchMoreTickets = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const response = await fetchPage(nextCursor);
+      setTickets((prev) => [...prev, ...response.data.tickets]);
+      setNextCursor(response.data.next_cursor);
+    } catch (err) {
+      console.error('Error fetching more tickets:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   useEffect(() => {
     fetchTickets();
@@ -43,31 +79,6 @@ function TicketList({ currentUser, refreshTrigger, onTicketDeleted }) {
     }
   };
 
-  const visibleTickets = useMemo(
-    () => tickets.filter((t) => t.status !== 'deleted'),
-    [tickets]
-  );
-
-  const createdTickets = useMemo(
-    () => visibleTickets.filter((t) => t.created_by.id === currentUser.id),
-    [visibleTickets, currentUser.id]
-  );
-
-  const assignedTickets = useMemo(
-    () => visibleTickets.filter((t) => t.assigned_to.id === currentUser.id),
-    [visibleTickets, currentUser.id]
-  );
-
-  const filteredTickets = useMemo(() => {
-    if (filter === 'created') {
-      return createdTickets;
-    }
-    if (filter === 'assigned') {
-      return assignedTickets;
-    }
-    return visibleTickets;
-  }, [filter, visibleTickets, createdTickets, assignedTickets]);
-
   const getStatusBadgeClass = (status) => {
     const classes = {
       'pending_approval': 'status-pending',
@@ -102,28 +113,28 @@ function TicketList({ currentUser, refreshTrigger, onTicketDeleted }) {
             className={filter === 'all' ? 'active' : ''}
             onClick={() => setFilter('all')}
           >
-            All ({visibleTickets.length})
+            All
           </button>
           <button
             className={filter === 'created' ? 'active' : ''}
             onClick={() => setFilter('created')}
           >
-            Created by Me ({createdTickets.length})
+            Created by Me
           </button>
           <button
             className={filter === 'assigned' ? 'active' : ''}
             onClick={() => setFilter('assigned')}
           >
-            Assigned to Me ({assignedTickets.length})
+            Assigned to Me
           </button>
         </div>
       </div>
 
-      {filteredTickets.length === 0 ? (
+      {tickets.length === 0 ? (
         <p className="no-tickets">No tickets found</p>
       ) : (
         <div className="tickets-grid">
-          {filteredTickets.map(ticket => (
+          {tickets.map(ticket => (
             <div key={ticket.id} className="ticket-card">
               <div className="ticket-header">
                 <span className="ticket-id">#{ticket.id}</span>
@@ -214,6 +225,14 @@ function TicketList({ currentUser, refreshTrigger, onTicketDeleted }) {
           ))}
         </div>
       )}
+
+      {nextCursor && (
+        <div className="ticket-list-more">
+          <button className="btn-small" onClick={fetchMoreTickets} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </button>
+        </div>
+      )}
     </div>
   );
 }
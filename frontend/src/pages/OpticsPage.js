@@ -1,8 +1,10 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useMemo } from 'react';
 import { useNavigate } from 'react-router-dom';
 import axios from '../api/axiosinstance';
 
 const OTHER_OPTION = 'Other';
+const PAGE_SIZE = 50;
+const STATUS_OPTIONS = ['pending', 'approved', 'denied', 'archived'];
 
 const OpticsPage = ({ user, onLogout }) => {
   const navigate = useNavigate();
@@ -18,9 +20,29 @@ const OpticsPage = ({ user, onLogout }) => {
 
   const [requests, setRequests] = useState([]);
   const [requestsLoading, setRequestsLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [statusFilter, setStatusFilter] = useState('');
+  const [partFilter, setPartFilter] = useState('');
+  const [includeArchived, setIncludeArchived] = useState(false);
 
   const isAdmin = user?.role === 'admin';
 
+  const filterParams = useMemo(() => {
+    const params = {};
+    if (statusFilter) params.status = statusFilter;
+    if (partFilter) params.part_number = partFilter;
+    if (includeArchived && !statusFilter) params.include_archived = 'true';
+    return params;
+  }, [statusFilter, partFilter, includeArchived]);
+
+  const fetchPage = useCallback(
+    (cursor) => axios.get('/optics-requests', {
+      params: { ...filterParams, limit: PAGE_SIZE, ...(cursor ? { cursor } : {}) },
+    }),
+    [filterParams]
+  );
+
   const fetchPartOptions = useCallback(async () => {
     try {
       const response = await axios.get('/optics-parts');
@@ -33,19 +55,37 @@ const OpticsPage = ({ user, onLogout }) => {
 
   const fetchRequests = useCallback(async () => {
     try {
-      const response = await axios.get('/optics-requests');
-      setRequests(response.data || []);
+      const response = await fetchPage(null);
+      setRequests(response.data.requests);
+      setNextCursor(response.data.next_cursor);
     } catch (err) {
       console.error('Error fetching optics requests:', err);
     } finally {
       setRequestsLoading(false);
     }
-  }, []);
+  }, [fetchPage]);
+
+  const fetchMoreRequests = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const response = await fetchPage(nextCursor);
+      setRequests((prev) => [...prev, ...response.data.requests]);
+      setNextCursor(response.data.next_cursor);
+    } catch (err) {
+      console.error('Error fetching more optics requests:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   useEffect(() => {
     fetchPartOptions();
+  }, [fetchPartOptions]);
+
+  useEffect(() => {
     fetchRequests();
-  }, [fetchPartOptions, fetchRequests]);
+  }, [fetchRequests]);
 
   const handleSubmit = async (e) => {
     e.preventDefault();
@@ -196,12 +236,43 @@ const OpticsPage = ({ user, onLogout }) => {
         <div className="ticket-list-container">
           <div className="ticket-list-header">
             <h3>{isAdmin ? 'All Optics Requests' : 'My Optics Requests'}</h3>
+            <div className="optics-filters">
+              <select
+                aria-label="Filter by status"
+                value={statusFilter}
+                onChange={e => setStatusFilter(e.target.value)}
+              >
+                <option value="">All statuses</option>
+                {STATUS_OPTIONS.map(status => (
+                  <option key={status} value={status}>{status}</option>
+                ))}
+              </select>
+              <select
+                aria-label="Filter by part"
+                value={partFilter}
+                onChange={e => setPartFilter(e.target.value)}
+              >
+                <option value="">All parts</option>
+                {partOptions.filter(part => part !== OTHER_OPTION).map(part => (
+                  <option key={part} value={part}>{part}</option>
+                ))}
+              </select>
+              <label>
+                <input
+                  type="checkbox"
+                  checked={includeArchived || statusFilter === 'archived'}
+                  onChange={e => setIncludeArchived(e.target.checked)}
+                  disabled={Boolean(statusFilter)}
+                />
+                {' '}Show archived
+              </label>
+            </div>
           </div>
 
           {requestsLoading ? (
             <div className="loading"><span className="loader">Loading...</span></div>
           ) : requests.length === 0 ? (
-            <div className="no-tickets">No optics requests yet.</div>
+            <div className="no-tickets">No optics requests found.</div>
           ) : (
             <div className="tickets-grid">
               {requests.map(req => (
@@ -265,6 +336,14 @@ const OpticsPage = ({ user, onLogout }) => {
               ))}
             </div>
           )}
+
+          {nextCursor && (
+            <div className="ticket-list-more">
+              <button className="btn-small" onClick={fetchMoreRequests} disabled={loadingMore}>
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </div>